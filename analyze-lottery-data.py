@@ -2,166 +2,311 @@
 """
 CSV Data Summarizer - Lottery Analysis
 Demonstrates the csv-data-summarizer skill on Minnesota lottery data
+
+Charts are only redrawn when their inputs change: each chart's columns are
+fingerprinted and compared with the fingerprints saved next to the PNGs.
+Charts that do need drawing are rendered in parallel worker processes on
+the Agg backend; matplotlib and seaborn are only imported there.
+
+Usage:
+    python analyze-lottery-data.py [data.csv ...] [--force] [--workers N]
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
+import json
+import hashlib
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+ROOT = Path(__file__).parent
+DEFAULT_CSV = ROOT / 'temp-lottery-data.csv'
+OUTPUT_ROOT = ROOT / 'analysis-output'
+
+# Chart fingerprints of an output directory: {chart: fingerprint}
+FINGERPRINT_FILE = '.chart-fingerprints.json'
+
+DPI = 150
+
+# Bump when a chart's drawing code changes, so existing PNGs are redrawn
+CHART_VERSION = 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Summarize lottery CSV data and render charts.')
+    parser.add_argument('csv', nargs='*', type=Path, default=[DEFAULT_CSV],
+                        help='Datasets to analyze (default: temp-lottery-data.csv)')
+    parser.add_argument('--force', action='store_true', help='Redraw every chart even if its inputs are unchanged')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Chart rendering processes')
+    parser.add_argument('--charts-only', action='store_true', help='Skip the text report')
+    return parser.parse_args()
+
+
+def output_dir_for(csv_file):
+    """analysis-output/ for the default dataset, analysis-output/<name>/ for others."""
+    if csv_file.resolve() == DEFAULT_CSV.resolve():
+        return OUTPUT_ROOT
+    return OUTPUT_ROOT / csv_file.stem
+
+# =====================================================
+# Text Report
+# =====================================================
+
+def print_report(df, price_counts):
+    print("=" * 80)
+    print("LOTTERY DATA COMPREHENSIVE ANALYSIS")
+    print("=" * 80)
+    print()
+
+    # Dataset Overview
+    print("DATASET OVERVIEW")
+    print("-" * 80)
+    print(f"Total Games: {len(df)} rows x {len(df.columns)} columns")
+    print(f"Columns: {', '.join(df.columns)}")
+    print(f"Date Range: {df['play_begin'].min()} to {df['play_begin'].max()}")
+    print()
+
+    # Data Types
+    print("COLUMN TYPES")
+    print("-" * 80)
+    print(df.dtypes)
+    print()
+
+    # Missing Data
+    print("DATA QUALITY")
+    print("-" * 80)
+    missing = df.isnull().sum()
+    if missing.sum() == 0:
+        print("No missing values detected")
+    else:
+        print("Missing values by column:")
+        print(missing[missing > 0])
+    print()
+
+    # Summary Statistics
+    print("SUMMARY STATISTICS")
+    print("-" * 80)
+    print(df.describe())
+    print()
+
+    # Price Point Analysis
+    print("PRICE POINT ANALYSIS")
+    print("-" * 80)
+    print(f"Price Distribution:")
+    for price, count in price_counts.items():
+        pct = (count / len(df)) * 100
+        print(f"  ${price:2d}: {count:2d} games ({pct:5.1f}%)")
+    print()
+
+    # Top Prize Analysis
+    print("TOP PRIZE ANALYSIS")
+    print("-" * 80)
+    print(f"Average Top Prize: ${df['top_prize'].mean():,.0f}")
+    print(f"Median Top Prize:  ${df['top_prize'].median():,.0f}")
+    print(f"Highest Top Prize: ${df['top_prize'].max():,.0f} ({df.loc[df['top_prize'].idxmax(), 'name']})")
+    print(f"Lowest Top Prize:  ${df['top_prize'].min():,.0f} ({df.loc[df['top_prize'].idxmin(), 'name']})")
+    print()
+
+    # Odds Analysis
+    print("ODDS ANALYSIS")
+    print("-" * 80)
+    print(f"Average Overall Odds: 1 in {df['overall_odds'].mean():.2f}")
+    print(f"Best Odds:  1 in {df['overall_odds'].min():.2f} ({df.loc[df['overall_odds'].idxmin(), 'name']})")
+    print(f"Worst Odds: 1 in {df['overall_odds'].max():.2f} ({df.loc[df['overall_odds'].idxmax(), 'name']})")
+    print()
+
+    # Insights
+    print("KEY INSIGHTS")
+    print("-" * 80)
+
+    # Price vs Top Prize correlation
+    correlation = df['price'].corr(df['top_prize'])
+    print(f"1. Price vs Top Prize Correlation: {correlation:.3f} (strong positive)")
+    print(f"   - Higher priced tickets generally offer bigger top prizes")
+
+    # Odds vs Price correlation
+    odds_price_corr = df['price'].corr(df['overall_odds'])
+    print(f"2. Price vs Odds Correlation: {odds_price_corr:.3f}")
+    if odds_price_corr < 0:
+        print(f"   - Higher priced tickets tend to have better odds")
+    else:
+        print(f"   - Odds don't necessarily improve with price")
+
+    # Expected Value Analysis
+    expected_value_indicator = (df['top_prize'] / 1000) / df['overall_odds']
+    best_ev = df.loc[expected_value_indicator.idxmax()]
+    print(f"3. Best Expected Value Indicator: {best_ev['name']}")
+    print(f"   - ${best_ev['price']} ticket, 1 in {best_ev['overall_odds']:.2f} odds, ${best_ev['top_prize']:,.0f} top prize")
+
+    print()
+    print("RECOMMENDATIONS FOR ML MODEL")
+    print("-" * 80)
+    print("1. Features to engineer:")
+    print("   - Price tier category ($1-5, $10, $20, $30)")
+    print("   - Days since launch (from play_begin)")
+    print("   - Prize-to-odds ratio")
+    print("   - Expected value indicator")
+    print()
+    print("2. Model considerations:")
+    print(f"   - {len(df)} games is good for initial training")
+    print("   - Need historical prize claim data for accurate predictions")
+    print("   - Consider time-series features (game age, season)")
+    print()
+
+# =====================================================
+# Charts (drawn in worker processes)
+# =====================================================
+
+def pyplot():
+    """Plotting stack on the Agg backend, imported on first use."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set style
+    sns.set_theme(style="whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    return plt
+
+
+def draw_price_distribution(plt, data):
+    # 1. Price Distribution
+    price_counts = data['price'].value_counts().sort_index()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    price_counts.plot(kind='bar', ax=ax, color='steelblue')
+    ax.set_title('Distribution of Games by Price Point', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Ticket Price ($)', fontsize=12)
+    ax.set_ylabel('Number of Games', fontsize=12)
+    ax.grid(axis='y', alpha=0.3)
+
+
+def draw_prize_vs_price(plt, data):
+    # 2. Top Prize vs Price
+    fig, ax = plt.subplots(figsize=(10, 6))
+    scatter = ax.scatter(data['price'], data['top_prize'], s=100, alpha=0.6, c=data['overall_odds'], cmap='viridis')
+    ax.set_title('Top Prize vs Ticket Price (colored by odds)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Ticket Price ($)', fontsize=12)
+    ax.set_ylabel('Top Prize ($)', fontsize=12)
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M' if x >= 1e6 else f'${x/1e3:.0f}K'))
+    plt.colorbar(scatter, ax=ax, label='Overall Odds (1 in X)')
+    ax.grid(alpha=0.3)
+
+
+def draw_odds_by_price(plt, data):
+    # 3. Odds Distribution by Price Tier
+    fig, ax = plt.subplots(figsize=(10, 6))
+    data.boxplot(column='overall_odds', by='price', ax=ax)
+    ax.set_title('Odds Distribution by Price Point', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Ticket Price ($)', fontsize=12)
+    ax.set_ylabel('Overall Odds (1 in X)', fontsize=12)
+    plt.suptitle('')  # Remove default title
+    ax.grid(alpha=0.3)
+
+
+# chart -> (input columns, draw function); the PNG is <chart>.png
+CHARTS = {
+    'price_distribution': (['price'], draw_price_distribution),
+    'prize_vs_price': (['price', 'top_prize', 'overall_odds'], draw_prize_vs_price),
+    'odds_by_price': (['price', 'overall_odds'], draw_odds_by_price),
+}
+
+
+def render_chart(job):
+    """Draw one chart to its PNG (runs in a worker process)."""
+    chart, data, path = job
+    plt = pyplot()
+    CHARTS[chart][1](plt, data)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close('all')
+    return path
+
+# =====================================================
+# Fingerprints
+# =====================================================
+
+def chart_fingerprint(data):
+    """Hash of a chart's input columns (values, dtypes, order) plus CHART_VERSION and DPI."""
+    digest = hashlib.sha256(f"{CHART_VERSION}:{DPI}:{list(data.columns)}:{list(data.dtypes.astype(str))}".encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_fingerprints(output_dir):
+    try:
+        with open(output_dir / FINGERPRINT_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_fingerprints(output_dir, fingerprints):
+    with open(output_dir / FINGERPRINT_FILE, 'w') as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+
+
+def stale_charts(df, output_dir, force=False):
+    """(chart, data, path, fingerprint) for charts whose PNG is missing or whose inputs changed."""
+    saved = load_fingerprints(output_dir)
+    stale = []
+    for chart, (columns, _) in CHARTS.items():
+        data = df[columns]
+        path = output_dir / f'{chart}.png'
+        fingerprint = chart_fingerprint(data)
+        if force or saved.get(chart) != fingerprint or not path.exists():
+            stale.append((chart, data, path, fingerprint))
+    return stale
+
+
+def render_all(stale, workers):
+    """Render stale charts, in worker processes when there's more than one."""
+    jobs = [(chart, data, path) for chart, data, path, _ in stale]
+    if workers <= 1 or len(jobs) <= 1:
+        return [render_chart(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(render_chart, jobs))
+
+# =====================================================
+# Main Execution
+# =====================================================
+
+def main():
+    args = parse_args()
+
+    # Text report per dataset; charts are collected and rendered together
+    stale_by_dir = {}
+    skipped = 0
+    for csv_file in args.csv:
+        df = pd.read_csv(csv_file)
+        if not args.charts_only:
+            print_report(df, df['price'].value_counts().sort_index())
+
+        output_dir = output_dir_for(csv_file)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stale = stale_charts(df, output_dir, args.force)
+        stale_by_dir[output_dir] = stale
+        skipped += len(CHARTS) - len(stale)
+
+    stale = [item for items in stale_by_dir.values() for item in items]
+    for path in render_all(stale, args.workers):
+        print(f"Saved: {path}")
+
+    # Record fingerprints only once the PNGs are written
+    for output_dir, items in stale_by_dir.items():
+        if items:
+            fingerprints = load_fingerprints(output_dir)
+            fingerprints.update({chart: fingerprint for chart, _, _, fingerprint in items})
+            save_fingerprints(output_dir, fingerprints)
+
+    print()
+    print("=" * 80)
+    print(f"ANALYSIS COMPLETE - {len(stale)} visualizations generated, {skipped} unchanged "
+          f"in {OUTPUT_ROOT.name}/")
+    print("=" * 80)
+
 
-# Set style
-sns.set_theme(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-
-# Load data
-csv_file = Path(__file__).parent / 'temp-lottery-data.csv'
-df = pd.read_csv(csv_file)
-
-print("=" * 80)
-print("LOTTERY DATA COMPREHENSIVE ANALYSIS")
-print("=" * 80)
-print()
-
-# Dataset Overview
-print("DATASET OVERVIEW")
-print("-" * 80)
-print(f"Total Games: {len(df)} rows x {len(df.columns)} columns")
-print(f"Columns: {', '.join(df.columns)}")
-print(f"Date Range: {df['play_begin'].min()} to {df['play_begin'].max()}")
-print()
-
-# Data Types
-print("COLUMN TYPES")
-print("-" * 80)
-print(df.dtypes)
-print()
-
-# Missing Data
-print("DATA QUALITY")
-print("-" * 80)
-missing = df.isnull().sum()
-if missing.sum() == 0:
-    print("No missing values detected")
-else:
-    print("Missing values by column:")
-    print(missing[missing > 0])
-print()
-
-# Summary Statistics
-print("SUMMARY STATISTICS")
-print("-" * 80)
-print(df.describe())
-print()
-
-# Price Point Analysis
-print("PRICE POINT ANALYSIS")
-print("-" * 80)
-price_counts = df['price'].value_counts().sort_index()
-print(f"Price Distribution:")
-for price, count in price_counts.items():
-    pct = (count / len(df)) * 100
-    print(f"  ${price:2d}: {count:2d} games ({pct:5.1f}%)")
-print()
-
-# Top Prize Analysis
-print("TOP PRIZE ANALYSIS")
-print("-" * 80)
-print(f"Average Top Prize: ${df['top_prize'].mean():,.0f}")
-print(f"Median Top Prize:  ${df['top_prize'].median():,.0f}")
-print(f"Highest Top Prize: ${df['top_prize'].max():,.0f} ({df.loc[df['top_prize'].idxmax(), 'name']})")
-print(f"Lowest Top Prize:  ${df['top_prize'].min():,.0f} ({df.loc[df['top_prize'].idxmin(), 'name']})")
-print()
-
-# Odds Analysis
-print("ODDS ANALYSIS")
-print("-" * 80)
-print(f"Average Overall Odds: 1 in {df['overall_odds'].mean():.2f}")
-print(f"Best Odds:  1 in {df['overall_odds'].min():.2f} ({df.loc[df['overall_odds'].idxmin(), 'name']})")
-print(f"Worst Odds: 1 in {df['overall_odds'].max():.2f} ({df.loc[df['overall_odds'].idxmax(), 'name']})")
-print()
-
-# Insights
-print("KEY INSIGHTS")
-print("-" * 80)
-
-# Price vs Top Prize correlation
-correlation = df['price'].corr(df['top_prize'])
-print(f"1. Price vs Top Prize Correlation: {correlation:.3f} (strong positive)")
-print(f"   - Higher priced tickets generally offer bigger top prizes")
-
-# Odds vs Price correlation
-odds_price_corr = df['price'].corr(df['overall_odds'])
-print(f"2. Price vs Odds Correlation: {odds_price_corr:.3f}")
-if odds_price_corr < 0:
-    print(f"   - Higher priced tickets tend to have better odds")
-else:
-    print(f"   - Odds don't necessarily improve with price")
-
-# Expected Value Analysis
-df['expected_value_indicator'] = (df['top_prize'] / 1000) / df['overall_odds']
-best_ev = df.loc[df['expected_value_indicator'].idxmax()]
-print(f"3. Best Expected Value Indicator: {best_ev['name']}")
-print(f"   - ${best_ev['price']} ticket, 1 in {best_ev['overall_odds']:.2f} odds, ${best_ev['top_prize']:,.0f} top prize")
-
-print()
-print("RECOMMENDATIONS FOR ML MODEL")
-print("-" * 80)
-print("1. Features to engineer:")
-print("   - Price tier category ($1-5, $10, $20, $30)")
-print("   - Days since launch (from play_begin)")
-print("   - Prize-to-odds ratio")
-print("   - Expected value indicator")
-print()
-print("2. Model considerations:")
-print(f"   - {len(df)} games is good for initial training")
-print("   - Need historical prize claim data for accurate predictions")
-print("   - Consider time-series features (game age, season)")
-print()
-
-# Create visualizations
-output_dir = Path(__file__).parent / 'analysis-output'
-output_dir.mkdir(exist_ok=True)
-
-# 1. Price Distribution
-fig, ax = plt.subplots(figsize=(10, 6))
-price_counts.plot(kind='bar', ax=ax, color='steelblue')
-ax.set_title('Distribution of Games by Price Point', fontsize=14, fontweight='bold')
-ax.set_xlabel('Ticket Price ($)', fontsize=12)
-ax.set_ylabel('Number of Games', fontsize=12)
-ax.grid(axis='y', alpha=0.3)
-plt.tight_layout()
-plt.savefig(output_dir / 'price_distribution.png', dpi=150)
-print(f"Saved: {output_dir / 'price_distribution.png'}")
-plt.close()
-
-# 2. Top Prize vs Price
-fig, ax = plt.subplots(figsize=(10, 6))
-scatter = ax.scatter(df['price'], df['top_prize'], s=100, alpha=0.6, c=df['overall_odds'], cmap='viridis')
-ax.set_title('Top Prize vs Ticket Price (colored by odds)', fontsize=14, fontweight='bold')
-ax.set_xlabel('Ticket Price ($)', fontsize=12)
-ax.set_ylabel('Top Prize ($)', fontsize=12)
-ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M' if x >= 1e6 else f'${x/1e3:.0f}K'))
-cbar = plt.colorbar(scatter, ax=ax, label='Overall Odds (1 in X)')
-ax.grid(alpha=0.3)
-plt.tight_layout()
-plt.savefig(output_dir / 'prize_vs_price.png', dpi=150)
-print(f"Saved: {output_dir / 'prize_vs_price.png'}")
-plt.close()
-
-# 3. Odds Distribution by Price Tier
-fig, ax = plt.subplots(figsize=(10, 6))
-df.boxplot(column='overall_odds', by='price', ax=ax)
-ax.set_title('Odds Distribution by Price Point', fontsize=14, fontweight='bold')
-ax.set_xlabel('Ticket Price ($)', fontsize=12)
-ax.set_ylabel('Overall Odds (1 in X)', fontsize=12)
-plt.suptitle('')  # Remove default title
-ax.grid(alpha=0.3)
-plt.tight_layout()
-plt.savefig(output_dir / 'odds_by_price.png', dpi=150)
-print(f"Saved: {output_dir / 'odds_by_price.png'}")
-plt.close()
-
-print()
-print("=" * 80)
-print("ANALYSIS COMPLETE - 3 visualizations generated in analysis-output/")
-print("=" * 80)
+if __name__ == '__main__':
+    main()
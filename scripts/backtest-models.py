@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Model Backtester
+Scores stored predictions against realized outcomes from
+historical_snapshots, optionally replays walk-forward training, and writes
+per-day metrics to the Supabase model_performance table.
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from oracle.db import connect
+from oracle.feature_cache import DEFAULT_CACHE_PATH, FeatureCache
+from oracle.backtest import (
+    HORIZON_DAYS, load_history, build_panel, evaluate_predictions, walk_forward,
+    to_performance_rows, save_performance,
+)
+
+WALK_FORWARD_VERSION = 'v1.0'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Backtest prediction accuracy against realized outcomes.')
+    parser.add_argument('--horizon-days', type=int, default=HORIZON_DAYS,
+                        help='Score each prediction against the outcome this many days later')
+    parser.add_argument('--days', type=int, default=365, help='History to load (days)')
+    parser.add_argument('--walk-forward', action='store_true',
+                        help='Also retrain-as-of each day and score the replayed predictions')
+    parser.add_argument('--step-days', type=int, default=1, help='Walk-forward: evaluate every N days')
+    parser.add_argument('--workers', type=int, default=None, help='Walk-forward processes (default: CPU count)')
+    parser.add_argument('--feature-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None,
+                        help=f'Reuse static features from a SQLite cache (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing to Supabase')
+    return parser.parse_args()
+
+
+def print_summary(label, metrics):
+    """Print averaged metrics per model version."""
+    if len(metrics) == 0:
+        print(f"[WARNING]  Warning: No {label} results (not enough history?)")
+        return
+    summary = metrics.groupby('model_version').agg(
+        days=('evaluation_date', 'nunique'),
+        games=('test_set_size', 'sum'),
+        mae=('mean_absolute_error', 'mean'),
+        rank_corr=('rank_correlation', 'mean'),
+        f1=('f1_score', 'mean'),
+    )
+    print(f"\n{label}:")
+    print(summary.round(4).to_string())
+
+
+def main():
+    """Main backtesting pipeline."""
+    args = parse_args()
+    horizon = args.horizon_days
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE MODEL BACKTESTER")
+    print("=" * 70)
+    print(f"Horizon: {horizon} days, history: {args.days} days")
+    print(f"Walk-forward: {'yes' if args.walk_forward else 'no'}")
+    print()
+
+    try:
+        supabase = connect()
+        since = datetime.utcnow().date() - timedelta(days=args.days)
+
+        # Step 1: Bulk-load history
+        start = time.perf_counter()
+        print("\n[FETCH] Fetching games, snapshots and predictions...")
+        games, snapshots, predictions = load_history(supabase, since)
+        print(f"[OK] Fetched {len(games)} games, {len(snapshots)} snapshots, "
+              f"{len(predictions)} predictions ({time.perf_counter() - start:.1f}s)")
+
+        if len(snapshots) == 0:
+            print("[ERROR] ERROR: No historical snapshots to score against!")
+            sys.exit(1)
+
+        # Step 2: Daily outcome panel
+        start = time.perf_counter()
+        if args.feature_cache:
+            with FeatureCache(args.feature_cache) as cache:
+                panel = build_panel(games, snapshots, horizon, cache=cache)
+        else:
+            panel = build_panel(games, snapshots, horizon)
+        print(f"[OK] Built outcome panel: {len(panel)} game-days, "
+              f"{panel['label'].notna().sum()} with a {horizon}-day outcome "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        rows = []
+        notes = f'backtest horizon={horizon}d'
+
+        # Step 3: Stored predictions
+        if len(predictions):
+            metrics = evaluate_predictions(predictions, panel)
+            print_summary('Stored predictions', metrics)
+            rows += to_performance_rows(metrics, notes=notes)
+
+        # Step 4: Walk-forward replay
+        if args.walk_forward:
+            days = pd.Series(panel.loc[panel['label'].notna(), 'day'].unique()).sort_values()
+            days = days.iloc[::args.step_days]
+            print(f"\n[TRAIN] Replaying {len(days)} days on {args.workers or os.cpu_count()} workers...")
+
+            start = time.perf_counter()
+            version = f'{WALK_FORWARD_VERSION}-walkforward-{horizon}d'
+            metrics = walk_forward(panel, days, horizon, args.workers)
+            print(f"[OK] Walk-forward done ({time.perf_counter() - start:.1f}s)")
+            if len(metrics):
+                metrics['model_version'] = version
+            print_summary('Walk-forward', metrics)
+            rows += to_performance_rows(metrics, notes=notes) if len(metrics) else []
+
+        if args.dry_run:
+            print(f"\n[SKIP] Dry run - not writing {len(rows)} model_performance rows")
+        else:
+            written = save_performance(supabase, rows)
+            print(f"\n[SAVE] Saved {written} model_performance rows")
+
+        print("\n" + "=" * 70)
+        print("[OK] BACKTEST COMPLETE!")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
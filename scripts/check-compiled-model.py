@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Compiled Model Check
+Rerunnable parity check of oracle/compiled_model.py against xgboost on
+small synthetic models, covering the cases the export-time gate in
+train-model.py only sees by chance:
+- NaN routing, with default directions learned both ways
+- ensembles mixing tree depths (shallow trees padded, single-leaf trees)
+- values exactly on split thresholds
+- empty batches
+- .npz save/load round trip
+- TreeSHAP contributions against pred_contribs
+Exits 1 if any check fails.
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import xgboost as xgb
+
+from oracle.compiled_model import PARITY_TOLERANCE, CompiledTrees, load_compiled, parity_error
+
+N_FEATURES = 5
+
+
+def synthetic_data(n, seed, missing_rate=0.2):
+    """Features with NaNs (high values missing in column 0, low ones in 1, so defaults go both ways)."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, N_FEATURES)).astype(np.float32)
+    y = 3 * X[:, 0] - 2 * X[:, 1] + X[:, 2] * X[:, 3] + rng.normal(scale=0.1, size=n)
+    X[(X[:, 0] > 0.5) & (rng.random(n) < missing_rate * 3), 0] = np.nan
+    X[(X[:, 1] < -0.5) & (rng.random(n) < missing_rate * 3), 1] = np.nan
+    X[rng.random((n, N_FEATURES)) < missing_rate / 4] = np.nan
+    return X, y
+
+
+def fit(X, y, **params):
+    model = xgb.XGBRegressor(n_estimators=params.pop('n_estimators', 30), random_state=0, n_jobs=1, **params)
+    model.fit(X, y)
+    return model
+
+
+def scoring_rows(X, compiled):
+    """Held-out rows plus all-NaN rows and rows sitting exactly on split thresholds."""
+    rows = [X, np.full((4, N_FEATURES), np.nan, dtype=np.float32)]
+    real = compiled.cover[:, 2 * np.arange(compiled.n_internal) + 2] > 0
+    features, thresholds = compiled.feature[real], compiled.threshold[real]
+    on_threshold = np.tile(np.nanmedian(X, axis=0), (len(features), 1)).astype(np.float32)
+    on_threshold[np.arange(len(features)), features] = thresholds
+    rows.append(on_threshold)
+    return np.concatenate(rows)
+
+
+def check(label, error, results, tolerance=PARITY_TOLERANCE):
+    ok = error <= tolerance
+    results.append(ok)
+    print(f"{'[OK]' if ok else '[ERROR] ERROR:'} {label}: max error {error:.2e}")
+
+
+def contribution_error(compiled, model, X):
+    booster = model.get_booster()
+    expected = booster.predict(xgb.DMatrix(X), pred_contribs=True)
+    return float(np.max(np.abs(compiled.contributions(X) - expected))) if len(X) else 0.0
+
+
+def main():
+    """Run every check."""
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE COMPILED MODEL CHECK")
+    print("=" * 70)
+    print(f"xgboost {xgb.__version__}, tolerance {PARITY_TOLERANCE}")
+    print()
+
+    try:
+        results = []
+        X_train, y_train = synthetic_data(2_000, seed=1)
+        X_test, _ = synthetic_data(500, seed=2)
+
+        # Single models: depth 1 to 6, NaNs in training and scoring
+        for depth in (1, 3, 6):
+            model = fit(X_train, y_train, max_depth=depth)
+            compiled = CompiledTrees.from_booster(model)
+            X = scoring_rows(X_test, compiled)
+            check(f"depth {depth}: predict on {len(X)} rows (NaN, on-threshold)",
+                  parity_error(compiled, model, X), results)
+            check(f"depth {depth}: contributions", contribution_error(compiled, model, X), results)
+
+        # Trees that stop early (gamma prunes most splits, some trees are a single leaf)
+        pruned = fit(X_train, y_train, max_depth=6, gamma=50.0, n_estimators=40)
+        compiled = CompiledTrees.from_booster(pruned)
+        X = scoring_rows(X_test, compiled)
+        check(f"pruned trees padded to depth {compiled.depth}: predict", parity_error(compiled, pruned, X), results)
+        check("pruned trees: contributions", contribution_error(compiled, pruned, X), results)
+
+        # Grouped ensemble mixing depths: every group against its own booster
+        boosters = [fit(X_train, y_train, max_depth=depth, n_estimators=10 + depth) for depth in (4, 1, 2, 6)]
+        ensemble = CompiledTrees.from_boosters(boosters)
+        X = scoring_rows(X_test, ensemble)
+        scores = ensemble.predict_groups(X)
+        for group, booster in enumerate(boosters):
+            check(f"ensemble group {group} (depth {booster.max_depth} padded to {ensemble.depth})",
+                  float(np.max(np.abs(scores[:, group] - booster.predict(X)))), results)
+
+        # Empty batch
+        empty = np.empty((0, N_FEATURES), dtype=np.float32)
+        shapes_ok = (ensemble.predict(empty).shape == (0,) and ensemble.predict_groups(empty).shape == (0, 4)
+                     and ensemble.contributions(empty).shape == (0, N_FEATURES + 1))
+        results.append(shapes_ok)
+        print(f"{'[OK]' if shapes_ok else '[ERROR] ERROR:'} empty batch: predict, predict_groups, contributions shapes")
+
+        # Save / load round trip
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.npz')
+            ensemble.save(path, {'feature_cols': [f'f{i}' for i in range(N_FEATURES)]})
+            loaded = load_compiled(path)['ensemble']
+        check("save/load round trip", float(np.max(np.abs(loaded.predict_groups(X) - scores))), results, tolerance=0.0)
+
+        print()
+        if not all(results):
+            print(f"[ERROR] ERROR: {results.count(False)} of {len(results)} checks failed")
+            sys.exit(1)
+        print(f"[OK] All {len(results)} checks passed")
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
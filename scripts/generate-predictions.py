@@ -7,13 +7,29 @@ Writes results to Supabase predictions table.
 
 import os
 import sys
+import time
 import pickle
-from datetime import datetime, date
+import asyncio
+import argparse
+from datetime import date
 import numpy as np
 import pandas as pd
-from supabase import create_client
 from dotenv import load_dotenv
 
+from oracle.compiled_model import load_compiled
+from oracle.db import LOCAL_DB_PATH, SUPABASE_URL, connect, fetch_all
+from oracle.feature_cache import FeatureCache
+from oracle.pipeline import FETCH_CONCURRENCY, WRITE_CONCURRENCY, QUEUE_SIZE, run_pipeline
+from oracle.predictions import RECOMMENDATIONS, predict_games, summarize, save_prediction_records
+from oracle.quality import BLOCK, OFF, QUALITY_GATE, WARN, QualityError, QualityMonitor, blocking
+from oracle.ranking import RISK_PROFILES, RankingIndex
+from oracle.schema import apply_schema
+from oracle.shadow import (
+    REGISTRY_PATH, agreement_report, largest_diffs, load_registry, load_shadow_packages, predict_models,
+    save_model_predictions,
+)
+from oracle.snapshots import save_snapshots
+
 # Load environment variables
 load_dotenv()
 
@@ -21,49 +37,54 @@ load_dotenv()
 # Configuration
 # =====================================================
 
-SUPABASE_URL = os.getenv('EXPO_PUBLIC_SUPABASE_URL')
-SUPABASE_KEY = os.getenv('EXPO_PUBLIC_SUPABASE_ANON_KEY')
 MODEL_PATH = 'models/lottery_predictor.pkl'
+COMPILED_MODEL_PATH = 'models/lottery_predictor.npz'
+# Budget and count for the per-risk-profile top picks shown after scoring
+TOP_PICKS_BUDGET = 20
+TOP_PICKS = 3
+# Optional SQLite feature cache (e.g. models/feature_cache.sqlite); unset = compute every run
+FEATURE_CACHE_PATH = os.getenv('FEATURE_CACHE_PATH')
 
 print("=" * 70)
 print("[SLOT] SCRATCH ORACLE PREDICTION GENERATOR")
 print("=" * 70)
 print(f"Model: {MODEL_PATH}")
-print(f"Supabase URL: {SUPABASE_URL}")
+print(f"Database: {LOCAL_DB_PATH or SUPABASE_URL}")
 print()
 
 # Validate configuration
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("[ERROR] ERROR: Missing Supabase credentials in .env file")
-    sys.exit(1)
-
-if not os.path.exists(MODEL_PATH):
+if not os.path.exists(MODEL_PATH) and not os.path.exists(COMPILED_MODEL_PATH):
     print(f"[ERROR] ERROR: Model file not found at {MODEL_PATH}")
     print("   Please run: npm run train-model")
     sys.exit(1)
 
-# Create Supabase client
-try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("[OK] Connected to Supabase")
-except Exception as e:
-    print(f"[ERROR] Failed to connect to Supabase: {e}")
-    sys.exit(1)
-
 # =====================================================
 # Model Loading
 # =====================================================
 
+def use_compiled_model():
+    """Prefer the compiled export unless the pickled model is newer."""
+    if not os.path.exists(COMPILED_MODEL_PATH):
+        return False
+    if not os.path.exists(MODEL_PATH):
+        return True
+    return os.path.getmtime(COMPILED_MODEL_PATH) >= os.path.getmtime(MODEL_PATH)
+
 def load_model():
-    """Load trained model from disk."""
-    print(f"\n[LOAD] Loading model from {MODEL_PATH}...")
+    """Load trained model from disk (compiled NumPy export when available)."""
+    path = COMPILED_MODEL_PATH if use_compiled_model() else MODEL_PATH
+    print(f"\n[LOAD] Loading model from {path}...")
     try:
-        with open(MODEL_PATH, 'rb') as f:
-            model_package = pickle.load(f)
+        if path == COMPILED_MODEL_PATH:
+            model_package = load_compiled(path)
+        else:
+            with open(path, 'rb') as f:
+                model_package = pickle.load(f)
 
         print(f"[OK] Model loaded successfully")
         print(f"   Version: {model_package.get('version', 'unknown')}")
         print(f"   Trained: {model_package.get('trained_at', 'unknown')}")
+        print(f"   Framework: {model_package.get('framework', 'unknown')}")
         print(f"   Test R²: {model_package.get('metrics', {}).get('test_r2', 'N/A'):.4f}")
         print(f"   Features: {len(model_package.get('feature_cols', []))}")
 
@@ -72,16 +93,26 @@ def load_model():
         print(f"[ERROR] Error loading model: {e}")
         raise
 
+def load_shadow_models(model_package):
+    """Load every registered model other than the primary one."""
+    print(f"\n[LOAD] Loading shadow models from {REGISTRY_PATH}...")
+    registry = load_registry()
+    shadows = load_shadow_packages(model_package.get('version', 'v1.0'), registry)
+    for version, package in shadows.items():
+        print(f"[OK] {version}: {registry[version]} (test R²: {package.get('metrics', {}).get('test_r2', 0):.4f})")
+    if not shadows:
+        print(f"[WARNING]  Warning: No shadow models registered besides {model_package.get('version', 'v1.0')}")
+    return shadows
+
 # =====================================================
 # Data Fetching
 # =====================================================
 
-def fetch_games():
+def fetch_games(supabase):
     """Fetch all active games from Supabase."""
     print("\n[FETCH] Fetching games from Supabase...")
     try:
-        response = supabase.table('games').select('*').eq('is_active', True).execute()
-        games = pd.DataFrame(response.data)
+        games = apply_schema(fetch_all(supabase, 'games', filters=[('eq', 'is_active', True)]), 'games')
         print(f"[OK] Fetched {len(games)} active games")
         return games
     except Exception as e:
@@ -89,305 +120,234 @@ def fetch_games():
         raise
 
 # =====================================================
-# Feature Engineering (must match training)
+# Database Write
 # =====================================================
 
-def parse_odds(odds_string):
-    """Parse '1 in 3.5' to float 0.286."""
-    if not odds_string or pd.isna(odds_string):
-        return 0
-    try:
-        if 'in' in str(odds_string).lower():
-            parts = str(odds_string).split('in')
-            denominator = float(parts[1].strip())
-            return 1.0 / denominator if denominator > 0 else 0
-        return float(odds_string)
-    except:
-        return 0
-
-def calculate_days_since(date_str):
-    """Calculate days since a date string."""
-    if not date_str or pd.isna(date_str):
-        return 999
-    try:
-        if isinstance(date_str, str):
-            date_obj = pd.to_datetime(date_str)
-        else:
-            date_obj = date_str
-        return (datetime.now(date_obj.tzinfo if date_obj.tzinfo else None) - date_obj).days
-    except:
-        return 999
-
-def engineer_features(game):
-    """
-    Create feature vector for a single game.
-    MUST MATCH THE TRAINING FEATURE ENGINEERING!
-    """
-    # Basic game info
-    ticket_price = game.get('ticket_price', 0)
-    top_prize = game.get('top_prize_amount', 0)
-    remaining_prizes = game.get('remaining_top_prizes', 0)
-    total_prizes = game.get('total_top_prizes', 1)
-
-    # Feature calculations (same as training)
-    prize_concentration = remaining_prizes / total_prizes if total_prizes > 0 else 0
-    ev = (top_prize / ticket_price) * prize_concentration if ticket_price > 0 else 0
-    depletion_rate = 1.0 - prize_concentration
-
-    game_start = game.get('game_start_date')
-    days_since_launch = calculate_days_since(game_start)
-
-    last_scraped = game.get('last_scraped_at')
-    recency = calculate_days_since(last_scraped)
-
-    odds = parse_odds(game.get('overall_odds'))
-    velocity = depletion_rate
-    prize_to_price = top_prize / ticket_price if ticket_price > 0 else 0
-
-    return {
-        'ticket_price': ticket_price,
-        'ev': ev,
-        'prize_concentration': prize_concentration,
-        'depletion_rate': depletion_rate,
-        'days_since_launch': days_since_launch,
-        'recency': recency,
-        'odds': odds,
-        'velocity': velocity,
-        'prize_to_price': prize_to_price,
-        'remaining_prizes': remaining_prizes,
-        'total_prizes': total_prizes
-    }
-
-# =====================================================
-# Prediction Generation
-# =====================================================
+def save_predictions(supabase, records, model_package):
+    """Save prediction records to Supabase predictions table."""
+    print(f"\n[SAVE] Saving {len(records)} predictions to Supabase...")
 
-def generate_prediction(game, model_package):
-    """Generate prediction for a single game."""
-    model = model_package['model']
-    feature_cols = model_package['feature_cols']
+    if len(records) == 0:
+        print("[ERROR] No valid predictions to save!")
+        return
 
     try:
-        # Engineer features
-        features = engineer_features(game)
-
-        # Create feature vector in correct order
-        X = np.array([[features[col] for col in feature_cols]])
-
-        # Predict AI score
-        ai_score = float(model.predict(X)[0])
-        ai_score = max(0, min(100, ai_score))  # Clamp to 0-100
-
-        # Calculate confidence based on data quality
-        # High confidence if recent data and good prize info
-        data_quality_factors = []
-
-        # Factor 1: Data recency (higher = better)
-        if features['recency'] <= 1:
-            data_quality_factors.append(100)
-        elif features['recency'] <= 7:
-            data_quality_factors.append(80)
-        elif features['recency'] <= 30:
-            data_quality_factors.append(50)
-        else:
-            data_quality_factors.append(20)
-
-        # Factor 2: Prize data completeness
-        if features['remaining_prizes'] > 0 and features['total_prizes'] > 0:
-            data_quality_factors.append(100)
-        else:
-            data_quality_factors.append(30)
-
-        # Factor 3: Model confidence (based on test R²)
-        model_r2 = model_package.get('metrics', {}).get('test_r2', 0)
-        data_quality_factors.append(min(model_r2 * 100, 100))
-
-        confidence = np.mean(data_quality_factors)
-
-        # Calculate win probability (derived from EV and prize concentration)
-        # This is a simplified probability estimate
-        win_probability = min(features['ev'] * features['prize_concentration'] / 10, 1.0)
-
-        # Generate recommendation based on AI score and confidence
-        recommendation = get_recommendation(ai_score, confidence)
+        # Upsert (insert or update if exists)
+        # Note: This requires appropriate RLS policies
+        written = save_prediction_records(
+            supabase, records, date.today().isoformat(),
+            model_package.get('version', 'v1.0'), model_package['feature_cols'],
+        )
 
-        # Generate reasoning
-        reasoning = generate_reasoning(game, features, ai_score, confidence)
+        print(f"[OK] Successfully saved {written} predictions")
+        print_summary(records)
 
-        return {
-            'game_id': game['id'],
-            'prediction_date': date.today().isoformat(),
-            'ai_score': round(ai_score, 2),
-            'win_probability': round(win_probability, 6),
-            'expected_value': round(features['ev'], 4),
-            'confidence_level': round(confidence, 2),
-            'model_version': model_package.get('version', 'v1.0'),
-            'features_used': feature_cols,
-            'recommendation': recommendation,
-            'reasoning': reasoning
-        }
+    except Exception as e:
+        print(f"[ERROR] Error saving predictions: {e}")
+        print_rls_help()
+        raise
 
+def save_all_predictions(supabase, predictions, packages):
+    """Save every model version's predictions in one bulk upsert."""
+    total = sum(len(records) for records in predictions.values())
+    print(f"\n[SAVE] Saving {total} predictions for {len(predictions)} models to Supabase...")
+    try:
+        written = save_model_predictions(supabase, predictions, packages, date.today().isoformat())
+        print(f"[OK] Successfully saved {written} predictions")
     except Exception as e:
-        print(f"[WARNING]  Warning: Error generating prediction for {game.get('game_name', 'unknown')}: {e}")
-        return None
-
-def get_recommendation(ai_score, confidence):
-    """
-    Generate recommendation based on AI score and confidence.
-
-    Recommendation levels:
-    - strong_buy: Score >= 75 and confidence >= 70
-    - buy: Score >= 60 and confidence >= 60
-    - neutral: Score 40-60 or low confidence
-    - avoid: Score < 40 and confidence >= 60
-    - strong_avoid: Score < 25 and confidence >= 70
-    """
-    if confidence < 50:
-        return 'neutral'  # Low confidence = neutral recommendation
-
-    if ai_score >= 75 and confidence >= 70:
-        return 'strong_buy'
-    elif ai_score >= 60 and confidence >= 60:
-        return 'buy'
-    elif ai_score >= 40:
-        return 'neutral'
-    elif ai_score >= 25 and confidence >= 60:
-        return 'avoid'
-    elif ai_score < 25 and confidence >= 70:
-        return 'strong_avoid'
-    else:
-        return 'neutral'
-
-def generate_reasoning(game, features, ai_score, confidence):
-    """Generate human-readable reasoning for prediction."""
-    reasons = []
-
-    # EV analysis
-    if features['ev'] > 1.0:
-        reasons.append(f"Strong expected value ({features['ev']:.2f}x)")
-    elif features['ev'] > 0.7:
-        reasons.append(f"Decent expected value ({features['ev']:.2f}x)")
-    elif features['ev'] < 0.3:
-        reasons.append(f"Low expected value ({features['ev']:.2f}x)")
-
-    # Prize concentration
-    if features['prize_concentration'] > 0.8:
-        reasons.append(f"High prize availability ({features['prize_concentration']*100:.0f}%)")
-    elif features['prize_concentration'] > 0.5:
-        reasons.append(f"Moderate prize availability ({features['prize_concentration']*100:.0f}%)")
-    elif features['prize_concentration'] < 0.2:
-        reasons.append(f"Low prize availability ({features['prize_concentration']*100:.0f}%)")
-
-    # Activity
-    if 0.2 < features['depletion_rate'] < 0.6:
-        reasons.append("Active game with good turnover")
-    elif features['depletion_rate'] < 0.1:
-        reasons.append("New or slow-moving game")
-    elif features['depletion_rate'] > 0.8:
-        reasons.append("Game nearing end of life")
-
-    # Data quality
-    if features['recency'] <= 1:
-        reasons.append("Fresh data (updated today)")
-    elif features['recency'] > 7:
-        reasons.append(f"Data is {features['recency']} days old")
-
-    # Confidence note
-    if confidence < 60:
-        reasons.append(f"Low confidence ({confidence:.0f}%) - limited data")
-
-    if not reasons:
-        reasons.append("Based on mathematical analysis")
-
-    return " | ".join(reasons)
+        print(f"[ERROR] Error saving predictions: {e}")
+        print_rls_help()
+        raise
+
+def print_agreement(games, predictions, primary):
+    """Agreement of each shadow model with the primary one, and its largest score moves."""
+    print(f"\n[STATS] Shadow model agreement with {primary}:")
+    report = agreement_report(predictions, primary)
+    overlap = [column for column in report.columns if column.endswith('_overlap')][0]
+    for row in report.to_dict('records'):
+        print(f"  {row['model_version']}: mean |diff| {row['mean_abs_diff']:.2f} (max {row['max_abs_diff']:.2f}, "
+              f"bias {row['mean_score_diff']:+.2f}), rank corr {row['rank_correlation']:.3f}, "
+              f"same recommendation {row['recommendation_agreement']:.1%} "
+              f"({row['upgraded']} up, {row['downgraded']} down), {overlap.replace('_', ' ')} {row[overlap]:.0%}")
+        for diff in largest_diffs(games, predictions, primary, row['model_version']).itertuples():
+            print(f"    {str(diff.game_name)[:36]:36s} {diff.primary_score:5.1f} -> {diff.shadow_score:5.1f}  "
+                  f"{diff.primary_recommendation} -> {diff.shadow_recommendation}")
+
+def print_rls_help():
+    """Hints for row-level security failures on write."""
+    print("\nNote: If you see RLS policy errors, you may need to:")
+    print("  1. Use the service role key (not anon key)")
+    print("  2. Or disable RLS on the predictions table temporarily")
+    print("  3. Or add an RLS policy that allows anon inserts")
+
+def print_summary(records):
+    """Show score statistics and the recommendation breakdown."""
+    summary = summarize(records)
+    print(f"\nPrediction Summary:")
+    print(f"  Average AI Score: {summary['mean']:.2f}")
+    print(f"  Min/Max Scores: {summary['min']:.2f} / {summary['max']:.2f}")
+
+    # Recommendation breakdown
+    for rec_type, count in summary['recommendations'].items():
+        if count > 0:
+            print(f"  {rec_type}: {count}")
+
+def print_predictions(games, records):
+    """One line per game: name, score and recommendation."""
+    names = games.get('game_name', pd.Series('Unknown', index=games.index)).fillna('Unknown')
+    labels = np.array(RECOMMENDATIONS)[records['recommendation']]
+    for game_name, score, rec in zip(names.tolist(), records['ai_score'].tolist(), labels.tolist()):
+        print(f"  [OK] {game_name[:40]:40s} -> Score: {score:5.1f} | {rec}")
+
+def print_top_picks(games, records, budget=TOP_PICKS_BUDGET, k=TOP_PICKS):
+    """Top games at or under the budget for each risk profile (see oracle/ranking.py)."""
+    index = RankingIndex.from_records(games, records)
+    print(f"\nTop picks up to ${budget}:")
+    for risk in RISK_PROFILES:
+        picks = index.frame(index.top_k(k, budget, risk))
+        names = ', '.join(f"{row.game_name} (${row.ticket_price:g}, {row.ai_score:.1f})" for row in picks.itertuples())
+        print(f"  {risk:6s} risk: {names or '(none)'}")
 
 # =====================================================
-# Database Write
+# Data Quality
 # =====================================================
 
-def save_predictions(predictions):
-    """Save predictions to Supabase predictions table."""
-    print(f"\n[SAVE] Saving {len(predictions)} predictions to Supabase...")
+def report_quality(monitor):
+    """Print sentinel-rate and drift issues; returns whether to stop."""
+    print("\n[CHECK] Checking data quality...")
+    issues = monitor.check()
+    for level, message in issues:
+        print(f"[WARNING]  Warning: {message}" if level == WARN or QUALITY_GATE != BLOCK
+              else f"[ERROR] ERROR: {message}")
+    if not issues:
+        print(f"[OK] {monitor.rows} games passed data quality checks")
+    return blocking(issues)
 
-    # Filter out None values (failed predictions)
-    valid_predictions = [p for p in predictions if p is not None]
-
-    if len(valid_predictions) == 0:
-        print("[ERROR] No valid predictions to save!")
-        return
+# =====================================================
+# Pipeline Mode
+# =====================================================
 
+def run_pipelined(supabase, model_package, args, cache=None, monitor=None):
+    """Fetch, score and save with the stages overlapped (see oracle/pipeline.py)."""
+    print(f"\n[PREDICT] Pipelined run: {args.fetch_concurrency} fetchers, "
+          f"{args.write_concurrency} writers, queue size {args.queue_size}...")
+    start = time.perf_counter()
     try:
-        # Try to upsert (insert or update if exists)
-        # Note: This requires appropriate RLS policies
-        response = supabase.table('predictions').upsert(
-            valid_predictions,
-            on_conflict='game_id,prediction_date,model_version'
-        ).execute()
-
-        print(f"[OK] Successfully saved {len(valid_predictions)} predictions")
-
-        # Show summary statistics
-        scores = [p['ai_score'] for p in valid_predictions]
-        print(f"\nPrediction Summary:")
-        print(f"  Average AI Score: {np.mean(scores):.2f}")
-        print(f"  Min/Max Scores: {np.min(scores):.2f} / {np.max(scores):.2f}")
-
-        # Recommendation breakdown
-        recommendations = [p['recommendation'] for p in valid_predictions]
-        for rec_type in ['strong_buy', 'buy', 'neutral', 'avoid', 'strong_avoid']:
-            count = recommendations.count(rec_type)
-            if count > 0:
-                print(f"  {rec_type}: {count}")
-
+        games, records, written, busy = asyncio.run(run_pipeline(
+            supabase, model_package, date.today().isoformat(), cache=cache,
+            fetch_concurrency=args.fetch_concurrency, write_concurrency=args.write_concurrency,
+            queue_size=args.queue_size, monitor=monitor,
+        ))
+    except QualityError as e:
+        print(f"[ERROR] ERROR: Data quality checks failed, stopped the pipeline: {e}")
+        raise
     except Exception as e:
-        print(f"[ERROR] Error saving predictions: {e}")
-        print("\nNote: If you see RLS policy errors, you may need to:")
-        print("  1. Use the service role key (not anon key)")
-        print("  2. Or disable RLS on the predictions table temporarily")
-        print("  3. Or add an RLS policy that allows anon inserts")
+        print(f"[ERROR] Error in prediction pipeline: {e}")
+        print_rls_help()
         raise
 
+    print(f"[OK] Fetched, scored and saved {written} predictions in {time.perf_counter() - start:.1f}s "
+          f"(busy: fetch {busy['fetch']:.1f}s, score {busy['score']:.1f}s, write {busy['write']:.1f}s)")
+    return games, records
+
 # =====================================================
 # Main Execution
 # =====================================================
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate predictions for all active games.')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Overlap paged fetches, scoring and batched upserts (asyncio)')
+    parser.add_argument('--fetch-concurrency', type=int, default=FETCH_CONCURRENCY,
+                        help='Pipeline: page requests in flight')
+    parser.add_argument('--write-concurrency', type=int, default=WRITE_CONCURRENCY,
+                        help='Pipeline: concurrent upsert workers')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help='Pipeline: pages buffered between stages')
+    parser.add_argument('--shadow', action='store_true',
+                        help=f'Also score every model registered in {REGISTRY_PATH} and report agreement')
+    parser.add_argument('--skip-snapshots', action='store_true',
+                        help='Leave daily snapshots to save-snapshots.py (the pipeline runs it as its own stage)')
+    args = parser.parse_args()
+    if args.shadow and args.pipeline:
+        parser.error('--shadow is not supported with --pipeline')
+    return args
+
 def main():
     """Main prediction generation pipeline."""
+    args = parse_args()
+    cache = FeatureCache(FEATURE_CACHE_PATH) if FEATURE_CACHE_PATH else None
     try:
-        # Step 1: Load model
-        model_package = load_model()
-
-        # Step 2: Fetch games
-        games = fetch_games()
+        supabase = connect()
 
-        if len(games) == 0:
-            print("[ERROR] ERROR: No active games found!")
-            sys.exit(1)
-
-        # Step 3: Generate predictions
-        print(f"\n[PREDICT] Generating predictions for {len(games)} games...")
-        predictions = []
+        # Step 1: Load model (and any shadow models)
+        model_package = load_model()
+        primary = model_package.get('version', 'v1.0')
+        shadows = load_shadow_models(model_package) if args.shadow else {}
+
+        # Sentinel rates and drift against the model's training distribution
+        monitor = QualityMonitor(model_package.get('feature_profile')) if QUALITY_GATE != OFF else None
+
+        if args.pipeline:
+            # Steps 2-4 overlapped: fetch pages, score and save as they arrive
+            games, records = run_pipelined(supabase, model_package, args, cache, monitor)
+            if len(games) == 0:
+                print("[ERROR] ERROR: No active games found!")
+                sys.exit(1)
+            if monitor is not None:
+                report_quality(monitor)
+            print_predictions(games, records)
+            print_summary(records)
+        else:
+            # Step 2: Fetch games
+            games = fetch_games(supabase)
+
+            if len(games) == 0:
+                print("[ERROR] ERROR: No active games found!")
+                sys.exit(1)
+
+            # Step 3: Generate predictions (one batch for all games, one feature pass for all models)
+            print(f"\n[PREDICT] Generating predictions for {len(games)} games...")
+            if shadows:
+                packages = {primary: model_package, **shadows}
+                predictions = predict_models(games, packages, cache=cache, monitor=monitor)
+                records = predictions[primary]
+            else:
+                records = predict_games(games, model_package, cache=cache, monitor=monitor)
+            print_predictions(games, records)
+
+            if monitor is not None and report_quality(monitor):
+                print("[ERROR] ERROR: Data quality checks failed, not saving predictions "
+                      "(set ORACLE_QUALITY_GATE=warn to override)")
+                sys.exit(1)
+
+            # Step 4: Save to database
+            if shadows:
+                save_all_predictions(supabase, predictions, packages)
+                print_summary(records)
+                print_agreement(games, predictions, primary)
+            else:
+                save_predictions(supabase, records, model_package)
 
-        for idx, game in games.iterrows():
-            game_name = game.get('game_name', 'Unknown')
-            prediction = generate_prediction(game, model_package)
+        print_top_picks(games, records)
 
-            if prediction:
-                predictions.append(prediction)
-                score = prediction['ai_score']
-                rec = prediction['recommendation']
-                print(f"  [OK] {game_name[:40]:40s} -> Score: {score:5.1f} | {rec}")
-            else:
-                print(f"  [ERROR] {game_name[:40]:40s} -> Failed")
+        if cache is not None:
+            print(f"[OK] Feature cache: {len(cache)} entries at {FEATURE_CACHE_PATH}")
 
-        # Step 4: Save to database
-        save_predictions(predictions)
+        # Step 5: Record today's snapshot for every game (time-series history)
+        if not args.skip_snapshots:
+            print(f"\n[SAVE] Saving daily snapshots for {len(games)} games...")
+            try:
+                written, unchanged = save_snapshots(supabase, games, date.today())
+                print(f"[OK] Saved {written} snapshots ({unchanged} unchanged, skipped)")
+            except Exception as e:
+                print(f"[WARNING]  Warning: Error saving snapshots: {e}")
 
         # Success!
         print("\n" + "=" * 70)
         print("[OK] PREDICTION GENERATION COMPLETE!")
         print("=" * 70)
-        print(f"Generated predictions for {len(predictions)} games")
+        print(f"Generated predictions for {len(records)} games")
         print(f"Saved to predictions table with date: {date.today().isoformat()}")
         print()
         print("Next steps:")
@@ -401,6 +361,9 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
 
 if __name__ == '__main__':
     main()
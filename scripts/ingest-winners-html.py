@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Winners Page Ingestion
+Parses archived MN Lottery winners pages (saved HTML) into
+winning_tickets/games rows without live scraping. Optionally uploads new
+tickets to Supabase after retailer resolution and dedup.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+from oracle.winners_html import find_pages, parse_pages, to_tables
+
+DEFAULT_PAGES = ['mn-winners-*.html']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Parse archived winners pages.')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PAGES,
+                        help='HTML files, directories or globs (default: checked-in captures)')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    parser.add_argument('--output-dir', help='Write winning_tickets.csv and games.csv here')
+    parser.add_argument('--upload', action='store_true', help='Insert new tickets into Supabase')
+    parser.add_argument('--benchmark', type=int, metavar='ROUNDS',
+                        help='Parse the page list ROUNDS times, serial vs. process pool')
+    return parser.parse_args()
+
+
+def run_benchmark(pages, rounds, workers):
+    """Time serial and parallel parsing of the same page list."""
+    batch = pages * rounds
+    print(f"\n[BENCH] Parsing {len(batch)} pages ({len(pages)} captures x{rounds})...")
+
+    for label, n_workers in (('serial', 1), ('process pool', workers)):
+        start = time.perf_counter()
+        records, _ = parse_pages(batch, workers=n_workers)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:13s}: {elapsed:6.2f}s  {len(batch) / elapsed:8.1f} pages/s  "
+              f"{len(records) / elapsed:10.0f} rows/s")
+
+
+def upload(tickets):
+    """Resolve retailers, skip tickets already stored, and insert the rest."""
+    from oracle.db import connect, fetch_all, insert_batched
+    from oracle.ticket_normalizer import RetailerIndex, resolve_retailers, dedup_tickets
+
+    # game_number is NOT NULL in winning_tickets (lotto draws have none)
+    missing = tickets['game_number'].isna()
+    if missing.any():
+        print(f"[WARNING]  Skipping {missing.sum()} rows without a game number")
+    tickets = tickets[~missing & tickets['claimed_at'].notna()]
+    if len(tickets) == 0:
+        print("[OK] Nothing to upload")
+        return
+
+    supabase = connect()
+    retailers = fetch_all(supabase, 'retailers', columns='id,name,city,state')
+    existing = fetch_all(
+        supabase, 'winning_tickets',
+        columns='game_number,prize_amount,retailer_id,retailer_name,city,state,claimed_at',
+        filters=[('gte', 'claimed_at', tickets['claimed_at'].min().isoformat()),
+                 ('lte', 'claimed_at', (tickets['claimed_at'].max() + pd.Timedelta(days=1)).isoformat())],
+    )
+    print(f"[OK] Fetched {len(retailers)} retailers, {len(existing)} stored tickets in date range")
+    if len(existing):
+        existing['claimed_at'] = pd.to_datetime(existing['claimed_at'], errors='coerce')
+
+    index = RetailerIndex(retailers) if len(retailers) else None
+    candidates = pd.concat([existing.assign(stored=True), tickets.assign(stored=False)], ignore_index=True)
+    candidates['prize_amount'] = pd.to_numeric(candidates['prize_amount'])
+    candidates['retailer_id'] = candidates['retailer_id'].astype(object)
+    if index is not None:
+        candidates = resolve_retailers(candidates, index)
+    else:
+        candidates = candidates.assign(retailer_key=candidates['retailer_name'].str.lower())
+
+    # Stored rows sort first, so any new copy of a stored ticket is the duplicate
+    unique, _ = dedup_tickets(candidates.assign(order=~candidates['stored']), order_by='order')
+    new = unique[~unique['stored']]
+
+    columns = ['game_number', 'game_name', 'prize_tier', 'prize_amount', 'retailer_id',
+               'retailer_name', 'city', 'state', 'claimed_at', 'scrape_source', 'raw_data']
+    rows = new[columns].assign(
+        game_number=new['game_number'].astype(int),
+        claimed_at=new['claimed_at'].map(lambda ts: ts.isoformat()),
+    ).astype(object)
+    rows = rows.where(rows.notna(), None).to_dict('records')
+
+    written = insert_batched(supabase, 'winning_tickets', rows)
+    print(f"[SAVE] Inserted {written} new winning tickets ({len(tickets) - written} already stored)")
+
+
+def main():
+    """Main ingestion pipeline."""
+    args = parse_args()
+    pages = find_pages(args.paths)
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE WINNERS PAGE INGESTION")
+    print("=" * 70)
+    print(f"Pages: {len(pages)}")
+    print(f"Workers: {args.workers or os.cpu_count()}")
+    print()
+
+    if not pages:
+        print("[ERROR] ERROR: No HTML pages found")
+        sys.exit(1)
+
+    try:
+        if args.benchmark:
+            run_benchmark(pages, args.benchmark, args.workers)
+            return
+
+        start = time.perf_counter()
+        print("[PARSE] Parsing pages...")
+        records, counts = parse_pages(pages, workers=args.workers)
+        for page, count in counts.items():
+            print(f"  {os.path.basename(page)[:60]:60s} -> {count} rows")
+
+        tickets, games = to_tables(records) if records else (pd.DataFrame(), pd.DataFrame())
+        print(f"[OK] Parsed {len(tickets)} winning tickets, {len(games)} games "
+              f"({time.perf_counter() - start:.2f}s)")
+
+        if args.output_dir and len(tickets):
+            os.makedirs(args.output_dir, exist_ok=True)
+            tickets.drop(columns=['raw_data']).to_csv(os.path.join(args.output_dir, 'winning_tickets.csv'), index=False)
+            games.to_csv(os.path.join(args.output_dir, 'games.csv'), index=False)
+            print(f"[SAVE] Wrote CSVs to {args.output_dir}")
+
+        if args.upload and len(tickets):
+            print("\n[SAVE] Uploading to Supabase...")
+            upload(tickets)
+
+        print("\n" + "=" * 70)
+        print("[OK] INGESTION COMPLETE!")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Synthetic Data Loader
+Fills a local SQLite stand-in (oracle/local_backend.py) with deterministic
+synthetic games, prize tiers, historical snapshots and predictions, written
+through the same batched upsert path the jobs use. Optionally times paged
+fetches and upserts against it.
+
+Point the jobs at the result with ORACLE_LOCAL_DB=<path>.
+"""
+
+import os
+import sys
+import time
+import uuid
+import argparse
+from datetime import date
+import numpy as np
+import pandas as pd
+
+from oracle.db import PAGE_SIZE, fetch_all, fetch_page, upsert_batched
+from oracle.local_backend import LocalClient
+from oracle.predictions import RECOMMENDATIONS
+from oracle.schema import apply_schema, memory_bytes
+
+DEFAULT_DB_PATH = os.getenv('ORACLE_LOCAL_DB') or os.path.join('models', 'local.sqlite')
+
+# Games generated (and written) per chunk, to bound memory at millions of rows
+GAMES_PER_CHUNK = 200
+
+LOAD_BATCH_SIZE = 5000
+PRICES = np.array([1, 2, 3, 5, 10, 20, 30, 50])
+TIER_MULTIPLIERS = np.array([10_000, 1_000, 100, 20, 10, 5, 2, 1])
+MODEL_VERSION = 'v1.0-synthetic'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load synthetic data into a local SQLite stand-in.')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite file (default: ORACLE_LOCAL_DB or models/local.sqlite)')
+    parser.add_argument('--games', type=int, default=1000, help='Games to generate')
+    parser.add_argument('--tiers', type=int, default=8, help='Prize tiers per game (max 8)')
+    parser.add_argument('--snapshot-days', type=int, default=365, help='Daily snapshots per game')
+    parser.add_argument('--prediction-days', type=int, default=30, help='Daily predictions per game')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same rows)')
+    parser.add_argument('--batch-size', type=int, default=LOAD_BATCH_SIZE, help='Rows per upsert request')
+    parser.add_argument('--benchmark', action='store_true', help='Time paged fetches and upserts after loading')
+    parser.add_argument('--memory-benchmark', type=int, default=0, metavar='ROWS',
+                        help='Only compare frame memory with and without oracle/schema.py on ROWS-row tables '
+                             '(no database)')
+    return parser.parse_args()
+
+# =====================================================
+# Generators
+# =====================================================
+
+def game_ids(rng, n):
+    """Deterministic UUID strings."""
+    return np.array([str(uuid.UUID(bytes=rng.bytes(16), version=4)) for _ in range(n)], dtype=object)
+
+
+def make_games(rng, first, n, today):
+    """n games numbered from `first`."""
+    price = rng.choice(PRICES, n)
+    total_top = rng.integers(1, 21, n)
+    start = today - pd.to_timedelta(rng.integers(30, 730, n), unit='D')
+    return pd.DataFrame({
+        'id': game_ids(rng, n),
+        'game_number': [str(1000 + i) for i in range(first, first + n)],
+        'game_name': [f'Synthetic Game {i}' for i in range(first, first + n)],
+        'ticket_price': price,
+        'top_prize_amount': price * rng.choice([5_000, 10_000, 50_000], n),
+        'total_top_prizes': total_top,
+        'remaining_top_prizes': rng.integers(0, total_top + 1),
+        'overall_odds': [f'1 in {odds:.2f}' for odds in rng.uniform(2.5, 5.0, n)],
+        'game_start_date': start.strftime('%Y-%m-%d'),
+        'game_end_date': None,
+        'is_active': rng.random(n) < 0.9,
+        'total_tickets_printed': rng.integers(500_000, 10_000_000, n),
+        'state': rng.choice(['MN', 'FL'], n),
+        'last_scraped_at': (today - pd.to_timedelta(rng.integers(0, 3, n), unit='D')).strftime('%Y-%m-%dT06:00:00'),
+    })
+
+
+def make_tiers(rng, games, tiers):
+    """`tiers` prize levels per game, top prize first."""
+    n = len(games)
+    multiplier = np.tile(TIER_MULTIPLIERS[:tiers], n)
+    # Lower tiers have proportionally more prizes
+    total = rng.integers(1, 20, n * tiers) * (TIER_MULTIPLIERS[0] // multiplier)
+    return pd.DataFrame({
+        'id': game_ids(rng, n * tiers),
+        'game_id': games['id'].to_numpy().repeat(tiers),
+        'prize_amount': games['ticket_price'].to_numpy().repeat(tiers) * multiplier,
+        'total_prizes': total,
+        'remaining_prizes': (total * rng.uniform(0, 1, n * tiers)).astype(np.int64),
+        'odds': [f'1 in {odds:,.0f}' for odds in rng.uniform(5, 500, n * tiers) * multiplier],
+    })
+
+
+def make_snapshots(rng, games, days, today):
+    """One snapshot per game per day, top prizes claimed at random along the way."""
+    n = len(games)
+    dates = pd.date_range(end=today, periods=days)
+    total = games['total_top_prizes'].to_numpy()
+    claims = rng.random((n, days)) < 0.02
+    remaining = np.maximum(total[:, None] - np.cumsum(claims, axis=1), 0)
+    start = pd.to_datetime(games['game_start_date']).to_numpy()
+    launched = (dates.to_numpy()[None, :] - start[:, None]).astype('timedelta64[D]').astype(np.int64)
+    return pd.DataFrame({
+        'game_id': games['id'].to_numpy().repeat(days),
+        'snapshot_date': np.tile(dates.strftime('%Y-%m-%d').to_numpy(), n),
+        'remaining_top_prizes': remaining.ravel(),
+        'days_since_launch': np.maximum(launched, 0).ravel(),
+        'top_prize_depletion_rate': np.round(1 - remaining / np.maximum(total[:, None], 1), 4).ravel(),
+        'expected_value': np.round(rng.uniform(0.3, 1.2, n * days), 4),
+    })
+
+
+def make_predictions(rng, games, days, today):
+    """One prediction per game per day for MODEL_VERSION."""
+    n = len(games)
+    dates = pd.date_range(end=today, periods=days)
+    score = np.round(rng.uniform(0, 100, n * days), 2)
+    return pd.DataFrame({
+        'game_id': games['id'].to_numpy().repeat(days),
+        'prediction_date': np.tile(dates.strftime('%Y-%m-%d').to_numpy(), n),
+        'ai_score': score,
+        'ai_score_lower': np.round(np.maximum(score - 10, 0), 2),
+        'ai_score_upper': np.round(np.minimum(score + 10, 100), 2),
+        'win_probability': np.round(rng.uniform(0, 0.1, n * days), 6),
+        'expected_value': np.round(rng.uniform(0.3, 1.2, n * days), 4),
+        'confidence_level': np.round(rng.uniform(40, 95, n * days), 2),
+        'model_version': MODEL_VERSION,
+        'recommendation': np.array(RECOMMENDATIONS, dtype=object)[4 - np.digitize(score, [25, 40, 60, 75])],
+        'reasoning': 'Synthetic prediction',
+    })
+
+
+def to_rows(frame):
+    """DataFrame -> JSON-style row dicts (native Python values, NaN as None)."""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+# =====================================================
+# Load and Benchmark
+# =====================================================
+
+TABLES = (
+    # (table, on_conflict)
+    ('games', 'game_number'),
+    ('prize_tiers', 'id'),
+    ('historical_snapshots', 'game_id,snapshot_date'),
+    ('predictions', 'game_id,prediction_date,model_version'),
+)
+
+
+def load(client, args):
+    """Generate and upsert every table chunk by chunk; returns rows written per table."""
+    rng = np.random.default_rng(args.seed)
+    today = pd.Timestamp(date.today())
+    written = dict.fromkeys((table for table, _ in TABLES), 0)
+    tiers = min(args.tiers, len(TIER_MULTIPLIERS))
+
+    for first in range(0, args.games, GAMES_PER_CHUNK):
+        games = make_games(rng, first, min(GAMES_PER_CHUNK, args.games - first), today)
+        frames = {
+            'games': games,
+            'prize_tiers': make_tiers(rng, games, tiers),
+            'historical_snapshots': make_snapshots(rng, games, args.snapshot_days, today),
+            'predictions': make_predictions(rng, games, args.prediction_days, today),
+        }
+        for table, on_conflict in TABLES:
+            written[table] += upsert_batched(client, table, to_rows(frames[table]), on_conflict=on_conflict,
+                                             batch_size=args.batch_size)
+        print(f"  [OK] Games {first + len(games)}/{args.games}")
+
+    return written
+
+
+def benchmark(client, rows=50_000):
+    """Time paged reads of every table and an upsert of prediction rows."""
+    print(f"\n[BENCH] Paged fetches (page size {PAGE_SIZE})...")
+    for table, _ in TABLES:
+        start = time.perf_counter()
+        frame = fetch_all(client, table)
+        elapsed = time.perf_counter() - start
+        print(f"  {table:22s} {len(frame):>10,} rows  {elapsed:6.2f}s  {len(frame) / max(elapsed, 1e-9):>10,.0f} rows/s")
+
+    sample = pd.DataFrame(fetch_page(client, 'predictions', 0, page_size=rows))
+    sample = to_rows(sample.drop(columns=['id', 'created_at'], errors='ignore'))
+    start = time.perf_counter()
+    upsert_batched(client, 'predictions', sample, on_conflict='game_id,prediction_date,model_version')
+    elapsed = time.perf_counter() - start
+    print(f"  {'predictions upsert':22s} {len(sample):>10,} rows  {elapsed:6.2f}s  "
+          f"{len(sample) / max(elapsed, 1e-9):>10,.0f} rows/s")
+
+
+def memory_benchmark(rows, seed=42):
+    """Memory of ROWS-row games, prize_tiers and snapshot frames as fetched vs. after apply_schema()."""
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(date.today())
+    tiers = len(TIER_MULTIPLIERS)
+    snapshot_days = 365
+
+    print(f"\n[BENCH] Frame memory at {rows:,} rows per table (MB)...")
+    print(f"  {'table':22s} {'object str':>10s} {'fetched':>10s} {'schema':>10s}  reduction")
+    games = make_games(rng, 0, rows, today)
+    frames = {
+        'games': games,
+        'prize_tiers': make_tiers(rng, games.iloc[:-(-rows // tiers)], tiers).iloc[:rows],
+        'historical_snapshots': make_snapshots(rng, games.iloc[:-(-rows // snapshot_days)], snapshot_days,
+                                               today).iloc[:rows],
+    }
+    for table, frame in frames.items():
+        # Same construction as fetch_all(): a frame from JSON-style row dicts
+        fetched = pd.DataFrame(to_rows(frame))
+        # pandas < 3 keeps strings as Python objects
+        objects = fetched.astype({column: object for column in fetched.columns
+                                  if pd.api.types.is_string_dtype(fetched[column])})
+        before, strings = memory_bytes(objects), memory_bytes(fetched)
+        start = time.perf_counter()
+        after = memory_bytes(apply_schema(fetched, table))
+        elapsed = time.perf_counter() - start
+        print(f"  {table:22s} {before / 1e6:10.1f} {strings / 1e6:10.1f} {after / 1e6:10.1f}  "
+              f"{before / after:4.1f}x / {strings / after:4.1f}x  (apply_schema {elapsed:.2f}s)")
+
+# =====================================================
+# Main Execution
+# =====================================================
+
+def main():
+    """Main synthetic load."""
+    args = parse_args()
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE SYNTHETIC DATA LOADER")
+    print("=" * 70)
+    print(f"Database: {args.db}")
+    print(f"Games: {args.games}, tiers: {args.tiers}, snapshot days: {args.snapshot_days}, "
+          f"prediction days: {args.prediction_days}")
+    print()
+
+    try:
+        if args.memory_benchmark:
+            memory_benchmark(args.memory_benchmark, args.seed)
+            return
+
+        directory = os.path.dirname(args.db)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        client = LocalClient(args.db)
+
+        print("[SAVE] Loading synthetic rows...")
+        start = time.perf_counter()
+        written = load(client, args)
+        elapsed = time.perf_counter() - start
+        total = sum(written.values())
+        print(f"[OK] Wrote {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+        for table, count in written.items():
+            print(f"  {table}: {count:,}")
+
+        if args.benchmark:
+            benchmark(client)
+
+        client.close()
+
+        print("\n" + "=" * 70)
+        print("[OK] SYNTHETIC LOAD COMPLETE!")
+        print("=" * 70)
+        print(f"Run the jobs against it with: ORACLE_LOCAL_DB={args.db}")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
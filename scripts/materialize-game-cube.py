@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Game Cube Materializer
+Incrementally maintains the Parquet aggregate cube over games
+(state x price tier x launch week x status, see oracle/cube.py), folding
+in only games scraped after the last watermark.
+"""
+
+import sys
+import time
+import argparse
+
+from oracle.db import connect
+from oracle.cube import (
+    CUBE_PATH, ROWS_PATH, load_state, save_state, run_incremental, run_full_rebuild, compare_cubes, rollup,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Materialize the games aggregate cube to Parquet.')
+    parser.add_argument('--full-rebuild', action='store_true', help='Rebuild the cube from every game')
+    parser.add_argument('--verify', action='store_true',
+                        help='Compare the incremental cube against a full rebuild (no writes)')
+    parser.add_argument('--dry-run', action='store_true', help='Compute without writing')
+    parser.add_argument('--cube-path', default=CUBE_PATH)
+    parser.add_argument('--rows-path', default=ROWS_PATH)
+    return parser.parse_args()
+
+
+def print_best_by_tier(cube):
+    """Best-EV active game per price tier, read from the cube."""
+    best = rollup(cube, by=['price_tier'], status='active')
+    if len(best) == 0:
+        return
+    print("\n[STATS] Best active game per price tier:")
+    for price_tier, row in best.iterrows():
+        print(f"  ${price_tier:>5.0f}: {row['best_ev_game_name']} (EV {row['ev_max']:.2f}, "
+              f"mean EV {row['ev_sum'] / row['games']:.2f} over {row['games']} games)")
+
+
+def main():
+    """Main game cube pipeline."""
+    args = parse_args()
+    mode = 'verify' if args.verify else 'full rebuild' if args.full_rebuild else 'incremental'
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE GAME CUBE MATERIALIZER")
+    print("=" * 70)
+    print(f"Mode: {mode}")
+    print(f"Cube: {args.cube_path}")
+    print()
+
+    try:
+        supabase = connect()
+
+        if args.verify:
+            print("\n[VERIFY] Applying new games to incremental cube (not saved)...")
+            state = load_state(args.cube_path, args.rows_path)
+            run_incremental(supabase, state)
+
+            print("[VERIFY] Rebuilding from all games...")
+            rebuilt, n_games = run_full_rebuild(supabase)
+            mismatched = compare_cubes(state['cube'], rebuilt['cube'])
+
+            print(f"[OK] Compared {len(rebuilt['cube'])} cells from {n_games} games")
+            if mismatched:
+                print(f"[ERROR] {len(mismatched)} cells differ from full rebuild:")
+                for cell in mismatched[:20]:
+                    print(f"  {cell}")
+                sys.exit(1)
+            print("[OK] Incremental cube matches full rebuild")
+            return
+
+        start = time.perf_counter()
+        if args.full_rebuild:
+            print("\n[BUILD] Rebuilding cube from all games...")
+            state, n_games = run_full_rebuild(supabase)
+            n_cells = len(state['cube'])
+        else:
+            state = load_state(args.cube_path, args.rows_path)
+            print(f"\n[FETCH] Fetching games scraped after watermark {state['watermark'] or '(none)'}...")
+            n_games, n_cells = run_incremental(supabase, state)
+        print(f"[OK] Processed {n_games} games, {n_cells} cells recomputed, {len(state['cube'])} cells total "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        print_best_by_tier(state['cube'])
+
+        if args.dry_run:
+            print("\n[SKIP] Dry run - not writing the cube")
+        elif n_games > 0 or args.full_rebuild:
+            save_state(state, args.cube_path, args.rows_path)
+            print(f"\n[SAVE] Cube saved (watermark: {state['watermark']})")
+
+        print("\n" + "=" * 70)
+        print("[OK] GAME CUBE COMPLETE!")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
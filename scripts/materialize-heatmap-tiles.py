@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Heat Map Tile Materializer
+Incrementally maintains the Supabase heatmap_tiles table from
+winning_tickets and retailer coordinates, rewriting only the tiles that
+new wins (or moved retailers) fall in.
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime
+
+from oracle.db import connect
+from oracle.heatmap_tiles import (
+    STATE_PATH, MIN_ZOOM, MAX_ZOOM, load_state, save_state, run_incremental, run_full_rebuild,
+    build_tiles, compare_tiles, save_tiles,
+)
+from oracle.retailer_stats import waiting_tickets
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Materialize heatmap_tiles from winning_tickets.')
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help='Rebuild state from every ticket and rewrite all tiles')
+    parser.add_argument('--verify', action='store_true',
+                        help='Compare incremental tiles against a full rebuild (no writes)')
+    parser.add_argument('--dry-run', action='store_true', help='Compute without writing')
+    parser.add_argument('--state-path', default=STATE_PATH)
+    return parser.parse_args()
+
+
+def main():
+    """Main heat map tile pipeline."""
+    args = parse_args()
+    mode = 'verify' if args.verify else 'full rebuild' if args.full_rebuild else 'incremental'
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE HEAT MAP TILE MATERIALIZER")
+    print("=" * 70)
+    print(f"Mode: {mode}")
+    print(f"Zoom levels: {MIN_ZOOM}-{MAX_ZOOM}")
+    print(f"State: {args.state_path}")
+    print()
+
+    try:
+        supabase = connect()
+        now = datetime.utcnow()
+
+        if args.verify:
+            print("\n[VERIFY] Applying new tickets to incremental state (not saved)...")
+            state = load_state(args.state_path)
+            run_incremental(supabase, state, now)
+            incremental, _ = build_tiles(state)
+            waiting = waiting_tickets(supabase, state)
+            print(f"[OK] Watermark {state['watermark']}, {waiting} tickets above it awaiting a retailer")
+
+            print("[VERIFY] Rebuilding from all tickets...")
+            rebuilt_state, n_tickets, rebuilt = run_full_rebuild(supabase, now)
+            mismatched = compare_tiles(incremental, rebuilt)
+
+            print(f"[OK] Compared {len(rebuilt)} tiles from {n_tickets} tickets")
+            # Tickets resolved after the watermark had passed them never reach the state
+            missing = int(rebuilt_state['retailers']['wins'].sum() - state['retailers']['wins'].sum())
+            if missing:
+                print(f"[ERROR] {missing} resolved tickets are counted by the rebuild but not the incremental state")
+                sys.exit(1)
+            if mismatched:
+                print(f"[ERROR] {len(mismatched)} tiles differ from full rebuild:")
+                for quadkey in mismatched[:20]:
+                    print(f"  {quadkey}")
+                sys.exit(1)
+            print("[OK] Incremental tiles match full rebuild")
+            return
+
+        start = time.perf_counter()
+        emptied = []
+        if args.full_rebuild:
+            print("\n[BUILD] Rebuilding state from all winning tickets...")
+            state, n_tickets, rows = run_full_rebuild(supabase, now)
+        else:
+            state = load_state(args.state_path)
+            print(f"\n[FETCH] Fetching tickets after watermark {state['watermark'] or '(none)'}...")
+            n_tickets, rows, emptied = run_incremental(supabase, state, now)
+        print(f"[OK] Processed {n_tickets} tickets, {len(rows)} tiles affected, {len(emptied)} emptied "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        if args.dry_run:
+            print("\n[SKIP] Dry run - not writing heatmap_tiles or state")
+        else:
+            if rows or emptied:
+                start = time.perf_counter()
+                print(f"\n[SAVE] Saving {len(rows)} tiles to Supabase...")
+                written = save_tiles(supabase, rows, emptied, now)
+                print(f"[OK] Saved {written} rows, removed {len(emptied)} ({time.perf_counter() - start:.1f}s)")
+            # Only advance the watermark once the writes succeeded
+            save_state(state, args.state_path)
+            print(f"[OK] State saved (watermark: {state['watermark']})")
+
+        print("\n" + "=" * 70)
+        print("[OK] HEAT MAP TILES COMPLETE!")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Retailer Stats Materializer
+Incrementally maintains the Supabase retailer_stats table from
+winning_tickets, folding in only tickets newer than the last watermark.
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime
+
+from oracle.db import connect
+from oracle.retailer_stats import (
+    STATE_PATH, load_state, save_state, run_incremental, run_full_rebuild,
+    all_retailers, compute_stats, compare_stats, save_stats, recency_updates, save_recency,
+    total_tickets, waiting_tickets,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Materialize retailer_stats from winning_tickets.')
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help='Rebuild state from every ticket and rewrite all retailers')
+    parser.add_argument('--verify', action='store_true',
+                        help='Compare incremental state against a full rebuild (no writes)')
+    parser.add_argument('--dry-run', action='store_true', help='Compute without writing')
+    parser.add_argument('--state-path', default=STATE_PATH)
+    return parser.parse_args()
+
+
+def main():
+    """Main retailer stats pipeline."""
+    args = parse_args()
+    mode = 'verify' if args.verify else 'full rebuild' if args.full_rebuild else 'incremental'
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE RETAILER STATS MATERIALIZER")
+    print("=" * 70)
+    print(f"Mode: {mode}")
+    print(f"State: {args.state_path}")
+    print()
+
+    try:
+        supabase = connect()
+        now = datetime.utcnow()
+
+        if args.verify:
+            print("\n[VERIFY] Applying new tickets to incremental state (not saved)...")
+            state = load_state(args.state_path)
+            run_incremental(supabase, state, now)
+            incremental = compute_stats(state, all_retailers(state), now)
+            waiting = waiting_tickets(supabase, state)
+            print(f"[OK] Watermark {state['watermark']}, {waiting} tickets above it awaiting a retailer")
+
+            print("[VERIFY] Rebuilding from all tickets...")
+            rebuilt_state, n_tickets, rebuilt = run_full_rebuild(supabase, now)
+            mismatched = compare_stats(incremental, rebuilt)
+
+            print(f"[OK] Compared {len(rebuilt)} retailers from {n_tickets} tickets")
+            # Tickets resolved after the watermark had passed them never reach the state
+            missing = total_tickets(rebuilt_state) - total_tickets(state)
+            if missing:
+                print(f"[ERROR] {missing} resolved tickets are counted by the rebuild but not the incremental state")
+                sys.exit(1)
+            if mismatched:
+                print(f"[ERROR] {len(mismatched)} retailers differ from full rebuild:")
+                for retailer_id in mismatched[:20]:
+                    print(f"  {retailer_id}")
+                sys.exit(1)
+            print("[OK] Incremental state matches full rebuild")
+            return
+
+        start = time.perf_counter()
+        if args.full_rebuild:
+            print("\n[BUILD] Rebuilding state from all winning tickets...")
+            state, n_tickets, stats = run_full_rebuild(supabase, now)
+        else:
+            state = load_state(args.state_path)
+            print(f"\n[FETCH] Fetching tickets after watermark {state['watermark'] or '(none)'}...")
+            n_tickets, stats = run_incremental(supabase, state, now)
+        recency = recency_updates(state, stats, now)
+        print(f"[OK] Processed {n_tickets} tickets, {len(stats)} retailers affected, "
+              f"{len(recency)} days_since_last_win refreshed ({time.perf_counter() - start:.1f}s)")
+
+        if args.dry_run:
+            print("\n[SKIP] Dry run - not writing retailer_stats or state")
+        else:
+            if len(stats) > 0:
+                start = time.perf_counter()
+                print(f"\n[SAVE] Saving {len(stats)} retailer stats to Supabase...")
+                written = save_stats(supabase, stats, now)
+                print(f"[OK] Saved {written} rows ({time.perf_counter() - start:.1f}s)")
+            if len(recency) > 0:
+                start = time.perf_counter()
+                print(f"\n[SAVE] Refreshing days_since_last_win for {len(recency)} other retailers...")
+                written = save_recency(supabase, recency, now)
+                print(f"[OK] Saved {written} rows ({time.perf_counter() - start:.1f}s)")
+            # Only advance the watermark once the writes succeeded
+            save_state(state, args.state_path)
+            print(f"[OK] State saved (watermark: {state['watermark']})")
+
+        print("\n" + "=" * 70)
+        print("[OK] RETAILER STATS COMPLETE!")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Nearby Retailers
+Answers "best retailers near me" from the in-memory ball-tree in
+oracle/nearby.py: retailers within a radius (or the k nearest), ranked
+by their latest hotness score.
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from oracle.db import connect
+from oracle.nearby import NEARBY_COLUMNS, NearbyIndex, load_nearby
+from oracle.retailer_scoring import MODEL_VERSION
+
+# Synthetic benchmark retailers are spread over roughly Minnesota
+SYNTHETIC_BOUNDS = ((43.5, 49.0), (-97.2, -89.5))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Find the best-scored retailers near a location.')
+    parser.add_argument('--lat', type=float, default=44.9778, help='Latitude (default: Minneapolis)')
+    parser.add_argument('--lon', type=float, default=-93.2650, help='Longitude (default: Minneapolis)')
+    parser.add_argument('--radius-miles', type=float, default=10.0, help='Search radius')
+    parser.add_argument('--nearest', type=int, default=0, metavar='K',
+                        help='Rank the K nearest retailers instead of a radius search')
+    parser.add_argument('-k', '--top', type=int, default=10, help='Retailers to show')
+    parser.add_argument('--model-version', default=MODEL_VERSION, help='retailer_predictions model version')
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N', help='Time N random queries')
+    parser.add_argument('--batch-size', type=int, default=256, help='Locations per benchmark batch')
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help='Benchmark against N random retailers instead of Supabase')
+    return parser.parse_args()
+
+
+def synthetic_index(n, seed=0):
+    """NearbyIndex over n random scored retailers."""
+    rng = np.random.default_rng(seed)
+    (lat_low, lat_high), (lon_low, lon_high) = SYNTHETIC_BOUNDS
+    retailers = pd.DataFrame({column: None for column in NEARBY_COLUMNS}, index=range(n))
+    retailers['retailer_id'] = [f'synthetic-{i}' for i in range(n)]
+    retailers['name'] = [f'Synthetic Retailer {i}' for i in range(n)]
+    retailers['city'] = 'Synthetic'
+    retailers['latitude'] = rng.uniform(lat_low, lat_high, n)
+    retailers['longitude'] = rng.uniform(lon_low, lon_high, n)
+    retailers['hotness_score'] = rng.random(n)
+    return NearbyIndex(retailers)
+
+
+def benchmark(index, queries, batch_size, args):
+    """Time random-location queries against the index, batch_size locations per call."""
+    rng = np.random.default_rng(1)
+    (lat_low, lat_high), (lon_low, lon_high) = SYNTHETIC_BOUNDS
+    latitudes = rng.uniform(lat_low, lat_high, queries)
+    longitudes = rng.uniform(lon_low, lon_high, queries)
+
+    for label, run in (
+        (f"radius {args.radius_miles:g} mi", lambda lat, lon: index.radius(lat, lon, args.radius_miles, args.top)),
+        (f"{args.nearest or args.top}-nearest", lambda lat, lon: index.nearest(lat, lon, args.nearest or args.top)),
+    ):
+        start = time.perf_counter()
+        for offset in range(0, queries, batch_size):
+            run(latitudes[offset:offset + batch_size], longitudes[offset:offset + batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"[BENCH] {queries} {label} queries over {len(index)} retailers (batches of {batch_size}): "
+              f"{queries / elapsed:,.0f} queries/s")
+
+
+def main():
+    """Main nearby retailer query."""
+    args = parse_args()
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE NEARBY RETAILERS")
+    print("=" * 70)
+    print(f"Location: {args.lat:.4f}, {args.lon:.4f}, model: {args.model_version}")
+    print()
+
+    try:
+        start = time.perf_counter()
+        if args.synthetic:
+            print(f"[BUILD] Building index over {args.synthetic} synthetic retailers...")
+            index = synthetic_index(args.synthetic)
+        else:
+            supabase = connect()
+            print("[FETCH] Loading retailers and predictions...")
+            index = load_nearby(supabase, args.model_version)
+        print(f"[OK] Indexed {len(index)} retailers ({time.perf_counter() - start:.2f}s)")
+        if len(index) == 0:
+            print("[ERROR] ERROR: No geocoded active retailers found!")
+            sys.exit(1)
+
+        start = time.perf_counter()
+        if args.nearest:
+            rows, miles = index.nearest(args.lat, args.lon, args.nearest)
+            label = f"Best of the {args.nearest} nearest retailers"
+        else:
+            [(rows, miles)] = index.radius(args.lat, args.lon, args.radius_miles)
+            label = f"Best retailers within {args.radius_miles:g} mi"
+        picks = index.frame(np.ravel(rows)[:args.top], np.ravel(miles)[:args.top])
+        elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"\n{label} ({np.size(rows)} found, {elapsed:.2f} ms):")
+        for rank, row in enumerate(picks.itertuples(), 1):
+            score = f"{row.hotness_score:.3f}" if pd.notna(row.hotness_score) else "  n/a"
+            print(f"  {rank:2d}. {str(row.name)[:32]:32s} {str(row.city)[:16]:16s} "
+                  f"{row.distance_miles:5.1f} mi  hotness {score}")
+
+        if args.benchmark:
+            print()
+            benchmark(index, args.benchmark, args.batch_size, args)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Winning Ticket Normalizer
+Bulk-resolves scraped winning_tickets to retailers.id and removes
+duplicate tickets. With --fixture, runs offline against a local file of
+scraped records and reports throughput and match rate.
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timedelta
+
+from oracle.db import connect, fetch_all, upsert_batched
+from oracle.ticket_normalizer import (
+    MATCH_THRESHOLD, RetailerIndex, resolve_retailers, dedup_tickets, match_report,
+    from_scraped_records, make_benchmark,
+)
+from oracle.winners_html import parse_winners_page
+
+TICKET_COLUMNS = ('id,game_number,game_name,prize_tier,prize_amount,retailer_id,retailer_name,'
+                  'city,state,claimed_at,scrape_source,created_at')
+DELETE_BATCH_SIZE = 200
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Normalize and dedup scraped winning tickets.')
+    parser.add_argument('--since-days', type=int, default=30,
+                        help='Only process tickets created in the last N days')
+    parser.add_argument('--threshold', type=float, default=MATCH_THRESHOLD)
+    parser.add_argument('--delete-duplicates', action='store_true',
+                        help='Delete duplicate tickets (keeps the oldest copy)')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing')
+    parser.add_argument('--fixture', help='Offline benchmark on a saved winners page or JSON records')
+    parser.add_argument('--scale', type=int, default=100, help='Fixture replication factor')
+    parser.add_argument('--retailers', type=int, default=100_000, help='Benchmark retailer count')
+    return parser.parse_args()
+
+
+def print_report(report, duplicates, elapsed):
+    """Print match and throughput summary."""
+    print(f"\nNormalization Summary:")
+    print(f"  Tickets: {report['total']}")
+    print(f"  Matched: {report['matched']} ({report['match_rate'] * 100:.1f}%)")
+    for method, count in report['by_method'].items():
+        print(f"    {method}: {count}")
+    print(f"  Duplicates: {duplicates}")
+    print(f"  Time: {elapsed:.2f}s ({report['total'] / max(elapsed, 1e-9):,.0f} tickets/s)")
+
+
+def run_fixture(args):
+    """Offline benchmark against a local fixture."""
+    if args.fixture.endswith('.html'):
+        records = parse_winners_page(args.fixture)
+    else:
+        with open(args.fixture, encoding='utf-8') as f:
+            records = json.load(f)
+
+    tickets = from_scraped_records(records)
+    tickets, retailers, expected = make_benchmark(tickets, args.scale, args.retailers)
+    print(f"[OK] Fixture: {len(records)} records x{args.scale} = {len(tickets)} tickets, "
+          f"{len(retailers)} retailers")
+
+    start = time.perf_counter()
+    index = RetailerIndex(retailers)
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolved = resolve_retailers(tickets, index, args.threshold)
+    unique, duplicates = dedup_tickets(resolved)
+    elapsed = time.perf_counter() - start
+
+    report = match_report(resolved)
+    correct = (resolved['retailer_id'].to_numpy() == expected).mean()
+    print(f"  Index build: {index_time:.2f}s")
+    print_report(report, len(duplicates), elapsed)
+    print(f"  Correct retailer: {correct * 100:.1f}%")
+    print(f"  Unique tickets: {len(unique)} (fixture has {len(records)})")
+
+
+def run_supabase(args):
+    """Resolve and dedup recent tickets in Supabase."""
+    supabase = connect()
+    since = (datetime.utcnow() - timedelta(days=args.since_days)).isoformat()
+
+    start = time.perf_counter()
+    print("\n[FETCH] Fetching retailers and recent winning tickets...")
+    retailers = fetch_all(supabase, 'retailers', columns='id,name,city,state')
+    tickets = fetch_all(supabase, 'winning_tickets', columns=TICKET_COLUMNS,
+                        filters=[('gte', 'created_at', since)])
+    print(f"[OK] Fetched {len(retailers)} retailers, {len(tickets)} tickets "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    if len(tickets) == 0 or len(retailers) == 0:
+        print("[OK] Nothing to normalize")
+        return
+
+    start = time.perf_counter()
+    index = RetailerIndex(retailers)
+    resolved = resolve_retailers(tickets, index, args.threshold)
+    unique, duplicates = dedup_tickets(resolved, order_by='created_at')
+    print_report(match_report(resolved), len(duplicates), time.perf_counter() - start)
+
+    if args.dry_run:
+        print("\n[SKIP] Dry run - not writing winning_tickets")
+        return
+
+    newly_matched = unique[unique['match_method'].isin(['exact', 'fuzzy'])]
+    if len(newly_matched):
+        rows = (newly_matched[TICKET_COLUMNS.split(',')[:-1]]
+                .astype(object).where(newly_matched.notna(), None).to_dict('records'))
+        written = upsert_batched(supabase, 'winning_tickets', rows, on_conflict='id')
+        print(f"\n[SAVE] Linked {written} tickets to retailers")
+
+    if args.delete_duplicates and len(duplicates):
+        ids = duplicates['id'].tolist()
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            supabase.table('winning_tickets').delete().in_('id', ids[start:start + DELETE_BATCH_SIZE]).execute()
+        print(f"[SAVE] Deleted {len(ids)} duplicate tickets")
+
+
+def main():
+    """Main normalization pipeline."""
+    args = parse_args()
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE WINNING TICKET NORMALIZER")
+    print("=" * 70)
+    print(f"Source: {args.fixture or 'Supabase'}")
+    print(f"Match threshold: {args.threshold}")
+    print()
+
+    try:
+        if args.fixture:
+            run_fixture(args)
+        else:
+            run_supabase(args)
+
+        print("\n" + "=" * 70)
+        print("[OK] NORMALIZATION COMPLETE!")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Ticket Portfolio Optimizer
+Picks a mix of tickets across active games for a budget and risk profile:
+maximum expected return with the return variance under the profile's
+limit (see oracle/portfolio.py). Defaults to the budgets and risk
+profiles of the test matrix ($5-$100; low / medium / high).
+"""
+
+import sys
+import time
+import argparse
+from datetime import date
+
+from oracle.db import connect
+from oracle.portfolio import RISK_STD_LIMITS, PortfolioOptimizer, load_return_stats
+
+# UserBudget values in test-cases/lottery-prediction.pict
+DEFAULT_BUDGETS = [5, 20, 50, 100]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Optimize a ticket portfolio for a budget and risk profile.')
+    parser.add_argument('--budget', type=float, nargs='+', default=DEFAULT_BUDGETS, help='Budgets in dollars')
+    parser.add_argument('--risk', choices=list(RISK_STD_LIMITS), nargs='+', default=list(RISK_STD_LIMITS),
+                        help='Risk profiles')
+    parser.add_argument('--snapshot-date', default=date.today().isoformat(),
+                        help='Date of the prize tier data (memoization key; default: today)')
+    return parser.parse_args()
+
+
+def print_portfolio(budget, risk, portfolio, elapsed):
+    """Tickets per game plus the portfolio's spend, expected return and spread."""
+    limit = RISK_STD_LIMITS[risk]
+    limit_text = f"std dev <= {limit:g}x budget" if limit is not None else "no variance limit"
+    print(f"\n${budget:g} budget, {risk} risk ({limit_text}) - {elapsed * 1000:.1f} ms")
+    if not portfolio.within_limit:
+        print("  [WARNING]  Warning: No mix spending the budget meets the variance limit; "
+              "showing the lowest-variance one")
+    for pick in portfolio.picks.itertuples():
+        print(f"  {pick.tickets:3d} x {str(pick.game_name)[:36]:36s} ${pick.ticket_price:>4g}  "
+              f"EV {pick.ev:+7.2f}  std dev {pick.variance ** 0.5:9.2f}")
+    print(f"  Spend ${portfolio.spend:.2f} | expected return {portfolio.expected_return:+.2f} | "
+          f"std dev {portfolio.std_dev:.2f}")
+
+
+def main():
+    """Main portfolio optimization."""
+    args = parse_args()
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE TICKET PORTFOLIO OPTIMIZER")
+    print("=" * 70)
+    print(f"Snapshot date: {args.snapshot_date}")
+    print()
+
+    try:
+        supabase = connect()
+
+        print("[FETCH] Fetching active games and prize tiers...")
+        stats = load_return_stats(supabase)
+        if len(stats) == 0:
+            print("[ERROR] ERROR: No active games with prize tier data!")
+            sys.exit(1)
+        print(f"[OK] Return statistics for {len(stats)} games")
+
+        optimizer = PortfolioOptimizer(stats, args.snapshot_date)
+        for budget in args.budget:
+            for risk in args.risk:
+                start = time.perf_counter()
+                portfolio = optimizer.optimize(budget, risk)
+                print_portfolio(budget, risk, portfolio, time.perf_counter() - start)
+
+        # Repeat lookups are served from the memo
+        start = time.perf_counter()
+        for budget in args.budget:
+            for risk in args.risk:
+                optimizer.optimize(budget, risk)
+        lookups = len(args.budget) * len(args.risk)
+        print(f"\n[OK] {lookups} memoized lookups in {(time.perf_counter() - start) * 1000:.3f} ms")
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""
+Scratch Oracle Python pipeline package.
+Shared modules used by the batch scripts in scripts/ (train-model.py,
+generate-predictions.py, score-retailers.py, ...).
+"""
@@ -0,0 +1,235 @@
+"""
+Model accuracy backtesting.
+Outcomes come from historical_snapshots: a game's realized AI score on a
+day is target_scores() of its snapshot features that day
+(snapshots are carried forward, since unchanged days aren't stored).
+- evaluate_predictions(): stored predictions vs. the outcome k days later
+- walk_forward(): retrain on everything known by day D, predict D, score
+  against D+k; days run in parallel worker processes
+All joins are columnar (merge / merge_asof); metrics are grouped reductions.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from oracle.db import fetch_all, upsert_batched
+from oracle.features import FEATURE_COLS, target_scores
+from oracle.feature_cache import cached_features
+from oracle.schema import apply_schema
+from oracle.training import MODEL_PARAMS
+
+HORIZON_DAYS = 7
+
+# ai_score where get_recommendation() starts recommending 'buy'
+BUY_THRESHOLD = 60
+
+MIN_TRAIN_ROWS = 10
+
+GAME_COLUMNS = ('id,ticket_price,top_prize_amount,total_top_prizes,overall_odds,'
+                'game_start_date,game_end_date')
+
+# =====================================================
+# Data Loading
+# =====================================================
+
+def load_history(client, since):
+    """Bulk-load games, snapshots and predictions since a date."""
+    games = fetch_all(client, 'games', columns=GAME_COLUMNS)
+    snapshots = fetch_all(
+        client, 'historical_snapshots', columns='game_id,snapshot_date,remaining_top_prizes',
+        filters=[('gte', 'snapshot_date', since.isoformat())],
+    )
+    predictions = fetch_all(
+        client, 'predictions', columns='game_id,prediction_date,ai_score,model_version',
+        filters=[('gte', 'prediction_date', since.isoformat())],
+    )
+
+    apply_schema(games, 'games')
+    if len(snapshots):
+        apply_schema(snapshots, 'historical_snapshots')
+        snapshots['snapshot_date'] = pd.to_datetime(snapshots['snapshot_date'])
+    if len(predictions):
+        predictions['prediction_date'] = pd.to_datetime(predictions['prediction_date'])
+        predictions['ai_score'] = pd.to_numeric(predictions['ai_score'], errors='coerce')
+    return games, snapshots, predictions
+
+# =====================================================
+# Daily Outcome Panel
+# =====================================================
+
+def build_panel(games, snapshots, horizon=HORIZON_DAYS, cache=None):
+    """
+    One row per (game, day) from each game's first snapshot to the end of
+    history (or its game_end_date), carrying the last snapshot forward.
+    Adds model features, the realized score that day, and the label: the
+    realized score `horizon` days later. Carried-forward days share feature
+    inputs, so each distinct row is computed once (and cached with `cache`).
+    """
+    if len(snapshots) == 0:
+        return pd.DataFrame()
+
+    snapshots = snapshots.sort_values('snapshot_date')
+    last_day = snapshots['snapshot_date'].max()
+    first = snapshots.groupby('game_id', observed=True)['snapshot_date'].min()
+
+    end = pd.to_datetime(games.set_index('id')['game_end_date'], errors='coerce').reindex(first.index)
+    end = end.where(end < last_day, last_day).fillna(last_day)
+    lengths = ((end - first).dt.days + 1).clip(lower=0).to_numpy()
+
+    # Daily grid, then as-of join each day to the latest snapshot
+    grid = pd.DataFrame({
+        # Index.repeat keeps the game_id dtype (categorical after apply_schema) for the as-of join
+        'game_id': first.index.repeat(lengths),
+        'day': np.repeat(first.to_numpy(), lengths)
+               + pd.to_timedelta(np.concatenate([np.arange(n) for n in lengths]), unit='D'),
+    }).sort_values('day')
+    panel = pd.merge_asof(grid, snapshots, left_on='day', right_on='snapshot_date',
+                          by='game_id', direction='backward')
+
+    static = games.rename(columns={'id': 'game_id'}).drop(columns=['game_end_date'])
+    panel = panel.merge(static, on='game_id', how='left')
+
+    features, _ = cached_features(panel, None, cache)
+    start = pd.to_datetime(panel['game_start_date'], errors='coerce')
+    features['days_since_launch'] = (panel['day'] - start).dt.days.fillna(999).to_numpy()
+    features['recency'] = (panel['day'] - panel['snapshot_date']).dt.days.to_numpy()
+
+    panel = pd.concat([panel[['game_id', 'day']], features], axis=1)
+    panel['realized_score'] = target_scores(features)
+
+    # Label: realized score `horizon` days later
+    future = panel[['game_id', 'day', 'realized_score']].rename(columns={'realized_score': 'label'})
+    future['day'] = future['day'] - pd.Timedelta(days=horizon)
+    return panel.merge(future, on=['game_id', 'day'], how='left')
+
+# =====================================================
+# Metrics
+# =====================================================
+
+def grouped_metrics(frame, keys, predicted='predicted', actual='actual', threshold=BUY_THRESHOLD):
+    """MAE, Spearman rank correlation and buy-call precision/recall per group."""
+    frame = frame.dropna(subset=[predicted, actual]).copy()
+    grouped = frame.groupby(keys)
+
+    frame['abs_error'] = (frame[predicted] - frame[actual]).abs()
+    frame['pred_buy'] = frame[predicted] >= threshold
+    frame['true_buy'] = frame[actual] >= threshold
+    frame['tp'] = frame['pred_buy'] & frame['true_buy']
+    frame['correct'] = frame['pred_buy'] == frame['true_buy']
+
+    # Spearman = Pearson correlation of within-group ranks
+    rank_p = grouped[predicted].rank()
+    rank_a = grouped[actual].rank()
+    frame['dp'] = rank_p - rank_p.groupby([frame[k] for k in keys]).transform('mean')
+    frame['da'] = rank_a - rank_a.groupby([frame[k] for k in keys]).transform('mean')
+    frame['dpa'] = frame['dp'] * frame['da']
+    frame['dp2'] = frame['dp'] ** 2
+    frame['da2'] = frame['da'] ** 2
+
+    sums = frame.groupby(keys)[['abs_error', 'pred_buy', 'true_buy', 'tp', 'correct', 'dpa', 'dp2', 'da2']].sum()
+    sums['n'] = frame.groupby(keys).size()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics = pd.DataFrame({
+            'test_set_size': sums['n'],
+            'mean_absolute_error': sums['abs_error'] / sums['n'],
+            'rank_correlation': sums['dpa'] / np.sqrt(sums['dp2'] * sums['da2']),
+            'accuracy': sums['correct'] / sums['n'],
+            'precision_score': sums['tp'] / sums['pred_buy'],
+            'recall_score': sums['tp'] / sums['true_buy'],
+        })
+    metrics['f1_score'] = (2 * metrics['precision_score'] * metrics['recall_score']
+                           / (metrics['precision_score'] + metrics['recall_score']))
+    return metrics.reset_index()
+
+
+def evaluate_predictions(predictions, panel):
+    """Score stored predictions against the realized outcome `horizon` days later."""
+    joined = predictions.merge(
+        panel[['game_id', 'day', 'label']],
+        left_on=['game_id', 'prediction_date'], right_on=['game_id', 'day'], how='inner',
+    ).rename(columns={'ai_score': 'predicted', 'label': 'actual'})
+
+    metrics = grouped_metrics(joined, ['model_version', 'prediction_date'])
+    return metrics.rename(columns={'prediction_date': 'evaluation_date'})
+
+# =====================================================
+# Walk-Forward Replay
+# =====================================================
+
+_panel = None
+
+
+def _init_worker(panel):
+    global _panel
+    _panel = panel
+
+
+def _replay_day(args):
+    """Train on labels known by day D (day <= D - horizon), predict day D."""
+    day, horizon = args
+    train = _panel[(_panel['day'] <= day - pd.Timedelta(days=horizon)) & _panel['label'].notna()]
+    test = _panel[(_panel['day'] == day) & _panel['label'].notna()]
+    if len(train) < MIN_TRAIN_ROWS or len(test) == 0:
+        return None
+
+    model = xgb.XGBRegressor(**MODEL_PARAMS, n_jobs=1)
+    model.fit(train[FEATURE_COLS].to_numpy(np.float32), train['label'].to_numpy())
+    predicted = np.clip(model.predict(test[FEATURE_COLS].to_numpy(np.float32)), 0, 100)
+
+    return pd.DataFrame({
+        'evaluation_date': day,
+        'game_id': test['game_id'].to_numpy(),
+        'predicted': predicted,
+        'actual': test['label'].to_numpy(),
+        'training_set_size': len(train),
+    })
+
+
+def walk_forward(panel, days, horizon=HORIZON_DAYS, workers=None):
+    """Replay walk-forward training over the given days in parallel."""
+    tasks = [(pd.Timestamp(day), horizon) for day in days]
+    if workers == 1:
+        _init_worker(panel)
+        results = list(map(_replay_day, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(panel,)) as pool:
+            results = list(pool.map(_replay_day, tasks))
+
+    results = [r for r in results if r is not None]
+    if not results:
+        return pd.DataFrame()
+
+    replay = pd.concat(results, ignore_index=True)
+    metrics = grouped_metrics(replay, ['evaluation_date'])
+    sizes = replay.groupby('evaluation_date')['training_set_size'].first()
+    return metrics.merge(sizes.reset_index(), on='evaluation_date')
+
+# =====================================================
+# Database Write
+# =====================================================
+
+def to_performance_rows(metrics, notes=None):
+    """Convert a metrics frame into model_performance rows."""
+    out = metrics.copy()
+    out['evaluation_date'] = pd.to_datetime(out['evaluation_date']).dt.date.astype(str)
+    for column in ('accuracy', 'precision_score', 'recall_score', 'f1_score', 'rank_correlation',
+                   'mean_absolute_error'):
+        out[column] = out[column].round(4)
+    if notes:
+        out['notes'] = notes
+
+    out = out.astype(object)
+    rows = out.where(out.notna(), None).to_dict('records')
+    for row in rows:
+        for column in ('test_set_size', 'training_set_size'):
+            if row.get(column) is not None:
+                row[column] = int(row[column])
+    return rows
+
+
+def save_performance(client, rows):
+    """Upsert model_performance rows in batches."""
+    return upsert_batched(client, 'model_performance', rows, on_conflict='model_version,evaluation_date')
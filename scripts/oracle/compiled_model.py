@@ -0,0 +1,334 @@
+"""
+Compiled tree-ensemble inference.
+train-model.py exports the trained XGBoost booster into flat NumPy arrays:
+every tree is padded to a complete binary tree of the ensemble's max
+depth (shallower leaves are copied down), so a tree is walked level by
+level for all rows at once with array indexing. Loading and scoring need
+only NumPy, not xgboost.
+Several boosters (the main model plus bootstrap ensemble members) can be
+compiled into one set of arrays; each tree carries its group, and one pass
+over the rows scores every group.
+
+Node covers (training hessian sums) are exported too, for TreeSHAP feature
+contributions (see contributions()). A padding node keeps its whole cover
+on the left copy and 0 on the right, which is how contributions() tells
+it from a real split.
+"""
+
+import json
+import math
+import numpy as np
+
+# Rows scored per chunk (keeps the per-tree working set in cache)
+PREDICT_CHUNK_SIZE = 50_000
+
+# Max |compiled - model.predict| accepted at export time
+PARITY_TOLERANCE = 1e-3
+
+# Rows per chunk for contributions() (its working set is rows x trees x leaves)
+CONTRIBUTION_CHUNK_SIZE = 2_048
+
+# contributions() tables grow as 4^depth (leaves x met-condition patterns)
+MAX_CONTRIBUTION_DEPTH = 8
+
+
+class CompiledTrees:
+    """
+    Flat-array tree ensemble: x < threshold goes left, NaN follows default_left.
+    Group 0 is the main model; predict() returns it, predict_groups() all groups.
+    """
+
+    def __init__(self, feature, threshold, default_left, leaf, base_score, tree_group=None, cover=None):
+        self.feature = np.asarray(feature, dtype=np.int32)            # (trees, internal nodes)
+        self.threshold = np.asarray(threshold, dtype=np.float32)      # (trees, internal nodes)
+        self.default_left = np.asarray(default_left, dtype=bool)      # (trees, internal nodes)
+        self.leaf = np.asarray(leaf, dtype=np.float32)                # (trees, 2**depth)
+        self.base_score = np.atleast_1d(np.asarray(base_score, dtype=np.float32))  # (groups,)
+
+        self.n_trees, self.n_internal = self.feature.shape
+        self.depth = int(np.log2(self.leaf.shape[1]))
+        self.n_groups = len(self.base_score)
+        self.tree_group = (np.zeros(self.n_trees, dtype=np.int32) if tree_group is None
+                           else np.asarray(tree_group, dtype=np.int32))
+        # (trees, internal nodes + leaves), same slot numbering; None for exports without covers
+        self.cover = None if cover is None else np.asarray(cover, dtype=np.float64)
+        self._shap = {}
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Compile an xgboost Booster (or XGBRegressor) into flat arrays."""
+        return cls.from_boosters([booster])
+
+    @classmethod
+    def from_boosters(cls, boosters):
+        """Compile several boosters into one grouped ensemble (group i = boosters[i])."""
+        trees, tree_group, base_score = [], [], []
+        for group, booster in enumerate(boosters):
+            if hasattr(booster, 'get_booster'):
+                booster = booster.get_booster()
+            learner = json.loads(booster.save_raw('json'))['learner']
+            group_trees = learner['gradient_booster']['model']['trees']
+            trees += group_trees
+            tree_group += [group] * len(group_trees)
+            base_score.append(float(learner['learner_model_param']['base_score'].strip('[]')))
+
+        depth = max(_tree_depth(tree) for tree in trees)
+        n_internal, n_leaves = 2 ** depth - 1, 2 ** depth
+        feature = np.zeros((len(trees), n_internal), dtype=np.int32)
+        threshold = np.zeros((len(trees), n_internal), dtype=np.float32)
+        default_left = np.ones((len(trees), n_internal), dtype=bool)
+        leaf = np.zeros((len(trees), n_leaves), dtype=np.float32)
+        cover = np.zeros((len(trees), n_internal + n_leaves), dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            left, right = tree['left_children'], tree['right_children']
+            # (source node, slot in the complete tree, cover)
+            stack = [(0, 0, tree['sum_hessian'][0])]
+            while stack:
+                node, slot, node_cover = stack.pop()
+                cover[t, slot] = node_cover
+                if slot >= n_internal:
+                    leaf[t, slot - n_internal] = tree['split_conditions'][node]
+                elif left[node] == -1:
+                    # Leaf above max depth: both children repeat it (the cover goes left)
+                    stack.append((node, 2 * slot + 1, node_cover))
+                    stack.append((node, 2 * slot + 2, 0.0))
+                else:
+                    feature[t, slot] = tree['split_indices'][node]
+                    threshold[t, slot] = tree['split_conditions'][node]
+                    default_left[t, slot] = bool(tree['default_left'][node])
+                    stack.append((left[node], 2 * slot + 1, tree['sum_hessian'][left[node]]))
+                    stack.append((right[node], 2 * slot + 2, tree['sum_hessian'][right[node]]))
+
+        return cls(feature, threshold, default_left, leaf, base_score, tree_group, cover)
+
+    def predict(self, X):
+        """Main-model scores; float32 like XGBRegressor.predict."""
+        return self.predict_groups(X)[:, 0]
+
+    def predict_groups(self, X):
+        """Scores for every group in one pass; returns (rows, groups) float32."""
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((len(X), self.n_groups), dtype=np.float32)
+        for start in range(0, len(X), PREDICT_CHUNK_SIZE):
+            out[start:start + PREDICT_CHUNK_SIZE] = self._predict_chunk(X[start:start + PREDICT_CHUNK_SIZE]).T
+        return out
+
+    def _predict_chunk(self, X):
+        # Feature-major copy so each gather is feature * n + row
+        n = len(X)
+        columns = np.ascontiguousarray(X.T).ravel()
+        missing = np.isnan(columns) if np.isnan(columns).any() else None
+        rows = np.arange(n, dtype=np.intp)
+        feature_base = self.feature.astype(np.intp) * n
+
+        # Trees are summed in order, as xgboost does, so results match exactly
+        out = np.repeat(self.base_score[:, None], n, axis=1)
+        for group, base, threshold, default_left, leaf in zip(
+                self.tree_group, feature_base, self.threshold, self.default_left, self.leaf):
+            slot = np.zeros(n, dtype=np.intp)
+            for _ in range(self.depth):
+                gather = base[slot] + rows
+                go_left = columns[gather] < threshold[slot]
+                if missing is not None:
+                    # NaN compares False (right); send it left where that's the default
+                    go_left |= missing[gather] & default_left[slot]
+                slot = 2 * slot + 2 - go_left
+            out[group] += leaf[slot - self.n_internal]
+        return out
+
+    # =====================================================
+    # TreeSHAP
+    # =====================================================
+
+    def contributions(self, X, group=0):
+        """
+        Path-dependent TreeSHAP values of one group for every row, like
+        xgboost's pred_contribs: (rows, features + 1) float64, the last
+        column the bias, each row summing to the group's prediction.
+        Each leaf's contribution depends only on which of its path
+        conditions a row meets, so it is tabulated per leaf for every
+        pattern of met conditions (_shap_tables) and rows only look it up.
+        """
+        if self.cover is None:
+            raise ValueError("Compiled model has no node covers; re-export it to explain predictions")
+        if self.depth > MAX_CONTRIBUTION_DEPTH:
+            raise ValueError(f"Trees of depth {self.depth} are too deep to tabulate contributions "
+                             f"(max {MAX_CONTRIBUTION_DEPTH})")
+        X = np.asarray(X, dtype=np.float32)
+        n_features = X.shape[1] if X.ndim == 2 else 0
+        tables = self._shap_tables(group)
+
+        out = np.zeros((len(X), n_features + 1), dtype=np.float64)
+        out[:, -1] = tables['bias']
+        if len(X) == 0 or len(tables['entry']) == 0:
+            return out
+
+        # Sums each entry's value into its feature's column
+        to_feature = np.zeros((len(tables['entry']), n_features))
+        to_feature[np.arange(len(tables['entry'])), tables['entry_feature']] = 1.0
+        n_trees = len(tables['feature'])
+        for start in range(0, len(X), CONTRIBUTION_CHUNK_SIZE):
+            chunk = X[start:start + CONTRIBUTION_CHUNK_SIZE]
+            values = chunk[:, tables['feature']]                             # (rows, trees, internal nodes)
+            left = values < tables['threshold']
+            left |= np.isnan(values) & tables['default_left']
+
+            # Met-conditions pattern of every leaf, built level by level: bit d is
+            # set where the row goes the leaf's way at depth d (always at padding)
+            pattern = np.zeros((len(chunk), n_trees, 1), dtype=np.uint8)
+            for level in range(self.depth):
+                nodes = slice(2 ** level - 1, 2 ** (level + 1) - 1)
+                go_left, padding, bit = left[:, :, nodes], tables['padding'][:, nodes], np.uint8(1 << level)
+                children = np.empty((len(chunk), n_trees, 2 ** level, 2), dtype=np.uint8)
+                np.add(pattern, (go_left | padding).view(np.uint8) * bit, out=children[..., 0])
+                np.add(pattern, (~go_left | padding).view(np.uint8) * bit, out=children[..., 1])
+                pattern = children.reshape(len(chunk), n_trees, -1)
+            pattern = pattern.reshape(len(chunk), -1)                        # (rows, trees * leaves)
+            phi = tables['values'][tables['entry'] + pattern[:, tables['entry_leaf']]]
+            out[start:start + len(chunk), :-1] += phi @ to_feature
+        return out
+
+    def _shap_tables(self, group):
+        """
+        Per-group lookup tables for contributions(), built once: the
+        group's split arrays and padding flags; each leaf's contribution to
+        the feature split at a path depth for every met-conditions pattern,
+        kept once per feature of each reachable leaf ('entry': offset of
+        its pattern row in the flat 'values'); and the bias (base score +
+        every tree's cover-weighted mean leaf).
+        """
+        if group in self._shap:
+            return self._shap[group]
+
+        trees = np.flatnonzero(self.tree_group == group)
+        depth, n_internal, n_leaves = self.depth, self.n_internal, self.leaf.shape[1]
+        cover = self.cover[trees]
+
+        # Path of every leaf slot: the internal node at each depth and the direction taken
+        slots = np.arange(n_leaves) + n_internal
+        node = np.empty((n_leaves, depth), dtype=np.intp)
+        go_left = np.empty((n_leaves, depth), dtype=bool)
+        child = slots.copy()
+        for level in range(depth - 1, -1, -1):
+            parent = (child - 1) // 2
+            node[:, level], go_left[:, level] = parent, child == 2 * parent + 1
+            child = parent
+        child_slot = np.column_stack([node[:, 1:], slots[:, None]]) if depth else node
+
+        # A padding node has all its cover on the left copy
+        right_cover = cover[:, 2 * node + 2]                                # (trees, leaves, depth)
+        real = right_cover > 0
+        reachable = (real | go_left).all(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(real, cover[:, child_slot] / cover[:, node], 1.0)
+
+        patterns = (np.arange(2 ** depth)[:, None] >> np.arange(depth)) & 1
+        # Shapley weight of a subset of s of the other features, for m path features
+        weights = [np.array([math.factorial(s) * math.factorial(m - s - 1) / math.factorial(m) for s in range(m)])
+                   for m in range(depth + 1)]
+        table = np.zeros((len(trees), n_leaves, 2 ** depth, depth), dtype=np.float64)
+        path_feature = np.zeros((len(trees), n_leaves, depth), dtype=np.intp)
+        expected = 0.0
+
+        for t, tree in enumerate(trees):
+            for l in np.flatnonzero(reachable[t]):
+                value = float(self.leaf[tree, l])
+                positions = np.flatnonzero(real[t, l])
+                if len(positions) == 0:
+                    # Single-leaf tree: only shifts the bias
+                    expected += value
+                    continue
+                features = self.feature[tree, node[l, positions]]
+                unique, first, group_of = np.unique(features, return_index=True, return_inverse=True)
+                # Per unique feature: zero fraction z (product of cover ratios) and
+                # one fraction o (all its conditions met) for every pattern
+                zero = np.array([np.prod(fraction[t, l, positions[group_of == j]]) for j in range(len(unique))])
+                one = np.stack([patterns[:, positions[group_of == j]].all(axis=1)
+                                for j in range(len(unique))], axis=1).astype(np.float64)
+                expected += value * np.prod(zero)
+                m = len(unique)
+                for j in range(m):
+                    # Coefficients of prod over other features of (z_i + o_i * t)
+                    poly = np.zeros((len(patterns), m))
+                    poly[:, 0] = 1.0
+                    for i in range(m):
+                        if i != j:
+                            poly[:, 1:] = poly[:, 1:] * zero[i] + poly[:, :-1] * one[:, i:i + 1]
+                            poly[:, 0] *= zero[i]
+                    position = positions[first[j]]
+                    table[t, l, :, position] = value * (one[:, j] - zero[j]) * (poly @ weights[m])
+                    path_feature[t, l, position] = unique[j]
+
+        # Flat (tree, leaf, depth, pattern) values; one entry per non-empty (tree, leaf, depth)
+        values = np.ascontiguousarray(table.transpose(0, 1, 3, 2)).ravel()
+        tree_of, leaf_of, depth_of = np.nonzero((table != 0).any(axis=2))
+        tables = {
+            'feature': self.feature[trees],
+            'threshold': self.threshold[trees],
+            'default_left': self.default_left[trees],
+            'padding': cover[:, 2 * np.arange(n_internal) + 2] <= 0,
+            'values': values,
+            'entry': (((tree_of * n_leaves + leaf_of) * depth + depth_of) * 2 ** depth).astype(np.int32),
+            'entry_leaf': tree_of * n_leaves + leaf_of,
+            'entry_feature': path_feature[tree_of, leaf_of, depth_of],
+            'bias': float(self.base_score[group]) + expected,
+        }
+        self._shap[group] = tables
+        return tables
+
+    def save(self, path, metadata):
+        """Write arrays plus JSON metadata to an .npz file."""
+        arrays = {} if self.cover is None else {'cover': self.cover.astype(np.float32)}
+        np.savez_compressed(
+            path, feature=self.feature, threshold=self.threshold, default_left=self.default_left,
+            leaf=self.leaf, base_score=self.base_score, tree_group=self.tree_group,
+            metadata=json.dumps(metadata), **arrays,
+        )
+
+
+def _tree_depth(tree):
+    """Depth of an xgboost JSON tree (0 for a single leaf)."""
+    left, right = tree['left_children'], tree['right_children']
+    depth, stack = 0, [(0, 0)]
+    while stack:
+        node, level = stack.pop()
+        if left[node] == -1:
+            depth = max(depth, level)
+        else:
+            stack.append((left[node], level + 1))
+            stack.append((right[node], level + 1))
+    return depth
+
+
+def load_compiled(path):
+    """
+    Load an exported model as a model package ({'model': CompiledTrees, ...metadata}).
+    Grouped exports are also the package's 'ensemble'.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        model = CompiledTrees(data['feature'], data['threshold'], data['default_left'], data['leaf'],
+                              data['base_score'], data['tree_group'] if 'tree_group' in data else None,
+                              data['cover'] if 'cover' in data else None)
+        metadata = json.loads(str(data['metadata']))
+    package = {**metadata, 'model': model}
+    if model.n_groups > 1:
+        package['ensemble'] = model
+    return package
+
+
+def parity_error(compiled, model, X):
+    """Max absolute difference between compiled and xgboost predictions."""
+    if len(X) == 0:
+        return 0.0
+    return float(np.max(np.abs(compiled.predict(X) - model.predict(X))))
+
+
+def contribution_parity_error(compiled, model, X):
+    """Max absolute difference between compiled and xgboost (pred_contribs) feature contributions."""
+    if len(X) == 0:
+        return 0.0
+    import xgboost as xgb
+    booster = model.get_booster()
+    expected = booster.predict(xgb.DMatrix(X, feature_names=booster.feature_names), pred_contribs=True)
+    return float(np.max(np.abs(compiled.contributions(X) - expected)))
@@ -0,0 +1,260 @@
+"""
+Aggregate cube over the games table, stored in Parquet.
+Cells are keyed by CUBE_DIMENSIONS (state x price tier x launch week x
+status) and hold count / sum / min / max measures plus the argmax (best
+EV game) per cell. rollup() answers coarser questions ("best $10 game
+launched this month") by merging cells instead of scanning games.
+
+Updates are incremental: the per-game contribution rows are kept next to
+the cube, new or re-scraped games (last_scraped_at after the watermark)
+replace their old rows, and only the cells those games left or entered
+are recomputed. min/max/argmax can't be retracted, so dirty cells are
+recomputed from their member rows rather than patched.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from oracle.db import fetch_all
+from oracle.features import parse_stamps, static_features, MISSING_STAMP
+from oracle.schema import apply_schema
+
+CUBE_PATH = os.path.join('models', 'game_cube.parquet')
+ROWS_PATH = os.path.join('models', 'game_cube_rows.parquet')
+
+CUBE_DIMENSIONS = ['state', 'price_tier', 'launch_week', 'status']
+
+GAME_COLUMNS = ('id,game_number,game_name,state,ticket_price,top_prize_amount,remaining_top_prizes,'
+                'total_top_prizes,overall_odds,game_start_date,is_active,last_scraped_at')
+
+# Per-game values aggregated into each cell: value -> reductions
+MEASURES = {
+    'ev': ('sum', 'min', 'max'),
+    'odds': ('sum', 'min', 'max'),
+    'top_prize': ('sum', 'max'),
+    'remaining_top_prizes': ('sum',),
+    'total_top_prizes': ('sum',),
+}
+
+# Argmax columns carried per cell (the game with the highest EV)
+BEST_COLUMNS = ['best_ev_game_id', 'best_ev_game_number', 'best_ev_game_name']
+
+UNKNOWN = 'unknown'
+
+# Parquet schema metadata key for the watermark
+WATERMARK_KEY = b'oracle.watermark'
+
+# =====================================================
+# Game Rows
+# =====================================================
+
+def launch_weeks(values):
+    """Monday of each game's launch week as 'YYYY-MM-DD' ('unknown' if missing)."""
+    ns, _ = parse_stamps(values)
+    days = np.where(ns == MISSING_STAMP, 0, ns // (86_400 * 10**9))
+    # 1970-01-01 was a Thursday; day 4 is the first Monday
+    monday = (days - (days - 4) % 7).astype('datetime64[D]')
+    return np.where(ns == MISSING_STAMP, UNKNOWN, np.datetime_as_string(monday, unit='D'))
+
+
+def game_rows(games):
+    """One contribution row per game: id/name, cube dimensions and measure values."""
+    empty = pd.Series([None] * len(games), index=games.index, dtype=object)
+    static = static_features(games)
+    state = games.get('state', empty)
+    active = games.get('is_active', empty)
+
+    rows = pd.DataFrame({
+        'id': games['id'].astype(str).to_numpy(),
+        'game_number': games.get('game_number', empty).astype(object).to_numpy(),
+        'game_name': games.get('game_name', empty).astype(object).to_numpy(),
+        'state': state.where(state.notna(), UNKNOWN).astype(str).to_numpy(),
+        'price_tier': static['ticket_price'],
+        'launch_week': launch_weeks(games.get('game_start_date', empty)),
+        'status': np.where(active.fillna(False).astype(bool).to_numpy(), 'active', 'inactive'),
+        'ev': static['ev'],
+        'odds': static['odds'],
+        'top_prize': pd.to_numeric(games.get('top_prize_amount', empty), errors='coerce').fillna(0).to_numpy(),
+        'remaining_top_prizes': static['remaining_prizes'],
+        'total_top_prizes': static['total_prizes'],
+    })
+    # A game may appear twice in one fetch window; keep its latest row
+    return rows.drop_duplicates('id', keep='last').set_index('id')
+
+# =====================================================
+# Cells
+# =====================================================
+
+def aggregate(rows):
+    """Cube cells (indexed by CUBE_DIMENSIONS) for a set of game rows."""
+    if len(rows) == 0:
+        return empty_cube()
+    grouped = rows.groupby(CUBE_DIMENSIONS, sort=True)
+    cells = pd.DataFrame({'games': grouped.size()})
+    for value, reductions in MEASURES.items():
+        for reduction in reductions:
+            cells[f'{value}_{reduction}'] = grouped[value].agg(reduction)
+
+    # Argmax: highest EV per cell, ties to the lowest game id
+    ranked = rows.reset_index().sort_values(['ev', 'id'], ascending=[False, True], kind='mergesort')
+    best = ranked.groupby(CUBE_DIMENSIONS, sort=True)[['id', 'game_number', 'game_name']].first()
+    cells[BEST_COLUMNS] = best.to_numpy()
+    return cells
+
+
+def empty_cube():
+    """Cube with no cells (the columns aggregate() produces)."""
+    columns = {'games': pd.Series(dtype=np.int64)}
+    for value, reductions in MEASURES.items():
+        for reduction in reductions:
+            columns[f'{value}_{reduction}'] = pd.Series(dtype=np.float64)
+    for column in BEST_COLUMNS:
+        columns[column] = pd.Series(dtype=object)
+    index = pd.MultiIndex.from_arrays(
+        [pd.Series(dtype=object), pd.Series(dtype=np.float64), pd.Series(dtype=object), pd.Series(dtype=object)],
+        names=CUBE_DIMENSIONS,
+    )
+    return pd.DataFrame(columns, index=index)
+
+
+def cell_keys(rows):
+    """MultiIndex of the cells the rows fall in."""
+    return pd.MultiIndex.from_frame(rows[CUBE_DIMENSIONS])
+
+
+def apply_games(state, games):
+    """
+    Fold new or updated games into the state; returns the number of cells
+    recomputed. Games already in the state move out of their old cell.
+    """
+    new_rows = game_rows(games)
+    if len(new_rows) == 0:
+        return 0
+
+    rows = state['rows']
+    previous = rows[rows.index.isin(new_rows.index)]
+    dirty = cell_keys(previous).append(cell_keys(new_rows)).unique()
+
+    rows = pd.concat([rows[~rows.index.isin(new_rows.index)], new_rows])
+    state['rows'] = rows
+
+    affected = rows[cell_keys(rows).isin(dirty)]
+    cube = state['cube']
+    state['cube'] = pd.concat([cube[~cube.index.isin(dirty)], aggregate(affected)]).sort_index()
+
+    if 'last_scraped_at' in games and games['last_scraped_at'].notna().any():
+        latest = games['last_scraped_at'].max()
+        # Stamps are datetime64 after apply_schema; the filter compares ISO strings
+        batch_max = latest.isoformat() if isinstance(latest, pd.Timestamp) else str(latest)
+        if state['watermark'] is None or batch_max > state['watermark']:
+            state['watermark'] = batch_max
+    return len(dirty)
+
+# =====================================================
+# Queries
+# =====================================================
+
+def rollup(cube, by=(), **filters):
+    """
+    Merge cells into coarser groups: filter on dimension values (a value or
+    a list of values each), then group by the dimensions in `by` (none: one
+    total row). Means are sum / games, e.g. ev_sum / games.
+    """
+    cells = cube.reset_index()
+    for dimension, value in filters.items():
+        if dimension not in CUBE_DIMENSIONS:
+            raise ValueError(f"Unknown cube dimension: {dimension}")
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        cells = cells[cells[dimension].isin(values)]
+    if len(cells) == 0:
+        return cells.drop(columns=CUBE_DIMENSIONS).iloc[:0]
+
+    by = list(by)
+    keys = by or (lambda _: 'all')
+    grouped = cells.groupby(keys, sort=True)
+    result = pd.DataFrame({'games': grouped['games'].sum()})
+    for value, reductions in MEASURES.items():
+        for reduction in reductions:
+            column = f'{value}_{reduction}'
+            result[column] = grouped[column].agg(reduction)
+
+    # The group's best game is the best game of its best cell
+    ranked = cells.sort_values(['ev_max', 'best_ev_game_id'], ascending=[False, True], kind='mergesort')
+    result[BEST_COLUMNS] = ranked.groupby(keys, sort=True)[BEST_COLUMNS].first().to_numpy()
+    return result
+
+# =====================================================
+# Storage and Runs
+# =====================================================
+
+def empty_state():
+    """No games folded in yet."""
+    rows = game_rows(pd.DataFrame({'id': pd.Series(dtype=object)}))
+    return {'watermark': None, 'rows': rows, 'cube': empty_cube()}
+
+
+def load_state(cube_path=CUBE_PATH, rows_path=ROWS_PATH):
+    """Cube, game rows and watermark from Parquet, or an empty state."""
+    import pyarrow.parquet as pq
+
+    if not (os.path.exists(cube_path) and os.path.exists(rows_path)):
+        return empty_state()
+    table = pq.read_table(rows_path)
+    watermark = (table.schema.metadata or {}).get(WATERMARK_KEY)
+    return {
+        'watermark': watermark.decode() if watermark else None,
+        'rows': table.to_pandas(),
+        'cube': pq.read_table(cube_path).to_pandas(),
+    }
+
+
+def save_state(state, cube_path=CUBE_PATH, rows_path=ROWS_PATH):
+    """Write cube and game rows to Parquet; the watermark goes in the rows file's metadata."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(cube_path) or '.', exist_ok=True)
+    rows = pa.Table.from_pandas(state['rows'])
+    if state['watermark'] is not None:
+        rows = rows.replace_schema_metadata({**rows.schema.metadata, WATERMARK_KEY: state['watermark'].encode()})
+    # Cube first: a crash in between leaves an old watermark, so games are re-folded rather than lost
+    pq.write_table(pa.Table.from_pandas(state['cube']), cube_path)
+    pq.write_table(rows, rows_path)
+
+
+def fetch_games(client, watermark=None):
+    """Games scraped after the watermark (all games if None)."""
+    filters = [('gt', 'last_scraped_at', watermark)] if watermark else []
+    return apply_schema(fetch_all(client, 'games', columns=GAME_COLUMNS, filters=filters), 'games')
+
+
+def run_incremental(client, state):
+    """Fold games scraped since the watermark into state; returns (games, cells recomputed)."""
+    games = fetch_games(client, state['watermark'])
+    if len(games) == 0:
+        return 0, 0
+    return len(games), apply_games(state, games)
+
+
+def run_full_rebuild(client):
+    """State built from every game; returns (state, games)."""
+    state = empty_state()
+    games = fetch_games(client)
+    if len(games) > 0:
+        apply_games(state, games)
+    return state, len(games)
+
+
+def compare_cubes(incremental, rebuilt, tolerance=1e-6):
+    """Cell keys whose values differ between two cubes (incl. cells only in one)."""
+    keys = incremental.index.union(rebuilt.index)
+    a, b = incremental.reindex(keys), rebuilt.reindex(keys)
+    mismatched = np.zeros(len(keys), dtype=bool)
+    for column in rebuilt.columns:
+        if column in BEST_COLUMNS:
+            mismatched |= ~((a[column] == b[column]) | (a[column].isna() & b[column].isna())).to_numpy()
+        else:
+            mismatched |= ~np.isclose(a[column].astype(float), b[column].astype(float),
+                                      rtol=tolerance, equal_nan=True)
+    return list(keys[mismatched])
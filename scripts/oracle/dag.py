@@ -0,0 +1,332 @@
+"""
+DAG runner for the nightly data/ML jobs.
+A Stage is a command (one of the existing scripts) plus what its result
+depends on: upstream stages, input fingerprints (table watermarks, table
+content hashes, files, the date) and its code (the script and the oracle
+modules it imports, followed transitively). Their hash is the stage's
+cache key. A stage whose key matches its last successful run (taken
+before it ran, or after, for stages that write their own inputs), and
+whose outputs are still as that run left them, is skipped.
+
+Fingerprints are taken in the scheduler thread (one data client) when a
+stage becomes ready, i.e. after everything upstream has written. Ready
+stages run as parallel subprocesses, each logging to its own file. A
+failed stage blocks its dependents unless it is optional. Every run
+appends one JSON line with per-stage status and durations to the run log.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import subprocess
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+
+import pandas as pd
+
+from oracle.db import fetch_all
+
+STATE_PATH = os.path.join('models', 'pipeline_state.json')
+RUN_LOG_PATH = os.path.join('models', 'pipeline_runs.jsonl')
+STAGE_LOG_DIR = os.path.join('models', 'pipeline_logs')
+
+DEFAULT_WORKERS = 4
+
+# Stage statuses; dependents may start after OK ones
+RAN, CACHED, FAILED, BLOCKED = 'ran', 'cached', 'failed', 'blocked'
+OK = (RAN, CACHED)
+
+_ORACLE_IMPORT = re.compile(r'^\s*(?:from|import)\s+oracle\.(\w+)', re.MULTILINE)
+
+# An input fingerprint: label (also the memo key within a run) and fn(client) -> JSON-able value
+Input = namedtuple('Input', 'label fn')
+
+# =====================================================
+# Stages
+# =====================================================
+
+class Stage:
+    """One pipeline step and what decides whether it must run."""
+
+    def __init__(self, name, command, deps=(), inputs=(), code=(), outputs=(), check=None,
+                 cache=True, optional=False, env=None):
+        """
+        command: argv run from the repo root; inputs: Input fingerprints;
+        code: source files (Python scripts are followed into oracle/);
+        outputs: files the stage writes; check: fn(client) -> bool for
+        outputs kept in the database; cache=False always runs (e.g.
+        scrapers, whose source is outside); optional: a failure doesn't
+        block dependents.
+        """
+        self.name = name
+        self.command = list(command)
+        self.deps = tuple(deps)
+        self.inputs = tuple(inputs)
+        self.code = tuple(code)
+        self.outputs = tuple(outputs)
+        self.check = check
+        self.cache = cache
+        self.optional = optional
+        self.env = env or {}
+
+
+def topological_order(stages):
+    """Stage names with every stage after its deps; raises ValueError on unknown deps or cycles."""
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [dep for dep in stage.deps if dep not in by_name]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(unknown)}")
+
+    order, remaining = [], {stage.name: set(stage.deps) for stage in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle among stages: {', '.join(sorted(remaining))}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+# =====================================================
+# Fingerprints
+# =====================================================
+
+def digest(value):
+    """Short sha256 of a JSON-able value."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def file_digest(path):
+    """Short sha256 of a file's bytes (None if it doesn't exist)."""
+    if not os.path.exists(path):
+        return None
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()[:16]
+
+
+def code_files(paths):
+    """The given source files plus every oracle module their Python imports reach."""
+    seen, stack = [], list(paths)
+    while stack:
+        path = os.path.normpath(stack.pop())
+        if path in seen or not os.path.exists(path):
+            continue
+        seen.append(path)
+        if path.endswith('.py'):
+            with open(path) as f:
+                source = f.read()
+            directory = os.path.dirname(path)
+            oracle_dir = directory if os.path.basename(directory) == 'oracle' else os.path.join(directory, 'oracle')
+            stack += [os.path.join(oracle_dir, f'{module}.py') for module in _ORACLE_IMPORT.findall(source)]
+    return sorted(seen)
+
+
+def code_digest(paths):
+    """Code version of a stage: digests of every file code_files() reaches."""
+    return digest({path: file_digest(path) for path in code_files(paths)})
+
+
+def latest(table, column, filters=()):
+    """Input: the newest value of a column (cheap watermark for append-mostly tables)."""
+    def fn(client):
+        query = client.table(table).select(column)
+        for op, name, value in filters:
+            query = getattr(query, op)(name, value)
+        rows = query.order(column, desc=True).limit(1).execute().data
+        return rows[0][column] if rows else None
+    return Input(f'latest:{table}.{column}:{digest(list(filters))}', fn)
+
+
+def content(table, columns, filters=()):
+    """Input: hash of the listed columns of every matching row (ordered by id)."""
+    def fn(client):
+        frame = fetch_all(client, table, columns=','.join(['id', *columns]), filters=list(filters))
+        if len(frame) == 0:
+            return None
+        hashes = pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy()
+        return f'{len(frame)}:{hashlib.sha256(hashes.tobytes()).hexdigest()[:16]}'
+    return Input(f'content:{table}:{",".join(columns)}:{digest(list(filters))}', fn)
+
+
+def file_input(path):
+    """Input: a file's digest."""
+    return Input(f'file:{path}', lambda client: file_digest(path))
+
+
+def today_input():
+    """Input: today's date (for stages whose output is per day)."""
+    return Input('today', lambda client: date.today().isoformat())
+
+# =====================================================
+# Runner
+# =====================================================
+
+def load_state(path=STATE_PATH):
+    """Last successful key and output digests per stage."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    """Write the stage state atomically."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+class PipelineRunner:
+    """Runs stages in dependency order, in parallel where possible, skipping valid cached ones."""
+
+    def __init__(self, stages, client, workers=DEFAULT_WORKERS, force=(), state_path=STATE_PATH,
+                 run_log_path=RUN_LOG_PATH, log_dir=STAGE_LOG_DIR, root='.'):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = topological_order(stages)
+        self.client = client
+        self.workers = workers
+        self.force = set(self.stages) if 'all' in force else set(force)
+        self.state_path = state_path
+        self.run_log_path = run_log_path
+        self.log_dir = log_dir
+        self.root = root
+        self.state = load_state(state_path)
+        # Input values within this run; cleared whenever a stage runs (it may have changed them)
+        self.memo = {}
+
+    def key(self, stage):
+        """Cache key from the command, code version and input fingerprints (now)."""
+        values = {}
+        for spec in stage.inputs:
+            if spec.label not in self.memo:
+                self.memo[spec.label] = spec.fn(self.client)
+            values[spec.label] = self.memo[spec.label]
+        return digest({'command': stage.command, 'code': code_digest(stage.code), 'inputs': values})
+
+    def is_valid(self, stage, key):
+        """Whether the last successful run had this key and its outputs are still as it left them."""
+        previous = self.state.get(stage.name)
+        if not stage.cache or stage.name in self.force or previous is None:
+            return False
+        if key not in (previous['key'], previous.get('settled_key')):
+            return False
+        if any(file_digest(path) != previous['outputs'].get(path) for path in stage.outputs):
+            return False
+        return stage.check is None or bool(stage.check(self.client))
+
+    def execute(self, stage, log_path):
+        """Run the stage's command (worker thread); returns (exit code, seconds)."""
+        start = time.perf_counter()
+        env = {**os.environ, **stage.env}
+        with open(log_path, 'w') as log:
+            # npm and friends are .cmd shims on Windows
+            result = subprocess.run(stage.command, cwd=self.root, env=env, stdout=log,
+                                    stderr=subprocess.STDOUT, shell=os.name == 'nt')
+        return result.returncode, time.perf_counter() - start
+
+    def plan(self):
+        """(stage, 'run' | 'cached') for the current inputs, without running anything."""
+        plan = []
+        for name in self.order:
+            stage = self.stages[name]
+            plan.append((name, CACHED if self.is_valid(stage, self.key(stage)) else 'run'))
+        return plan
+
+    def run(self, report=print):
+        """Run the pipeline; returns the run record (also appended to the run log)."""
+        run_id = datetime.now().strftime('%Y%m%dT%H%M%S')
+        run_dir = os.path.join(self.log_dir, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        started, start = datetime.now().isoformat(), time.perf_counter()
+
+        results = {}
+        running = {}
+        pending = list(self.order)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    deps = [results.get(dep) for dep in stage.deps]
+                    if any(dep is None for dep in deps):
+                        continue
+                    pending.remove(name)
+                    blocking = [dep for dep, result in zip(stage.deps, deps)
+                                if result['status'] not in OK and not self.stages[dep].optional]
+                    if blocking:
+                        results[name] = {'stage': name, 'status': BLOCKED, 'seconds': 0.0, 'key': None}
+                        report(f"[SKIP] {name}: blocked by {', '.join(blocking)}")
+                        continue
+
+                    check_start = time.perf_counter()
+                    key = self.key(stage)
+                    if self.is_valid(stage, key):
+                        results[name] = {'stage': name, 'status': CACHED, 'key': key,
+                                         'seconds': round(time.perf_counter() - check_start, 3)}
+                        report(f"[SKIP] {name}: cached ({key})")
+                        continue
+                    report(f"[BUILD] {name}: {' '.join(stage.command)}")
+                    log_path = os.path.join(run_dir, f"{name.replace(':', '-')}.log")
+                    running[pool.submit(self.execute, stage, log_path)] = (name, key, log_path)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key, log_path = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        code, seconds = future.result()
+                    except Exception as e:
+                        code, seconds = f'{type(e).__name__}: {e}', 0.0
+                    # Whatever it wrote invalidates this run's input fingerprints
+                    self.memo.clear()
+                    results[name] = {'stage': name, 'status': RAN if code == 0 else FAILED,
+                                     'seconds': round(seconds, 3), 'key': key, 'log': log_path}
+                    if code == 0:
+                        self.state[name] = {
+                            'key': key,
+                            # Inputs as the stage left them
+                            'settled_key': self.key(stage),
+                            'finished_at': datetime.now().isoformat(),
+                            'outputs': {path: file_digest(path) for path in stage.outputs},
+                        }
+                        save_state(self.state, self.state_path)
+                        report(f"[OK] {name} ({seconds:.1f}s)")
+                    elif stage.optional:
+                        report(f"[WARNING]  Warning: {name} failed ({code}), continuing; log: {log_path}")
+                    else:
+                        report(f"[ERROR] ERROR: {name} failed ({code}); log: {log_path}")
+
+        record = {
+            'run_id': run_id,
+            'started_at': started,
+            'seconds': round(time.perf_counter() - start, 3),
+            'ok': all(result['status'] in OK or self.stages[name].optional
+                      for name, result in results.items()),
+            'stages': [results[name] for name in self.order],
+        }
+        with open(self.run_log_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        return record
+
+
+def only(stages, names):
+    """The named stages alone, with deps outside the selection dropped (treated as done)."""
+    unknown = set(names) - {stage.name for stage in stages}
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+    selected = [stage for stage in stages if stage.name in names]
+    for stage in selected:
+        stage.deps = tuple(dep for dep in stage.deps if dep in names)
+    return selected
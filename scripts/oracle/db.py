@@ -0,0 +1,100 @@
+"""
+Supabase access helpers shared by the Python batch jobs.
+Paged reads into DataFrames and batched upserts, so jobs never pull a
+whole table in one request or write one row at a time.
+Setting ORACLE_LOCAL_DB to a SQLite path makes connect() return the local
+stand-in (oracle/local_backend.py) instead, for offline runs and load tests.
+"""
+
+import os
+import sys
+import pandas as pd
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv('EXPO_PUBLIC_SUPABASE_URL')
+SUPABASE_KEY = os.getenv('EXPO_PUBLIC_SUPABASE_ANON_KEY')
+LOCAL_DB_PATH = os.getenv('ORACLE_LOCAL_DB')
+
+# PostgREST caps responses at 1000 rows by default
+PAGE_SIZE = 1000
+UPSERT_BATCH_SIZE = 500
+
+
+def connect():
+    """
+    Create the data client: the local SQLite stand-in when ORACLE_LOCAL_DB
+    is set, otherwise Supabase (exiting if credentials are missing).
+    """
+    if LOCAL_DB_PATH:
+        from oracle.local_backend import LocalClient
+        client = LocalClient(LOCAL_DB_PATH)
+        print(f"[OK] Using local database {LOCAL_DB_PATH}")
+        return client
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("[ERROR] ERROR: Missing Supabase credentials in .env file")
+        sys.exit(1)
+
+    try:
+        # Imported here so local runs don't need the supabase package
+        from supabase import create_client
+        client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        print("[OK] Connected to Supabase")
+        return client
+    except Exception as e:
+        print(f"[ERROR] Failed to connect to Supabase: {e}")
+        sys.exit(1)
+
+
+def fetch_page(client, table, offset, columns='*', filters=None, order='id', page_size=PAGE_SIZE):
+    """
+    Fetch one page of matching rows (list of dicts) starting at offset.
+
+    filters is a list of (operator, column, value) tuples applied with the
+    matching query builder method, e.g. ('eq', 'is_active', True).
+    """
+    query = client.table(table).select(columns)
+    for op, column, value in filters or []:
+        query = getattr(query, op)(column, value)
+    if order:
+        query = query.order(order)
+    return query.range(offset, offset + page_size - 1).execute().data
+
+
+def fetch_all(client, table, columns='*', filters=None, order='id', page_size=PAGE_SIZE):
+    """Fetch every matching row of a table, one page at a time (see fetch_page)."""
+    rows = []
+    offset = 0
+
+    while True:
+        page = fetch_page(client, table, offset, columns, filters, order, page_size)
+        rows.extend(page)
+
+        if len(page) < page_size:
+            break
+        offset += page_size
+
+    return pd.DataFrame(rows)
+
+
+def upsert_batched(client, table, rows, on_conflict, batch_size=UPSERT_BATCH_SIZE):
+    """Upsert rows in fixed-size batches. Returns the number of rows written."""
+    written = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        client.table(table).upsert(batch, on_conflict=on_conflict).execute()
+        written += len(batch)
+    return written
+
+
+def insert_batched(client, table, rows, batch_size=UPSERT_BATCH_SIZE):
+    """Insert rows in fixed-size batches. Returns the number of rows written."""
+    written = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        client.table(table).insert(batch).execute()
+        written += len(batch)
+    return written
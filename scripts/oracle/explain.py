@@ -0,0 +1,50 @@
+"""
+Per-game feature contributions for the scoring model (TreeSHAP).
+feature_contributions() explains the main model for the whole feature
+matrix in one call: from the compiled trees when the package has node
+covers (no xgboost needed), else xgboost's own pred_contribs. Each row's
+contributions plus the bias add up to its raw score.
+top_contributions() keeps each game's largest ones, the compact form
+stored with its prediction and rendered into its reasoning text.
+"""
+
+import numpy as np
+
+from oracle.compiled_model import MAX_CONTRIBUTION_DEPTH, CompiledTrees
+
+# Contributions kept per game
+TOP_CONTRIBUTIONS = 3
+
+
+def feature_contributions(model_package, X):
+    """(rows, features + 1) contributions, last column the bias; None if the model can't be explained."""
+    compiled = model_package.get('ensemble') or model_package['model']
+    if (isinstance(compiled, CompiledTrees) and getattr(compiled, 'cover', None) is not None
+            and compiled.depth <= MAX_CONTRIBUTION_DEPTH):
+        return compiled.contributions(X)
+
+    model = model_package['model']
+    if hasattr(model, 'get_booster'):
+        import xgboost as xgb
+        booster = model.get_booster()
+        matrix = xgb.DMatrix(np.asarray(X, dtype=np.float32), feature_names=booster.feature_names)
+        return booster.predict(matrix, pred_contribs=True).astype(np.float64)
+    return None
+
+
+def top_contributions(contributions, k=TOP_CONTRIBUTIONS):
+    """
+    Each row's k largest contributions by magnitude (bias excluded),
+    largest first: (feature positions as int8, -1 where there are fewer
+    non-zero ones; values as float32 score points, NaN there).
+    """
+    phi = contributions[:, :-1]
+    shown = min(k, phi.shape[1])
+    order = np.argsort(-np.abs(phi), axis=1, kind='stable')[:, :shown]
+    values = np.take_along_axis(phi, order, axis=1)
+
+    positions = np.full((len(phi), k), -1, dtype=np.int8)
+    points = np.full((len(phi), k), np.nan, dtype=np.float32)
+    positions[:, :shown] = np.where(values != 0, order, -1)
+    points[:, :shown] = np.where(values != 0, values, np.nan)
+    return positions, points
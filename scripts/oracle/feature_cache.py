@@ -0,0 +1,164 @@
+"""
+Content-addressed feature cache.
+Keys are a 64-bit hash of a game's FEATURE_INPUTS columns salted with
+PIPELINE_VERSION; values are that row's reference-independent features
+(STATIC_DTYPE). The reference date is applied after lookup, so one entry
+serves every run, and only new or changed rows are recomputed. Stored in
+SQLite with last-use days for LRU eviction once the entry limit is hit
+(day granularity, so repeat runs on the same day don't rewrite stamps).
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import numpy as np
+import pandas as pd
+
+from oracle.features import (
+    FEATURE_INPUTS, PIPELINE_VERSION, STATIC_DTYPE, static_features, apply_reference,
+)
+
+DEFAULT_CACHE_PATH = os.path.join('models', 'feature_cache.sqlite')
+DEFAULT_MAX_ENTRIES = 2_000_000
+
+# Rows per executemany() / temp-table batch
+SQL_BATCH_SIZE = 50_000
+
+_HASH_KEY = hashlib.md5(PIPELINE_VERSION.encode()).hexdigest()[:16]
+
+
+def row_keys(games, columns=FEATURE_INPUTS):
+    """Content hash per row of the given columns (int64, SQLite's INTEGER range)."""
+    inputs = pd.DataFrame({
+        column: games[column] if column in games else None
+        for column in columns
+    }, index=games.index)
+    hashes = pd.util.hash_pandas_object(inputs, index=False, hash_key=_HASH_KEY)
+    return hashes.to_numpy().view(np.int64)
+
+
+def today():
+    """LRU clock: days since the epoch."""
+    return int(time.time() // 86_400)
+
+
+class FeatureCache:
+    """SQLite-backed static feature store with batch get/put and LRU eviction."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        # Used from one thread at a time (the async pipeline scores in a worker thread)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS features '
+            '(key INTEGER PRIMARY KEY, value BLOB NOT NULL, last_used INTEGER NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_features_last_used ON features(last_used)')
+        self.conn.execute('CREATE TEMP TABLE lookup (key INTEGER PRIMARY KEY, pos INTEGER NOT NULL)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM features').fetchone()[0]
+
+    def get_many(self, keys):
+        """
+        Look up keys in one query; returns (hit mask, STATIC_DTYPE values
+        for the hits, in key order). Hits are marked as recently used.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        unique = np.unique(keys)
+
+        with self.conn:
+            self.conn.execute('DELETE FROM lookup')
+            for start in range(0, len(unique), SQL_BATCH_SIZE):
+                self.conn.executemany(
+                    'INSERT INTO lookup VALUES (?, ?)',
+                    zip(unique[start:start + SQL_BATCH_SIZE].tolist(), range(start, start + SQL_BATCH_SIZE)),
+                )
+            rows = self.conn.execute(
+                'SELECT lookup.pos, features.value FROM lookup JOIN features USING (key)'
+            ).fetchall()
+            self.conn.execute(
+                'UPDATE features SET last_used = ? WHERE key IN (SELECT key FROM lookup) AND last_used < ?',
+                (today(), today()),
+            )
+
+        found = np.zeros(len(unique), dtype=bool)
+        values = np.empty(len(unique), dtype=STATIC_DTYPE)
+        if rows:
+            positions = np.fromiter((pos for pos, _ in rows), dtype=np.int64, count=len(rows))
+            found[positions] = True
+            values[positions] = np.frombuffer(b''.join(value for _, value in rows), dtype=STATIC_DTYPE)
+
+        # Back to the caller's key order (duplicates share an entry)
+        slot = np.searchsorted(unique, keys)
+        hit = found[slot]
+        return hit, values[slot[hit]]
+
+    def put_many(self, keys, values):
+        """Insert or replace entries, then evict least recently used past the limit."""
+        keys = np.asarray(keys, dtype=np.int64).tolist()
+        blobs = [value.tobytes() for value in np.asarray(values, dtype=STATIC_DTYPE)]
+        now = today()
+        with self.conn:
+            for start in range(0, len(keys), SQL_BATCH_SIZE):
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO features VALUES (?, ?, ?)',
+                    zip(keys[start:start + SQL_BATCH_SIZE], blobs[start:start + SQL_BATCH_SIZE],
+                        [now] * len(keys[start:start + SQL_BATCH_SIZE])),
+                )
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries above max_entries."""
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            with self.conn:
+                self.conn.execute(
+                    'DELETE FROM features WHERE key IN '
+                    '(SELECT key FROM features ORDER BY last_used LIMIT ?)', (excess,),
+                )
+        return max(excess, 0)
+
+
+def cached_static_features(games, cache):
+    """
+    Static features for every row, computing and storing only cache misses
+    (each distinct missing row once).
+    """
+    keys = row_keys(games)
+    hit, cached = cache.get_many(keys)
+
+    static = np.empty(len(games), dtype=STATIC_DTYPE)
+    static[hit] = cached
+    if not hit.all():
+        missing = np.flatnonzero(~hit)
+        new_keys, first, inverse = np.unique(keys[missing], return_index=True, return_inverse=True)
+        computed = static_features(games.iloc[missing[first]])
+        static[missing] = computed[inverse.ravel()]
+        cache.put_many(new_keys, computed)
+    return static, int(hit.sum())
+
+
+def cached_features(games, now=None, cache=None):
+    """compute_features() through the cache; returns (features, cache hits)."""
+    if cache is None:
+        static, hits = static_features(games), 0
+    else:
+        static, hits = cached_static_features(games, cache)
+    return apply_reference(static, now, games.index), hits
@@ -0,0 +1,181 @@
+"""
+Vectorized feature engineering shared by training, prediction and
+backtesting, computed for a whole frame at once. Sentinels: 0 for odds
+that don't parse, 999 days for missing or unparseable dates
+(oracle/quality.py counts both).
+"""
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLS = [
+    'ticket_price', 'ev', 'prize_concentration', 'depletion_rate',
+    'days_since_launch', 'recency', 'odds', 'velocity',
+    'prize_to_price', 'remaining_prizes', 'total_prizes'
+]
+
+MISSING_DAYS = 999
+MISSING_STAMP = np.iinfo(np.int64).min   # NaT as int64
+DAY_NS = 86_400 * 10**9
+
+# Bump when any definition below changes (invalidates the feature cache)
+PIPELINE_VERSION = 'features-v1'
+
+# Columns of `games` the features are computed from
+FEATURE_INPUTS = [
+    'ticket_price', 'top_prize_amount', 'remaining_top_prizes', 'total_top_prizes',
+    'overall_odds', 'game_start_date', 'last_scraped_at',
+]
+
+# Reference-independent per-row values; days_since_launch and recency are
+# derived from the stamps at a reference time (see apply_reference)
+STATIC_DTYPE = np.dtype([
+    ('ticket_price', np.float64), ('ev', np.float64), ('prize_concentration', np.float64),
+    ('depletion_rate', np.float64), ('odds', np.float64), ('prize_to_price', np.float64),
+    ('remaining_prizes', np.float64), ('total_prizes', np.float64),
+    ('start_ns', np.int64), ('scraped_ns', np.int64),
+    ('start_aware', np.bool_), ('scraped_aware', np.bool_),
+])
+
+
+def parse_odds(values):
+    """Parse '1 in 3.5' strings to 0.286; unparseable values become 0."""
+    text = values.astype(object).where(values.notna(), '').astype(str)
+    has_in = text.str.lower().str.contains('in', regex=False)
+
+    denominator = pd.to_numeric(text.str.split('in').str[1].str.strip(), errors='coerce').to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(denominator > 0, 1.0 / denominator, 0.0)
+    plain = pd.to_numeric(text, errors='coerce').to_numpy()
+
+    odds = np.where(has_in, ratio, plain)
+    return np.nan_to_num(odds, nan=0.0)
+
+
+def parse_stamps(values):
+    """
+    Parse dates to int64 epoch nanoseconds (NaT -> MISSING_STAMP) plus
+    whether the column was timezone-aware.
+    """
+    stamps = pd.to_datetime(values, errors='coerce', format='mixed')
+    aware = getattr(stamps.dt, 'tz', None) is not None
+    if aware:
+        stamps = stamps.dt.tz_convert('UTC').dt.tz_localize(None)
+    ns = stamps.dt.as_unit('ns').to_numpy(dtype='datetime64[ns]').view(np.int64)
+    return ns, np.full(len(ns), aware)
+
+
+def reference_ns(now, aware):
+    """
+    Reference time as epoch ns: UTC for timezone-aware dates, naive local
+    time otherwise (as subtracting from datetime.now() would).
+    """
+    if aware:
+        now = pd.Timestamp(now or pd.Timestamp.now(tz='UTC'))
+        now = now.tz_localize('UTC') if now.tzinfo is None else now
+    else:
+        now = pd.Timestamp(now or pd.Timestamp.now())
+        now = now.tz_localize(None) if now.tzinfo is not None else now
+    return now.as_unit('ns').value
+
+
+def days_from_stamps(ns, aware, now=None):
+    """Whole days from parsed stamps to the reference time; missing -> 999."""
+    reference = np.where(aware, reference_ns(now, True), reference_ns(now, False))
+    days = np.floor_divide(reference - ns, DAY_NS)
+    return np.where(ns == MISSING_STAMP, MISSING_DAYS, days).astype(np.int64)
+
+
+def days_since(values, now=None):
+    """Whole days since each date; missing or unparseable dates become 999."""
+    ns, aware = parse_stamps(values)
+    return days_from_stamps(ns, aware, now)
+
+
+def numeric(frame, column, default=0):
+    """Numeric column as float64, with a default for missing columns/values."""
+    if column not in frame:
+        return np.full(len(frame), float(default))
+    return pd.to_numeric(frame[column], errors='coerce').fillna(default).to_numpy(dtype=np.float64)
+
+
+def static_features(games):
+    """Reference-independent part of the features, as a STATIC_DTYPE array."""
+    ticket_price = numeric(games, 'ticket_price')
+    top_prize = numeric(games, 'top_prize_amount')
+    remaining = numeric(games, 'remaining_top_prizes')
+    total = numeric(games, 'total_top_prizes', default=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        concentration = np.where(total > 0, remaining / total, 0.0)
+        prize_to_price = np.where(ticket_price > 0, top_prize / ticket_price, 0.0)
+
+    empty = pd.Series([None] * len(games), index=games.index)
+    static = np.empty(len(games), dtype=STATIC_DTYPE)
+    static['ticket_price'] = ticket_price
+    static['ev'] = prize_to_price * concentration
+    static['prize_concentration'] = concentration
+    static['depletion_rate'] = 1.0 - concentration
+    static['odds'] = parse_odds(games.get('overall_odds', empty))
+    static['prize_to_price'] = prize_to_price
+    static['remaining_prizes'] = remaining
+    static['total_prizes'] = total
+    static['start_ns'], static['start_aware'] = parse_stamps(games.get('game_start_date', empty))
+    static['scraped_ns'], static['scraped_aware'] = parse_stamps(games.get('last_scraped_at', empty))
+    return static
+
+
+def apply_reference(static, now=None, index=None):
+    """Full feature frame (FEATURE_COLS order) from static values at a reference time."""
+    return pd.DataFrame({
+        'ticket_price': static['ticket_price'],
+        'ev': static['ev'],
+        'prize_concentration': static['prize_concentration'],
+        'depletion_rate': static['depletion_rate'],
+        'days_since_launch': days_from_stamps(static['start_ns'], static['start_aware'], now),
+        'recency': days_from_stamps(static['scraped_ns'], static['scraped_aware'], now),
+        'odds': static['odds'],
+        'velocity': static['depletion_rate'],
+        'prize_to_price': static['prize_to_price'],
+        'remaining_prizes': static['remaining_prizes'],
+        'total_prizes': static['total_prizes'],
+    }, index=index)
+
+
+def compute_features(games, now=None):
+    """
+    Feature frame for a games-shaped frame (one row per game); training
+    applies its own row filters on top (see engineer_features()).
+    """
+    return apply_reference(static_features(games), now, games.index)
+
+
+def target_scores(features):
+    """
+    Training target (AI score 0-100) from a feature frame:
+    EV 40%, prize concentration 30%, activity 15%, freshness 10%, minus an
+    age penalty (5%) for games older than 6 months.
+    """
+    ev = features['ev'].to_numpy(dtype=np.float64)
+    concentration = features['prize_concentration'].to_numpy(dtype=np.float64)
+    depletion = features['depletion_rate'].to_numpy(dtype=np.float64)
+    days_since_launch = features['days_since_launch'].to_numpy(dtype=np.float64)
+    recency = features['recency'].to_numpy(dtype=np.float64)
+
+    ev_score = np.minimum(ev * 50, 100)
+    concentration_score = concentration * 100
+    activity_score = np.select(
+        [depletion < 0.2, depletion < 0.6],
+        [depletion * 200, 80 + (depletion - 0.2) * 50],
+        default=np.maximum(100 - (depletion - 0.6) * 200, 0),
+    )
+    freshness_score = np.maximum(100 - recency * 10, 0)
+    age_penalty = np.where(days_since_launch > 180, np.minimum((days_since_launch - 180) / 10, 50), 0)
+
+    score = (
+        ev_score * 0.40 +
+        concentration_score * 0.30 +
+        activity_score * 0.15 +
+        freshness_score * 0.10
+    ) - age_penalty * 0.05
+    return np.clip(score, 0, 100)
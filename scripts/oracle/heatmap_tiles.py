@@ -0,0 +1,261 @@
+"""
+Incremental store heat map tiles.
+Wins are binned at their retailer's coordinates into Web Mercator tiles
+(quadkeys) at zoom levels MIN_ZOOM..MAX_ZOOM, each split into a
+2^GRID_BITS square grid of cells. Every tile is stored as one compact
+blob of its non-empty cells (see encode_cells and migration 009).
+
+Running state on disk holds per-retailer win counts, prize totals and the
+coordinates last used, so each run folds in only winning_tickets created
+after the watermark and rewrites only the tiles those wins (or retailers
+that moved) fall in. Cell values are lifetime totals, so a tile changes
+only when a win lands in it. The watermark is held below tickets still
+waiting for normalize-winning-tickets.py to resolve their retailer, as in
+retailer_stats; once resolved they land in their retailer's tiles.
+"""
+
+import os
+import base64
+import pickle
+import numpy as np
+import pandas as pd
+
+from oracle.db import fetch_all, upsert_batched
+from oracle.retailer_stats import advance_watermark, fetch_new_tickets, unapplied
+
+STATE_PATH = os.path.join('models', 'heatmap_tiles_state.pkl')
+
+MIN_ZOOM = 6
+MAX_ZOOM = 14
+
+# Each tile is a 2^GRID_BITS x 2^GRID_BITS grid of cells
+GRID_BITS = 5
+
+# Web Mercator latitude limit
+MAX_LATITUDE = 85.05112878
+
+PAYLOAD_FORMAT = 1
+CELL_DTYPE = np.dtype([('cell', '<u2'), ('wins', '<u4'), ('prize', '<f4')])
+
+# =====================================================
+# State
+# =====================================================
+
+def empty_state():
+    """Fresh running state with no tickets applied."""
+    return {
+        'watermark': None,
+        'applied': set(),
+        'retailers': pd.DataFrame({'wins': pd.Series(dtype=np.int64),
+                                   'prize': pd.Series(dtype=np.float64),
+                                   'latitude': pd.Series(dtype=np.float64),
+                                   'longitude': pd.Series(dtype=np.float64)},
+                                  index=pd.Index([], name='retailer_id', dtype=object)),
+    }
+
+
+def load_state(path=STATE_PATH):
+    """Load running state from disk, or start empty."""
+    if not os.path.exists(path):
+        return empty_state()
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    """Persist running state to disk."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(state, f)
+
+# =====================================================
+# Tile Math
+# =====================================================
+
+def pixels(latitude, longitude):
+    """Integer Web Mercator positions at the finest resolution (MAX_ZOOM + GRID_BITS)."""
+    scale = float(1 << (MAX_ZOOM + GRID_BITS))
+    lat = np.radians(np.clip(latitude, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (longitude + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * scale
+    limit = scale - 1
+    return np.clip(x, 0, limit).astype(np.int64), np.clip(y, 0, limit).astype(np.int64)
+
+
+def tile_ids(px, py, zoom):
+    """Tile x, y and a per-zoom unique tile id for pixel positions."""
+    shift = MAX_ZOOM + GRID_BITS - zoom
+    x, y = px >> shift, py >> shift
+    return x, y, (x << zoom) | y
+
+
+def cell_index(px, py, zoom):
+    """Cell (row * 2^GRID_BITS + col) of each position within its tile at `zoom`."""
+    shift = MAX_ZOOM - zoom
+    mask = (1 << GRID_BITS) - 1
+    return ((py >> shift) & mask) << GRID_BITS | ((px >> shift) & mask)
+
+
+def quadkeys(x, y, zoom):
+    """Bing quadkeys for tile coordinates at one zoom level."""
+    bits = np.arange(zoom - 1, -1, -1)
+    digits = ((x[:, None] >> bits) & 1) + 2 * ((y[:, None] >> bits) & 1)
+    return (digits + ord('0')).astype(np.uint8).view(f'S{zoom}').ravel().astype(str)
+
+
+def encode_cells(cells, wins, prize):
+    """Tile payload: format byte, grid bits byte, then CELL_DTYPE records, base64."""
+    records = np.empty(len(cells), dtype=CELL_DTYPE)
+    records['cell'], records['wins'], records['prize'] = cells, wins, prize
+    return base64.b64encode(bytes([PAYLOAD_FORMAT, GRID_BITS]) + records.tobytes()).decode('ascii')
+
+
+def decode_cells(payload):
+    """Inverse of encode_cells (CELL_DTYPE records)."""
+    raw = base64.b64decode(payload)
+    return np.frombuffer(raw[2:], dtype=CELL_DTYPE)
+
+# =====================================================
+# Incremental Update
+# =====================================================
+
+def apply_tickets(state, tickets, retailers):
+    """
+    Fold new tickets and current retailer coordinates into the state.
+    Returns ids of retailers whose tiles need rewriting: those with new
+    wins (including tickets resolved since an earlier run) and those whose
+    coordinates changed. Unresolved tickets are skipped.
+    """
+    counts = state['retailers']
+    tickets = tickets[tickets['retailer_id'].notna()]
+    if len(tickets) > 0:
+        new = tickets.groupby('retailer_id').agg(wins=('prize_amount', 'size'), prize=('prize_amount', 'sum'))
+        counts = counts.reindex(counts.index.union(new.index))
+        counts['wins'] = counts['wins'].fillna(0).astype(np.int64).add(new['wins'], fill_value=0).astype(np.int64)
+        counts['prize'] = counts['prize'].fillna(0).add(new['prize'], fill_value=0)
+
+    coords = retailers.set_index('id')[['latitude', 'longitude']].apply(pd.to_numeric, errors='coerce')
+    coords = coords.reindex(counts.index)
+    before = counts[['latitude', 'longitude']]
+    moved = ~((coords == before) | (coords.isna() & before.isna())).all(axis=1)
+    counts[['latitude', 'longitude']] = coords
+
+    state['retailers'] = counts
+    return set(tickets['retailer_id'].unique()) | set(counts.index[moved]), before
+
+
+def placed(frame):
+    """Rows with coordinates, and their finest-resolution pixel positions."""
+    frame = frame[frame['latitude'].notna() & frame['longitude'].notna()]
+    px, py = pixels(frame['latitude'].to_numpy(), frame['longitude'].to_numpy())
+    return frame, px, py
+
+
+def build_tiles(state, dirty_retailers=None, previous_coords=None):
+    """
+    Tile rows for every tile containing one of `dirty_retailers` (at its
+    current or previous position), or for all tiles when None. Returns
+    (tile rows, quadkeys of dirty tiles that are now empty).
+    """
+    retailers, px, py = placed(state['retailers'][state['retailers']['wins'] > 0])
+    wins = retailers['wins'].to_numpy()
+    prize = retailers['prize'].to_numpy()
+
+    if dirty_retailers is not None:
+        touched = pd.Index(sorted(dirty_retailers))
+        _, cpx, cpy = placed(state['retailers'].reindex(touched).dropna(subset=['wins']))
+        if previous_coords is None:
+            previous_coords = pd.DataFrame(columns=['latitude', 'longitude'], dtype=np.float64)
+        _, opx, opy = placed(previous_coords.reindex(touched))
+        dirty_px, dirty_py = np.concatenate([cpx, opx]), np.concatenate([cpy, opy])
+
+    rows, emptied = [], []
+    for zoom in range(MIN_ZOOM, MAX_ZOOM + 1):
+        x, y, tile = tile_ids(px, py, zoom)
+        keep = np.ones(len(tile), dtype=bool)
+        if dirty_retailers is not None:
+            dirty = np.unique(tile_ids(dirty_px, dirty_py, zoom)[2])
+            keep = np.isin(tile, dirty)
+            emptied.extend(zip([zoom] * len(dirty), dirty[~np.isin(dirty, tile)]))
+
+        cells = pd.DataFrame({
+            'tile': tile[keep], 'x': x[keep], 'y': y[keep],
+            'cell': cell_index(px[keep], py[keep], zoom), 'wins': wins[keep], 'prize': prize[keep],
+        }).groupby(['tile', 'cell'], sort=True).agg(x=('x', 'first'), y=('y', 'first'),
+                                                    wins=('wins', 'sum'), prize=('prize', 'sum')).reset_index()
+        if len(cells) == 0:
+            continue
+
+        # Cells are sorted by tile; split them into one blob per tile
+        starts = np.flatnonzero(np.r_[True, cells['tile'].to_numpy()[1:] != cells['tile'].to_numpy()[:-1]])
+        ends = np.r_[starts[1:], len(cells)]
+        cell, cell_wins, cell_prize, tile_x, tile_y = (
+            cells[column].to_numpy() for column in ('cell', 'wins', 'prize', 'x', 'y')
+        )
+        keys = quadkeys(tile_x[starts], tile_y[starts], zoom)
+        for key, start, end in zip(keys, starts, ends):
+            rows.append({
+                'quadkey': key,
+                'zoom': zoom,
+                'tile_x': int(tile_x[start]),
+                'tile_y': int(tile_y[start]),
+                'wins': int(cell_wins[start:end].sum()),
+                'total_prize_amount': round(float(cell_prize[start:end].sum()), 2),
+                'max_cell_wins': int(cell_wins[start:end].max()),
+                'cell_count': int(end - start),
+                'payload': encode_cells(cell[start:end], cell_wins[start:end], cell_prize[start:end]),
+            })
+
+    empty_keys = [quadkeys(np.array([tile >> zoom]), np.array([tile & ((1 << zoom) - 1)]), zoom)[0]
+                  for zoom, tile in emptied]
+    return rows, empty_keys
+
+# =====================================================
+# Runs
+# =====================================================
+
+def fetch_retailers(client):
+    """Retailer coordinates."""
+    retailers = fetch_all(client, 'retailers', columns='id,latitude,longitude')
+    if len(retailers) == 0:
+        return pd.DataFrame(columns=['id', 'latitude', 'longitude'])
+    return retailers
+
+
+def run_incremental(client, state, as_of):
+    """Fold new tickets into state; returns (tickets, tile rows, emptied quadkeys) for touched tiles."""
+    tickets = fetch_new_tickets(client, state['watermark'])
+    dirty, previous = apply_tickets(state, unapplied(state, tickets), fetch_retailers(client))
+    advance_watermark(state, tickets, as_of)
+    if not dirty:
+        return len(tickets), [], []
+    rows, emptied = build_tiles(state, dirty, previous)
+    return len(tickets), rows, emptied
+
+
+def run_full_rebuild(client, as_of):
+    """Rebuild state from every ticket; returns (state, tickets, all tile rows)."""
+    state = empty_state()
+    tickets = fetch_new_tickets(client)
+    apply_tickets(state, tickets, fetch_retailers(client))
+    advance_watermark(state, tickets, as_of)
+    rows, _ = build_tiles(state)
+    return state, len(tickets), rows
+
+
+def save_tiles(client, rows, emptied, as_of):
+    """Upsert tile rows and delete tiles left empty; returns rows written."""
+    for row in rows:
+        row['updated_at'] = as_of.isoformat()
+    written = upsert_batched(client, 'heatmap_tiles', rows, on_conflict='quadkey')
+    if emptied:
+        client.table('heatmap_tiles').delete().in_('quadkey', emptied).execute()
+    return written
+
+
+def compare_tiles(incremental, rebuilt):
+    """Quadkeys whose totals or payload differ between two sets of tile rows (incl. tiles only in one)."""
+    fields = ('wins', 'total_prize_amount', 'max_cell_wins', 'payload')
+    a = {row['quadkey']: tuple(row[field] for field in fields) for row in incremental}
+    b = {row['quadkey']: tuple(row[field] for field in fields) for row in rebuilt}
+    return sorted(key for key in a.keys() | b.keys() if a.get(key) != b.get(key))
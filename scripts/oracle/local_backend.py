@@ -0,0 +1,336 @@
+"""
+Local stand-in for the Supabase client, backed by SQLite.
+Implements the slice of the supabase-py / PostgREST query builder the
+batch jobs use: table().select/insert/upsert/update/delete, the
+eq/neq/gt/gte/lt/lte/in_ filters, order(), range(), limit() and
+execute().data. Used for offline runs and load tests (see connect() and
+load-synthetic-data.py); no credentials or network needed.
+
+games, prize_tiers, historical_snapshots and predictions are created with
+the columns and unique keys of supabase/migrations. Any other table is
+created on first use, and columns are added as rows bring them.
+"""
+
+import re
+import json
+import uuid
+import sqlite3
+import threading
+from collections import namedtuple
+
+# BOOLEAN / JSON columns come back as bool / parsed JSON, as PostgREST returns them
+sqlite3.register_converter('BOOLEAN', lambda value: value == b'1')
+sqlite3.register_converter('JSON', json.loads)
+
+SCHEMA = {
+    'games': """
+        id TEXT PRIMARY KEY,
+        game_number TEXT UNIQUE,
+        game_name TEXT,
+        ticket_price NUMERIC,
+        top_prize_amount NUMERIC,
+        total_top_prizes INTEGER,
+        remaining_top_prizes INTEGER,
+        overall_odds TEXT,
+        game_start_date TEXT,
+        game_end_date TEXT,
+        is_active BOOLEAN DEFAULT 1,
+        total_tickets_printed INTEGER,
+        tickets_remaining_estimate INTEGER,
+        state TEXT DEFAULT 'MN',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_scraped_at TEXT
+    """,
+    'prize_tiers': """
+        id TEXT PRIMARY KEY,
+        game_id TEXT,
+        prize_amount NUMERIC,
+        total_prizes INTEGER,
+        remaining_prizes INTEGER,
+        odds TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    """,
+    'historical_snapshots': """
+        id TEXT PRIMARY KEY,
+        game_id TEXT,
+        snapshot_date TEXT NOT NULL,
+        remaining_top_prizes INTEGER,
+        tickets_remaining_estimate INTEGER,
+        days_since_launch INTEGER,
+        top_prize_depletion_rate NUMERIC,
+        expected_value NUMERIC,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (game_id, snapshot_date)
+    """,
+    'predictions': """
+        id TEXT PRIMARY KEY,
+        game_id TEXT,
+        prediction_date TEXT NOT NULL,
+        ai_score NUMERIC,
+        ai_score_lower NUMERIC,
+        ai_score_upper NUMERIC,
+        win_probability NUMERIC,
+        expected_value NUMERIC,
+        confidence_level NUMERIC,
+        model_version TEXT,
+        features_used JSON,
+        recommendation TEXT,
+        top_contributions JSON,
+        reasoning TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (game_id, prediction_date, model_version)
+    """,
+}
+
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_games_active ON games(is_active, state)',
+    'CREATE INDEX IF NOT EXISTS idx_prize_tiers_game ON prize_tiers(game_id)',
+    'CREATE INDEX IF NOT EXISTS idx_snapshots_date ON historical_snapshots(snapshot_date)',
+    'CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions(prediction_date)',
+)
+
+FILTER_OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+LocalResponse = namedtuple('LocalResponse', 'data count')
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _quote(name):
+    """Quote a table or column name, rejecting anything that isn't an identifier."""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return f'"{name}"'
+
+
+def _adapt(value):
+    """Python value -> SQLite parameter (lists/dicts stored as JSON text)."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _column_type(value):
+    """Declared type for a column added on the fly, from its first value."""
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, (list, dict)):
+        return 'JSON'
+    return ''
+
+
+class LocalClient:
+    """SQLite database with a supabase-py compatible table() entry point."""
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        # Shared by the pipeline's worker threads; statements are serialized by the lock
+        self.conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.lock = threading.RLock()
+        with self.conn:
+            for table, columns in SCHEMA.items():
+                self.conn.execute(f'CREATE TABLE IF NOT EXISTS {_quote(table)} ({columns})')
+            for statement in INDEXES:
+                self.conn.execute(statement)
+        self._columns = {}
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    def close(self):
+        self.conn.close()
+
+    def columns(self, table):
+        """Column names of a table, creating it if it doesn't exist yet."""
+        if table not in self._columns:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS {_quote(table)} (id TEXT PRIMARY KEY)')
+            info = self.conn.execute(f'PRAGMA table_info({_quote(table)})').fetchall()
+            self._columns[table] = {row[1] for row in info}
+        return self._columns[table]
+
+    def ensure_columns(self, table, columns, sample=None):
+        """Add any missing columns (typed from the sample row's values)."""
+        known = self.columns(table)
+        for column in columns:
+            if column not in known:
+                declared = _column_type((sample or {}).get(column))
+                self.conn.execute(f'ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} {declared}')
+                known.add(column)
+
+    def ensure_unique(self, table, columns):
+        """Unique index backing an upsert's on_conflict columns."""
+        if columns == ['id']:
+            return
+        name = _quote(f"uq_{table}_{'_'.join(columns)}")
+        self.conn.execute(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {_quote(table)} '
+            f'({", ".join(_quote(column) for column in columns)})'
+        )
+
+
+class LocalQuery:
+    """One request: select, insert, upsert, update or delete plus filters."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = None
+        self.columns = '*'
+        self.rows = None
+        self.values = None
+        self.on_conflict = None
+        self.filters = []
+        self.ordering = []
+        self.offset = None
+        self.count_limit = None
+
+    # --- Actions ---
+
+    def select(self, columns='*'):
+        self.action, self.columns = 'select', columns
+        return self
+
+    def insert(self, rows):
+        self.action, self.rows = 'insert', rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict='id', **_):
+        self.action, self.rows = 'upsert', rows if isinstance(rows, list) else [rows]
+        self.on_conflict = [column.strip() for column in on_conflict.split(',')]
+        return self
+
+    def update(self, values):
+        self.action, self.values = 'update', values
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    # --- Filters and modifiers ---
+
+    def _filter(self, op, column, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter('eq', column, value)
+
+    def neq(self, column, value):
+        return self._filter('neq', column, value)
+
+    def gt(self, column, value):
+        return self._filter('gt', column, value)
+
+    def gte(self, column, value):
+        return self._filter('gte', column, value)
+
+    def lt(self, column, value):
+        return self._filter('lt', column, value)
+
+    def lte(self, column, value):
+        return self._filter('lte', column, value)
+
+    def in_(self, column, values):
+        return self._filter('in', column, list(values))
+
+    def order(self, column, desc=False, **_):
+        self.ordering.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.offset, self.count_limit = start, end - start + 1
+        return self
+
+    def limit(self, size):
+        self.count_limit = size
+        return self
+
+    # --- Execution ---
+
+    def _where(self):
+        clauses, params = [], []
+        for op, column, value in self.filters:
+            if op == 'in':
+                clauses.append(f'{_quote(column)} IN ({", ".join("?" * len(value))})' if value else '0')
+                params += [_adapt(item) for item in value]
+            else:
+                clauses.append(f'{_quote(column)} {FILTER_OPERATORS[op]} ?')
+                params.append(_adapt(value))
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def execute(self):
+        with self.client.lock, self.client.conn:
+            self.client.columns(self.table)
+            if self.action == 'select':
+                return self._select()
+            if self.action in ('insert', 'upsert'):
+                return self._write()
+            if self.action == 'update':
+                return self._update()
+            if self.action == 'delete':
+                return self._delete()
+            raise ValueError(f"No action for table {self.table!r}")
+
+    def _select(self):
+        columns = [column.strip() for column in self.columns.split(',')] if self.columns != '*' else []
+        # Columns no row has written yet read as NULL rather than failing
+        self.client.ensure_columns(self.table, columns)
+        where, params = self._where()
+        sql = f'SELECT {", ".join(map(_quote, columns)) or "*"} FROM {_quote(self.table)}{where}'
+        if self.ordering:
+            sql += ' ORDER BY ' + ', '.join(
+                f'{_quote(column)} {"DESC NULLS LAST" if desc else "ASC NULLS LAST"}' for column, desc in self.ordering
+            )
+        if self.count_limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [self.count_limit, self.offset or 0]
+
+        cursor = self.client.conn.execute(sql, params)
+        names = [description[0] for description in cursor.description]
+        return LocalResponse([dict(zip(names, row)) for row in cursor.fetchall()], None)
+
+    def _write(self):
+        if not self.rows:
+            return LocalResponse([], None)
+        columns = list(dict.fromkeys(column for row in self.rows for column in row))
+        self.client.ensure_columns(self.table, columns, self.rows[0])
+
+        # Generated ids fill in the UUID default; a caller-given id is kept
+        generate_id = 'id' not in columns
+        names = (['id'] if generate_id else []) + columns
+        params = [
+            ([str(uuid.uuid4())] if generate_id else []) + [_adapt(row.get(column)) for column in columns]
+            for row in self.rows
+        ]
+
+        sql = (f'INSERT INTO {_quote(self.table)} ({", ".join(map(_quote, names))}) '
+               f'VALUES ({", ".join("?" * len(names))})')
+        if self.action == 'upsert':
+            self.client.ensure_unique(self.table, self.on_conflict)
+            updates = [column for column in columns if column not in self.on_conflict]
+            sql += f' ON CONFLICT ({", ".join(map(_quote, self.on_conflict))}) DO ' + (
+                'UPDATE SET ' + ', '.join(f'{_quote(column)} = excluded.{_quote(column)}' for column in updates)
+                if updates else 'NOTHING'
+            )
+        self.client.conn.executemany(sql, params)
+        return LocalResponse(self.rows, None)
+
+    def _update(self):
+        self.client.ensure_columns(self.table, list(self.values), self.values)
+        where, params = self._where()
+        assignments = ', '.join(f'{_quote(column)} = ?' for column in self.values)
+        self.client.conn.execute(
+            f'UPDATE {_quote(self.table)} SET {assignments}{where}',
+            [_adapt(value) for value in self.values.values()] + params,
+        )
+        return LocalResponse([], None)
+
+    def _delete(self):
+        where, params = self._where()
+        self.client.conn.execute(f'DELETE FROM {_quote(self.table)}{where}', params)
+        return LocalResponse([], None)
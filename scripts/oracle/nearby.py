@@ -0,0 +1,188 @@
+"""
+"Best retailers near me" queries.
+NearbyIndex holds active retailers and their latest retailer_predictions
+in a haversine ball-tree, so radius and k-nearest searches run in memory
+for a whole batch of user locations at once instead of one earthdistance
+SQL query per request. Matches are ranked by hotness score (ties to the
+closer store).
+
+NearbyService keeps one index current: a background thread polls a cheap
+change signature (latest retailers.updated_at and predicted_at) and
+rebuilds the index off to the side, swapping it in when done, so queries
+never wait on a rebuild.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from oracle.db import fetch_all
+from oracle.retailer_scoring import EARTH_RADIUS_MILES, MODEL_VERSION
+
+RETAILER_COLUMNS = 'id,name,address,city,state,latitude,longitude'
+PREDICTION_COLUMNS = 'retailer_id,hotness_score,confidence_level,predicted_next_win_days,predicted_at'
+
+NEARBY_COLUMNS = ['retailer_id', 'name', 'address', 'city', 'state', 'latitude', 'longitude',
+                  'hotness_score', 'confidence_level', 'predicted_next_win_days']
+
+DEFAULT_REFRESH_SECONDS = 300
+
+# =====================================================
+# Index
+# =====================================================
+
+class NearbyIndex:
+    """Ball-tree over geocoded retailers with their hotness scores."""
+
+    def __init__(self, retailers, signature=None):
+        """retailers: one row per retailer with NEARBY_COLUMNS."""
+        retailers = retailers.copy()
+        for column in ('latitude', 'longitude', 'hotness_score', 'confidence_level'):
+            retailers[column] = pd.to_numeric(retailers[column], errors='coerce')
+        self.retailers = retailers.dropna(subset=['latitude', 'longitude']).reset_index(drop=True)
+        self.signature = signature
+        # Unscored retailers rank below every scored one
+        self.score = self.retailers['hotness_score'].fillna(-1.0).to_numpy(np.float64)
+        coords = np.radians(self.retailers[['latitude', 'longitude']].to_numpy(np.float64))
+        self.tree = BallTree(coords if len(coords) else np.zeros((0, 2)), metric='haversine')
+
+    def __len__(self):
+        return len(self.retailers)
+
+    @staticmethod
+    def points(latitudes, longitudes):
+        """Query locations as an (n, 2) array of radians."""
+        return np.radians(np.column_stack([np.atleast_1d(latitudes), np.atleast_1d(longitudes)]).astype(np.float64))
+
+    def radius(self, latitudes, longitudes, miles, limit=None):
+        """
+        Retailers within `miles` of each location, best score first.
+        Returns one (row positions, distances in miles) pair per location,
+        each cut to `limit` rows if given.
+        """
+        points = self.points(latitudes, longitudes)
+        if len(self) == 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0))
+            return [empty] * len(points)
+
+        ind, dist = self.tree.query_radius(points, r=miles / EARTH_RADIUS_MILES, return_distance=True)
+        lengths = np.fromiter((len(i) for i in ind), dtype=np.int64, count=len(ind))
+        query = np.repeat(np.arange(len(ind)), lengths)
+        rows = np.concatenate(ind).astype(np.int64)
+        dist = np.concatenate(dist) * EARTH_RADIUS_MILES
+
+        # One sort for the whole batch: by query, then score desc, then distance
+        order = np.lexsort((dist, -self.score[rows], query))
+        rows, dist = rows[order], dist[order]
+        starts = np.r_[0, np.cumsum(lengths)[:-1]]
+        if limit is not None:
+            keep = np.arange(len(rows)) - np.repeat(starts, lengths) < limit
+            rows, dist = rows[keep], dist[keep]
+            lengths = np.minimum(lengths, limit)
+            starts = np.r_[0, np.cumsum(lengths)[:-1]]
+        return [(rows[s:s + n], dist[s:s + n]) for s, n in zip(starts, lengths)]
+
+    def nearest(self, latitudes, longitudes, k):
+        """
+        The k closest retailers to each location, best score first.
+        Returns (row positions, distances in miles), both (locations, k).
+        """
+        points = self.points(latitudes, longitudes)
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty((len(points), 0), dtype=np.int64), np.empty((len(points), 0))
+
+        dist, rows = self.tree.query(points, k=k)
+        dist = dist * EARTH_RADIUS_MILES
+        order = np.lexsort((dist, -self.score[rows]), axis=-1)
+        return np.take_along_axis(rows, order, axis=1), np.take_along_axis(dist, order, axis=1)
+
+    def frame(self, rows, miles):
+        """Retailer rows for the given positions, with their distance."""
+        return self.retailers.iloc[rows].assign(distance_miles=miles).reset_index(drop=True)
+
+# =====================================================
+# Loading
+# =====================================================
+
+def change_signature(client, model_version=MODEL_VERSION):
+    """Latest retailer update and prediction time; changes whenever the index would."""
+    retailers = (client.table('retailers').select('updated_at')
+                 .order('updated_at', desc=True).limit(1).execute().data)
+    predictions = (client.table('retailer_predictions').select('predicted_at')
+                   .eq('model_version', model_version)
+                   .order('predicted_at', desc=True).limit(1).execute().data)
+    return (retailers[0]['updated_at'] if retailers else None,
+            predictions[0]['predicted_at'] if predictions else None)
+
+
+def load_nearby(client, model_version=MODEL_VERSION):
+    """NearbyIndex over active retailers and their latest predictions, from Supabase."""
+    signature = change_signature(client, model_version)
+    retailers = fetch_all(client, 'retailers', columns=RETAILER_COLUMNS, filters=[('eq', 'is_active', True)])
+    if len(retailers) == 0:
+        return NearbyIndex(pd.DataFrame(columns=NEARBY_COLUMNS), signature)
+
+    predictions = fetch_all(client, 'retailer_predictions', columns=PREDICTION_COLUMNS,
+                            filters=[('eq', 'model_version', model_version)])
+    if len(predictions) == 0:
+        predictions = pd.DataFrame(columns=PREDICTION_COLUMNS.split(','))
+    latest = (predictions.sort_values('predicted_at', kind='mergesort')
+              .drop_duplicates('retailer_id', keep='last'))
+
+    merged = retailers.rename(columns={'id': 'retailer_id'}).merge(latest, on='retailer_id', how='left')
+    return NearbyIndex(merged[NEARBY_COLUMNS], signature)
+
+# =====================================================
+# Service
+# =====================================================
+
+class NearbyService:
+    """
+    Holds the current NearbyIndex and rebuilds it in the background.
+    Callers take `service.index` once per batch and query and frame
+    against that snapshot, since row positions are per index.
+    """
+
+    def __init__(self, client, model_version=MODEL_VERSION, refresh_seconds=DEFAULT_REFRESH_SECONDS):
+        self.client = client
+        self.model_version = model_version
+        self.refresh_seconds = refresh_seconds
+        self.index = load_nearby(client, model_version)
+        self.stopped = threading.Event()
+        self.thread = None
+        self.rebuilds = 0
+
+    def refresh(self):
+        """Rebuild the index if retailers or predictions changed; returns True if it did."""
+        signature = change_signature(self.client, self.model_version)
+        if signature == self.index.signature:
+            return False
+        index = load_nearby(self.client, self.model_version)
+        # Swapping the reference is atomic; in-flight queries finish on the old index
+        self.index = index
+        self.rebuilds += 1
+        return True
+
+    def _poll(self):
+        while not self.stopped.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the last good index
+                print(f"[WARNING]  Warning: nearby index refresh failed: {e}")
+
+    def start(self):
+        """Start polling for changes in a daemon thread."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._poll, name='nearby-refresh', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop the polling thread."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
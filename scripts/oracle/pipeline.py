@@ -0,0 +1,156 @@
+"""
+Asynchronous prediction pipeline.
+Three stages connected by bounded queues, so network and CPU work overlap:
+- fetch: `fetch_concurrency` requests page through the active games
+- score: pages are scored (features + model) in one worker thread; pages
+  that queued up while it was busy are scored together, since each model
+  call has a per-tree cost regardless of row count
+- write: `write_concurrency` workers upsert scored pages
+With a QualityMonitor, each scored chunk is checked before it is queued
+for writing; a blocking issue stops the run (QualityError), though pages
+already written stay written.
+The Supabase client is blocking, so requests run in threads via
+asyncio.to_thread. Bounded queues keep a slow stage from piling up pages;
+end-to-end time tends toward the slowest stage instead of the sum.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from oracle.db import PAGE_SIZE, fetch_page
+from oracle.predictions import PREDICTION_DTYPE, predict_games, save_prediction_records
+from oracle.quality import QUALITY_GATE, QualityError, blocking
+from oracle.schema import apply_schema
+
+FETCH_CONCURRENCY = 4
+WRITE_CONCURRENCY = 2
+
+# Pages buffered between stages
+QUEUE_SIZE = 4
+
+# Most rows scored in one call when coalescing queued pages
+MAX_SCORE_ROWS = 50_000
+
+GAME_FILTERS = [('eq', 'is_active', True)]
+
+# End-of-stream marker
+_DONE = None
+
+
+async def _fetch_pages(client, pages, page_size, concurrency, busy):
+    """Page through active games with up to `concurrency` requests in flight."""
+    next_offset = 0
+    exhausted = False
+
+    async def worker():
+        nonlocal next_offset, exhausted
+        while not exhausted:
+            offset = next_offset
+            next_offset += page_size
+            start = time.perf_counter()
+            rows = await asyncio.to_thread(
+                fetch_page, client, 'games', offset, filters=GAME_FILTERS, page_size=page_size,
+            )
+            busy['fetch'] += time.perf_counter() - start
+            if len(rows) < page_size:
+                exhausted = True
+            if rows:
+                await pages.put((offset, apply_schema(pd.DataFrame(rows), 'games')))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await pages.put(_DONE)
+
+
+def _take_queued(pages, first, max_rows):
+    """The next page plus any already waiting, up to max_rows; (items, done)."""
+    items, rows = [first], len(first[1])
+    while rows < max_rows and not pages.empty():
+        item = pages.get_nowait()
+        if item is _DONE:
+            return items, True
+        items.append(item)
+        rows += len(item[1])
+    return items, False
+
+
+async def _score_pages(pages, batches, model_package, now, cache, writers, busy, max_rows, monitor, gate):
+    """Score fetched pages in a single worker thread; returns (row positions, games, records) per chunk."""
+    loop = asyncio.get_running_loop()
+    scored = []
+    done = False
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        while not done and (first := await pages.get()) is not _DONE:
+            items, done = _take_queued(pages, first, max_rows)
+            games = pd.concat([page for _, page in items], ignore_index=True)
+            start = time.perf_counter()
+            records = await loop.run_in_executor(executor, predict_games, games, model_package, now, cache, monitor)
+            busy['score'] += time.perf_counter() - start
+            if monitor is not None and blocking(issues := monitor.check(), gate):
+                raise QualityError(issues)
+            positions = np.concatenate([offset + np.arange(len(page)) for offset, page in items])
+            scored.append((positions, games, records))
+            await batches.put(records)
+
+    for _ in range(writers):
+        await batches.put(_DONE)
+    return scored
+
+
+async def _write_batches(client, batches, prediction_date, model_version, feature_cols, busy):
+    """Upsert scored pages until the end marker; returns rows written."""
+    written = 0
+    while (records := await batches.get()) is not _DONE:
+        start = time.perf_counter()
+        written += await asyncio.to_thread(
+            save_prediction_records, client, records, prediction_date, model_version, feature_cols,
+        )
+        busy['write'] += time.perf_counter() - start
+    return written
+
+
+async def run_pipeline(client, model_package, prediction_date, now=None, cache=None,
+                       fetch_concurrency=FETCH_CONCURRENCY, write_concurrency=WRITE_CONCURRENCY,
+                       queue_size=QUEUE_SIZE, page_size=PAGE_SIZE, max_score_rows=MAX_SCORE_ROWS,
+                       monitor=None, gate=QUALITY_GATE):
+    """
+    Fetch, score and save predictions for all active games with the stages
+    overlapped. Returns (games, records, written, busy seconds per stage);
+    games and records are in id order, as the sequential job produces them.
+    """
+    pages = asyncio.Queue(maxsize=queue_size)
+    batches = asyncio.Queue(maxsize=queue_size)
+    busy = {'fetch': 0.0, 'score': 0.0, 'write': 0.0}
+    model_version = model_package.get('version', 'v1.0')
+    feature_cols = model_package['feature_cols']
+
+    # A failing stage cancels the others; a single error is re-raised as itself
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(_fetch_pages(client, pages, page_size, fetch_concurrency, busy))
+            scoring = group.create_task(
+                _score_pages(pages, batches, model_package, now, cache, write_concurrency, busy, max_score_rows,
+                             monitor, gate))
+            writers = [
+                group.create_task(_write_batches(client, batches, prediction_date, model_version, feature_cols, busy))
+                for _ in range(write_concurrency)
+            ]
+    except ExceptionGroup as errors:
+        if len(errors.exceptions) == 1:
+            raise errors.exceptions[0] from None
+        raise
+
+    scored = scoring.result()
+    written = sum(writer.result() for writer in writers)
+    if not scored:
+        return pd.DataFrame(), np.empty(0, dtype=PREDICTION_DTYPE), written, busy
+
+    # Pages finish out of order; restore fetch (id) order
+    order = np.argsort(np.concatenate([positions for positions, _, _ in scored]), kind='stable')
+    games = pd.concat([games for _, games, _ in scored], ignore_index=True).iloc[order].reset_index(drop=True)
+    # Pages have their own categories; concat falls back to strings, so re-apply
+    games = apply_schema(games, 'games')
+    records = np.concatenate([records for _, _, records in scored])[order]
+    return games, records, written, busy
@@ -0,0 +1,189 @@
+"""
+Budget-constrained ticket portfolios.
+game_return_stats() turns prize tiers into each game's per-ticket expected
+net return and variance, as the app's EVCalculator / VarianceAnalyzer do
+(P(tier) = remaining prizes / tickets). PortfolioOptimizer then picks how
+many tickets of each game to buy with a budget, maximizing expected
+return with the portfolio's variance under the risk profile's limit:
+- the variance limit is handled by Lagrangian relaxation: maximize
+  sum(ev - lam * variance) and bisect lam until the limit holds
+- each relaxation is an unbounded knapsack over price units, one
+  vectorized step (over all affordable games) per unit of budget
+The budget is spent as fully as ticket prices allow; the optimizer
+chooses the mix, not whether to play. Tickets are treated as independent
+draws. Results are memoized per (budget, risk profile, snapshot date).
+"""
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+from oracle.db import fetch_all
+from oracle.features import numeric
+from oracle.schema import apply_schema
+
+# Risk profile (the app's UserProfile.riskProfile) -> limit on the portfolio's
+# return standard deviation, as a multiple of the budget (None: no limit)
+RISK_STD_LIMITS = {
+    'low': 1.0,
+    'medium': 5.0,
+    'high': None,
+}
+
+# Lagrange multiplier search: doublings to find an upper bound, then bisection steps
+MAX_DOUBLINGS = 60
+BISECTION_STEPS = 30
+
+Portfolio = namedtuple('Portfolio', 'picks spend expected_return std_dev within_limit')
+
+# =====================================================
+# Per-Game Return Statistics
+# =====================================================
+
+def game_return_stats(games, tiers):
+    """
+    Per-ticket price, expected net return and variance per game, from its
+    prize tiers. Tickets are tickets_remaining_estimate, else
+    total_tickets_printed; games without tickets or valid tiers are left out.
+    """
+    estimate = numeric(games, 'tickets_remaining_estimate')
+    tickets = np.where(estimate > 0, estimate, numeric(games, 'total_tickets_printed'))
+    games = pd.DataFrame({
+        'game_id': games['id'].to_numpy(),
+        'game_name': games.get('game_name', pd.Series('Unknown', index=games.index)).to_numpy(),
+        'ticket_price': pd.to_numeric(games['ticket_price'], errors='coerce').to_numpy(),
+        'tickets': tickets,
+    })
+    games = games[(games['ticket_price'] > 0) & (games['tickets'] > 0)]
+
+    amount = pd.to_numeric(tiers['prize_amount'], errors='coerce').to_numpy(dtype=np.float64)
+    remaining = pd.to_numeric(tiers['remaining_prizes'], errors='coerce').to_numpy(dtype=np.float64)
+    total = pd.to_numeric(tiers['total_prizes'], errors='coerce').to_numpy(dtype=np.float64)
+    # Same validity rule as EVCalculator: skip tiers with remaining outside [0, total]
+    valid = (remaining >= 0) & (remaining <= total) & (amount > 0)
+
+    tier_tickets = pd.Series(games['tickets'].to_numpy(), index=games['game_id']).reindex(tiers['game_id']).to_numpy()
+    probability = np.where(valid, remaining / tier_tickets, np.nan)
+    moments = pd.DataFrame({
+        'game_id': tiers['game_id'].to_numpy(),
+        'win_probability': probability,
+        'payout': probability * amount,
+        'payout_square': probability * amount ** 2,
+    }).dropna().groupby('game_id').sum()
+
+    stats = games.merge(moments, left_on='game_id', right_index=True, how='inner')
+    stats = stats[stats['win_probability'] <= 1]
+    # Variance doesn't depend on the price shift: E[X^2] - E[X]^2 of the payout
+    stats['ev'] = stats['payout'] - stats['ticket_price']
+    stats['variance'] = np.maximum(stats['payout_square'] - stats['payout'] ** 2, 0)
+    return stats[['game_id', 'game_name', 'ticket_price', 'ev', 'variance', 'win_probability']].reset_index(drop=True)
+
+
+def load_return_stats(client):
+    """game_return_stats() for all active games, from Supabase."""
+    games = apply_schema(fetch_all(client, 'games', filters=[('eq', 'is_active', True)]), 'games')
+    tiers = apply_schema(fetch_all(client, 'prize_tiers', columns='game_id,prize_amount,total_prizes,remaining_prizes'),
+                         'prize_tiers')
+    if len(games) == 0 or len(tiers) == 0:
+        return game_return_stats(pd.DataFrame(columns=['id', 'ticket_price']),
+                                 pd.DataFrame(columns=['game_id', 'prize_amount', 'total_prizes',
+                                                       'remaining_prizes']))
+    return game_return_stats(games, tiers)
+
+# =====================================================
+# Knapsack
+# =====================================================
+
+def knapsack(units, values, capacity):
+    """
+    Unbounded knapsack: ticket counts per game maximizing sum(values) while
+    spending exactly the largest reachable number of units <= capacity.
+    units must be sorted ascending.
+    """
+    best = np.full(capacity + 1, -np.inf)
+    best[0] = 0.0
+    choice = np.full(capacity + 1, -1, dtype=np.int64)
+    for spend in range(1, capacity + 1):
+        # Games priced at most `spend` units are a prefix of the sorted units
+        affordable = np.searchsorted(units, spend, side='right')
+        if affordable == 0:
+            continue
+        candidates = best[spend - units[:affordable]] + values[:affordable]
+        pick = int(np.argmax(candidates))
+        if candidates[pick] > -np.inf:
+            best[spend], choice[spend] = candidates[pick], pick
+
+    counts = np.zeros(len(units), dtype=np.int64)
+    spend = int(np.flatnonzero(best > -np.inf).max())
+    while spend > 0:
+        counts[choice[spend]] += 1
+        spend -= units[choice[spend]]
+    return counts
+
+
+class PortfolioOptimizer:
+    """Memoized portfolio lookups over one snapshot of per-game return stats."""
+
+    def __init__(self, stats, snapshot_date):
+        self.snapshot_date = str(snapshot_date)
+        stats = stats.sort_values(['ticket_price', 'game_id'], kind='mergesort').reset_index(drop=True)
+        cents = np.round(stats['ticket_price'].to_numpy() * 100).astype(np.int64)
+        # Price unit: the largest amount every ticket price is a multiple of
+        self.unit = int(np.gcd.reduce(cents)) if len(cents) else 100
+        self.stats = stats
+        self.units = cents // self.unit
+        self.ev = stats['ev'].to_numpy()
+        self.variance = stats['variance'].to_numpy()
+        self.cache = {}
+
+    def optimize(self, budget, risk='medium'):
+        """Best Portfolio for a budget and risk profile (memoized)."""
+        if risk not in RISK_STD_LIMITS:
+            raise ValueError(f"Unknown risk profile: {risk} (expected one of {', '.join(RISK_STD_LIMITS)})")
+        key = (float(budget), risk, self.snapshot_date)
+        if key not in self.cache:
+            self.cache[key] = self._solve(float(budget), risk)
+        return self.cache[key]
+
+    def _solve(self, budget, risk):
+        capacity = int(np.floor(budget * 100 / self.unit + 1e-9))
+        if len(self.units) == 0 or capacity < self.units[0]:
+            return self._portfolio(np.zeros(len(self.units), dtype=np.int64), True)
+
+        std_limit = RISK_STD_LIMITS[risk]
+        limit = None if std_limit is None else (std_limit * budget) ** 2
+        counts = knapsack(self.units, self.ev, capacity)
+        if limit is None or counts @ self.variance <= limit:
+            return self._portfolio(counts, True)
+
+        # Smallest multiplier whose relaxed optimum meets the variance limit
+        low, high = 0.0, 1.0 / max(float(self.variance.max()), 1e-12)
+        for _ in range(MAX_DOUBLINGS):
+            counts = knapsack(self.units, self.ev - high * self.variance, capacity)
+            if counts @ self.variance <= limit:
+                break
+            low, high = high, high * 2
+        else:
+            # Even the lowest-variance way to spend the budget is over the limit
+            return self._portfolio(counts, False)
+
+        best = counts
+        for _ in range(BISECTION_STEPS):
+            middle = (low + high) / 2
+            counts = knapsack(self.units, self.ev - middle * self.variance, capacity)
+            if counts @ self.variance <= limit:
+                high, best = middle, counts
+            else:
+                low = middle
+        return self._portfolio(best, True)
+
+    def _portfolio(self, counts, within_limit):
+        picks = self.stats[counts > 0].assign(tickets=counts[counts > 0])
+        picks = picks.sort_values('tickets', ascending=False, kind='mergesort').reset_index(drop=True)
+        return Portfolio(
+            picks=picks,
+            spend=float(counts @ self.stats['ticket_price'].to_numpy()),
+            expected_return=float(counts @ self.ev),
+            std_dev=float(np.sqrt(counts @ self.variance)),
+            within_limit=within_limit,
+        )
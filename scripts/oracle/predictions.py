@@ -0,0 +1,218 @@
+"""
+Batch prediction records.
+Predictions are carried as one NumPy structured array (float32 scores,
+uint8 recommendation codes) instead of a dict per game; batch-wide values
+(date, model version, feature list) are stored once and only joined in
+when rows are converted to JSON for the predictions table.
+"""
+
+import math
+import numpy as np
+
+from oracle.db import upsert_batched
+from oracle.explain import TOP_CONTRIBUTIONS, feature_contributions, top_contributions
+from oracle.feature_cache import cached_features
+from oracle.reasoning import contribution_strings, reasoning_strings
+from oracle.training import MAX_INTERVAL_WIDTH, prediction_intervals
+
+# Recommendation codes (index into this tuple)
+RECOMMENDATIONS = ('strong_buy', 'buy', 'neutral', 'avoid', 'strong_avoid')
+STRONG_BUY, BUY, NEUTRAL, AVOID, STRONG_AVOID = range(len(RECOMMENDATIONS))
+
+# EV and win probability are stored with 4-6 decimals, so they stay float64.
+# top_features are positions in the model's feature_cols (-1: none) and
+# top_contributions their score points, largest first.
+PREDICTION_DTYPE = np.dtype([
+    ('game_id', object),
+    ('ai_score', np.float32),
+    ('ai_score_lower', np.float32),
+    ('ai_score_upper', np.float32),
+    ('win_probability', np.float64),
+    ('expected_value', np.float64),
+    ('confidence_level', np.float32),
+    ('recommendation', np.uint8),
+    ('top_features', np.int8, (TOP_CONTRIBUTIONS,)),
+    ('top_contributions', np.float32, (TOP_CONTRIBUTIONS,)),
+    ('reasoning', object),
+])
+
+# =====================================================
+# Scoring
+# =====================================================
+
+def confidence_scores(features, model_r2, interval_width=None):
+    """
+    Confidence from data quality: mean of data recency, prize data
+    completeness and model test R² (each 0-100). With ensemble intervals,
+    per-game model uncertainty (100 at zero width, 0 at MAX_INTERVAL_WIDTH)
+    is averaged in as a fourth factor.
+    """
+    recency = features['recency'].to_numpy()
+    recency_factor = np.select([recency <= 1, recency <= 7, recency <= 30], [100, 80, 50], default=20)
+
+    complete = (features['remaining_prizes'].to_numpy() > 0) & (features['total_prizes'].to_numpy() > 0)
+    completeness_factor = np.where(complete, 100, 30)
+
+    model_factor = min(model_r2 * 100, 100)
+    if interval_width is None:
+        return (recency_factor + completeness_factor + model_factor) / 3
+
+    uncertainty_factor = np.clip(100 * (1 - interval_width / MAX_INTERVAL_WIDTH), 0, 100)
+    return (recency_factor + completeness_factor + model_factor + uncertainty_factor) / 4
+
+
+def recommendation_codes(ai_score, confidence, lower=None, upper=None):
+    """
+    Vectorized recommendation levels:
+    - strong_buy: Score >= 75 and confidence >= 70
+    - buy: Score >= 60 and confidence >= 60
+    - neutral: Score 40-60 or low confidence
+    - avoid: Score < 40 and confidence >= 60
+    - strong_avoid: Score < 25 and confidence >= 70
+    With a calibrated prediction interval, strong calls also need the
+    whole interval on their side (lower >= 60 / upper < 40); otherwise
+    they drop to buy / avoid.
+    """
+    lower = ai_score if lower is None else lower
+    upper = ai_score if upper is None else upper
+    return np.select(
+        [confidence < 50,
+         (ai_score >= 75) & (confidence >= 70) & (lower >= 60),
+         (ai_score >= 60) & (confidence >= 60),
+         ai_score >= 40,
+         (ai_score >= 25) & (confidence >= 60),
+         (ai_score < 25) & (confidence >= 70) & (upper < 40),
+         (ai_score < 25) & (confidence >= 70)],
+        [NEUTRAL, STRONG_BUY, BUY, NEUTRAL, AVOID, STRONG_AVOID, AVOID],
+        default=NEUTRAL,
+    ).astype(np.uint8)
+
+
+def predict_games(games, model_package, now=None, cache=None, monitor=None):
+    """
+    Score every game in one batch; returns a PREDICTION_DTYPE array.
+    Features go through the FeatureCache when one is given, and are fed to
+    the QualityMonitor when one is given.
+    """
+    features, _ = cached_features(games, now, cache)
+    if monitor is not None:
+        monitor.update(games, features)
+    return score_features(games, features, model_package)
+
+
+def score_features(games, features, model_package, X=None):
+    """
+    Prediction records from an already computed feature frame (X: its
+    feature_cols as an array, if the caller has one). With an 'ensemble'
+    (compiled main model + bootstrap members), all members are scored in
+    the same pass and give per-game intervals; only intervals calibrated
+    at training time ('interval_scale') feed confidence and gate strong
+    recommendations, uncalibrated ones are stored as model uncertainty
+    only. The main model's feature
+    contributions for the whole batch give each game's top features and
+    reasoning (threshold heuristics if the model can't be explained).
+    """
+    model = model_package['model']
+    ensemble = model_package.get('ensemble')
+    if X is None:
+        X = features[model_package['feature_cols']].to_numpy()
+    model_r2 = model_package.get('metrics', {}).get('test_r2', 0)
+
+    if ensemble is not None and ensemble.n_groups > 1:
+        scores = ensemble.predict_groups(X).astype(np.float64)
+        ai_score = np.clip(scores[:, 0], 0, 100)
+        interval_scale = model_package.get('interval_scale')
+        lower, upper = prediction_intervals(scores[:, 1:], interval_scale)
+        calibrated = interval_scale is not None
+    else:
+        ai_score = np.clip(model.predict(X).astype(np.float64), 0, 100)
+        lower = upper = None
+        calibrated = False
+
+    if calibrated:
+        confidence = confidence_scores(features, model_r2, upper - lower)
+        codes = recommendation_codes(ai_score, confidence, lower, upper)
+    else:
+        confidence = confidence_scores(features, model_r2)
+        codes = recommendation_codes(ai_score, confidence)
+
+    ev = features['ev'].to_numpy()
+    concentration = features['prize_concentration'].to_numpy()
+
+    records = np.empty(len(games), dtype=PREDICTION_DTYPE)
+    records['game_id'] = games['id'].to_numpy()
+    records['ai_score'] = ai_score
+    records['ai_score_lower'] = np.nan if lower is None else lower
+    records['ai_score_upper'] = np.nan if upper is None else upper
+    records['win_probability'] = np.minimum(ev * concentration / 10, 1.0)
+    records['expected_value'] = ev
+    records['confidence_level'] = confidence
+    records['recommendation'] = codes
+
+    contributions = feature_contributions(model_package, X)
+    if contributions is None:
+        records['top_features'], records['top_contributions'] = -1, np.nan
+        records['reasoning'] = reasoning_strings(features, confidence)
+    else:
+        records['top_features'], records['top_contributions'] = top_contributions(contributions)
+        records['reasoning'] = contribution_strings(
+            features, model_package['feature_cols'], records['top_features'], records['top_contributions'],
+            confidence,
+        )
+    return records
+
+# =====================================================
+# Summary and Write
+# =====================================================
+
+def summarize(records):
+    """Score stats and recommendation counts as vectorized reductions."""
+    scores = records['ai_score']
+    counts = np.bincount(records['recommendation'], minlength=len(RECOMMENDATIONS))
+    return {
+        'mean': float(scores.mean(dtype=np.float64)) if len(scores) else 0.0,
+        'min': float(scores.min()) if len(scores) else 0.0,
+        'max': float(scores.max()) if len(scores) else 0.0,
+        'recommendations': dict(zip(RECOMMENDATIONS, counts.tolist())),
+    }
+
+
+def to_prediction_rows(records, prediction_date, model_version, feature_cols):
+    """Convert records to predictions-table JSON rows (write boundary only)."""
+    labels = np.array(RECOMMENDATIONS, dtype=object)[records['recommendation']]
+    # [[feature, points], ...] per row, largest first (None if unexplained)
+    contributions = [
+        [[feature_cols[f], round(points, 2)] for f, points in zip(positions, values) if f >= 0] or None
+        for positions, values in zip(records['top_features'].tolist(), records['top_contributions'].tolist())
+    ]
+    columns = zip(
+        records['game_id'].tolist(), records['ai_score'].tolist(),
+        records['ai_score_lower'].tolist(), records['ai_score_upper'].tolist(),
+        records['win_probability'].tolist(), records['expected_value'].tolist(),
+        records['confidence_level'].tolist(), labels.tolist(), contributions, records['reasoning'].tolist(),
+    )
+    return [
+        {
+            'game_id': game_id,
+            'prediction_date': prediction_date,
+            'ai_score': round(ai_score, 2),
+            'ai_score_lower': None if math.isnan(lower) else round(lower, 2),
+            'ai_score_upper': None if math.isnan(upper) else round(upper, 2),
+            'win_probability': round(win_probability, 6),
+            'expected_value': round(expected_value, 4),
+            'confidence_level': round(confidence, 2),
+            'model_version': model_version,
+            'features_used': feature_cols,
+            'recommendation': recommendation,
+            'top_contributions': top,
+            'reasoning': reasoning,
+        }
+        for (game_id, ai_score, lower, upper, win_probability, expected_value,
+             confidence, recommendation, top, reasoning) in columns
+    ]
+
+
+def save_prediction_records(client, records, prediction_date, model_version, feature_cols):
+    """Upsert a prediction batch into the predictions table."""
+    rows = to_prediction_rows(records, prediction_date, model_version, feature_cols)
+    return upsert_batched(client, 'predictions', rows, on_conflict='game_id,prediction_date,model_version')
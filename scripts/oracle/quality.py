@@ -0,0 +1,186 @@
+"""
+Data-quality and drift monitor.
+QualityMonitor.update() takes each chunk of raw games plus the feature
+frame the job already computed for it, and accumulates, in one vectorized
+pass per chunk:
+- null counts of the raw FEATURE_INPUTS
+- sentinel counts: odds that failed to parse (-> 0), unparseable or
+  missing dates (-> 999 days), zero prices/totals (dropped from training),
+  remaining > total prizes
+- per-feature histograms on the bin edges of the training profile
+check() compares those with limits and, via PSI and KS, with the training
+distribution stored in the model metadata ('feature_profile'), returning
+(level, message) issues for the job to warn or stop on.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from oracle.features import FEATURE_COLS, FEATURE_INPUTS, MISSING_DAYS
+
+WARN, BLOCK, OFF = 'warn', 'block', 'off'
+
+# 'block' stops the job on blocking issues, 'warn' only reports, 'off' skips checks
+QUALITY_GATE = os.getenv('ORACLE_QUALITY_GATE', BLOCK)
+
+# Quantile bins per feature in the training profile
+PROFILE_BINS = 10
+
+# Sentinel rate limits: check -> (warn at, block at)
+QUALITY_LIMITS = {
+    'odds_unparsed': (0.05, 0.25),
+    'start_date_unparsed': (0.05, 0.25),
+    'scraped_missing': (0.10, 0.50),
+    'zero_price': (0.05, 0.50),
+    'zero_total': (0.05, 0.50),
+    'remaining_over_total': (0.01, 0.10),
+}
+
+# Per-feature drift limits against the training profile: (warn at, block at)
+PSI_LIMITS = (0.10, 0.25)
+KS_LIMITS = (0.10, 0.25)
+
+# Fewer rows than this and histograms are too noisy to compare
+MIN_DRIFT_ROWS = 30
+
+# Floor for empty bins in the PSI log ratio
+PSI_EPSILON = 1e-4
+
+
+def _bins(edges, values):
+    """Bin index per value for interior edges (len(edges) + 1 bins)."""
+    return np.searchsorted(edges, values, side='right')
+
+
+def build_profile(features, bins=PROFILE_BINS):
+    """
+    Training distribution for the model metadata: quantile bin edges and
+    the share of training rows in each bin, per feature (JSON-serializable).
+    """
+    profile = {'rows': len(features), 'features': {}}
+    for column in FEATURE_COLS:
+        values = features[column].to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            continue
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))[1:-1]
+        counts = np.bincount(_bins(edges, values), minlength=len(edges) + 1)
+        profile['features'][column] = {
+            'edges': edges.tolist(),
+            'expected': (counts / len(values)).tolist(),
+        }
+    return profile
+
+
+def psi(actual, expected):
+    """Population stability index between two bin-share vectors."""
+    actual = np.maximum(np.asarray(actual, dtype=np.float64), PSI_EPSILON)
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks(actual, expected):
+    """Kolmogorov-Smirnov distance evaluated at the profile's bin edges."""
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+class QualityMonitor:
+    """Streaming counts for one run; update() once per chunk, then check()."""
+
+    def __init__(self, profile=None):
+        self.profile = profile or {}
+        self.edges = {
+            column: np.asarray(spec['edges'], dtype=np.float64)
+            for column, spec in self.profile.get('features', {}).items()
+        }
+        self.rows = 0
+        self.nulls = dict.fromkeys(FEATURE_INPUTS, 0)
+        self.sentinels = dict.fromkeys(QUALITY_LIMITS, 0)
+        self.counts = {column: np.zeros(len(edges) + 1, dtype=np.int64) for column, edges in self.edges.items()}
+
+    def update(self, games, features):
+        """Add one chunk (raw games and their feature frame, same rows)."""
+        missing = {
+            column: games[column].isna().to_numpy() if column in games else np.ones(len(games), dtype=bool)
+            for column in FEATURE_INPUTS
+        }
+        for column, mask in missing.items():
+            self.nulls[column] += int(mask.sum())
+
+        remaining = features['remaining_prizes'].to_numpy()
+        total = features['total_prizes'].to_numpy()
+        flags = {
+            'odds_unparsed': (features['odds'].to_numpy() == 0) & ~missing['overall_odds'],
+            'start_date_unparsed': (features['days_since_launch'].to_numpy() == MISSING_DAYS)
+                                   & ~missing['game_start_date'],
+            'scraped_missing': features['recency'].to_numpy() == MISSING_DAYS,
+            'zero_price': features['ticket_price'].to_numpy() == 0,
+            'zero_total': total == 0,
+            'remaining_over_total': remaining > total,
+        }
+        for name, mask in flags.items():
+            self.sentinels[name] += int(mask.sum())
+
+        for column, edges in self.edges.items():
+            values = features[column].to_numpy(dtype=np.float64)
+            self.counts[column] += np.bincount(_bins(edges, values), minlength=len(edges) + 1)
+
+        self.rows += len(games)
+
+    def rates(self):
+        """Null and sentinel shares of all rows seen."""
+        rows = max(self.rows, 1)
+        return {
+            'nulls': {column: count / rows for column, count in self.nulls.items()},
+            'sentinels': {name: count / rows for name, count in self.sentinels.items()},
+        }
+
+    def drift(self):
+        """Per-feature PSI and binned KS against the profile (empty without one)."""
+        if self.rows == 0:
+            return pd.DataFrame(columns=['psi', 'ks'])
+        rows = []
+        for column, counts in self.counts.items():
+            actual = counts / self.rows
+            expected = np.asarray(self.profile['features'][column]['expected'])
+            rows.append((column, psi(actual, expected), binned_ks(actual, expected)))
+        return pd.DataFrame(rows, columns=['feature', 'psi', 'ks']).set_index('feature')
+
+    def check(self, block_on_drift=True):
+        """
+        (level, message) issues; level is WARN or BLOCK. With
+        block_on_drift=False drift is only ever a warning (e.g. when
+        retraining, where a shifted distribution is expected).
+        """
+        issues = []
+        if self.rows == 0:
+            return [(BLOCK, "No rows to check")]
+
+        for name, rate in self.rates()['sentinels'].items():
+            warn_at, block_at = QUALITY_LIMITS[name]
+            if rate >= warn_at:
+                level = BLOCK if rate >= block_at else WARN
+                issues.append((level, f"{name}: {rate:.1%} of {self.rows} rows (limit {warn_at:.0%}/{block_at:.0%})"))
+
+        if self.edges and self.rows >= MIN_DRIFT_ROWS:
+            for feature, row in self.drift().iterrows():
+                for metric, value, (warn_at, block_at) in (('PSI', row['psi'], PSI_LIMITS),
+                                                           ('KS', row['ks'], KS_LIMITS)):
+                    if value >= warn_at:
+                        level = BLOCK if value >= block_at and block_on_drift else WARN
+                        issues.append((level, f"{feature} drift {metric} {value:.3f} "
+                                              f"(limit {warn_at:.2f}/{block_at:.2f})"))
+        return issues
+
+
+class QualityError(Exception):
+    """Raised to stop a job on blocking data-quality issues."""
+
+    def __init__(self, issues):
+        super().__init__('; '.join(message for level, message in issues if level == BLOCK))
+        self.issues = issues
+
+
+def blocking(issues, gate=QUALITY_GATE):
+    """Whether the job should stop: any BLOCK issue while the gate is 'block'."""
+    return gate == BLOCK and any(level == BLOCK for level, _ in issues)
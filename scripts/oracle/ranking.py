@@ -0,0 +1,135 @@
+"""
+Top-K ranking over a day's predictions.
+RankingIndex keeps, per risk profile and per (state, price tier), the row
+positions sorted by the profile's ranking key, so "top K games under $X
+for risk profile Y" only looks at the first K rows of each affordable
+tier: those prefixes are concatenated, cut to K with argpartition and
+ordered. Nothing is sorted at query time beyond those K rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oracle.db import fetch_all
+from oracle.predictions import RECOMMENDATIONS
+from oracle.schema import apply_schema
+
+# Risk profile (the app's UserProfile.riskProfile) -> (ranking key, minimum confidence).
+# Confidence floors follow recommendation_codes(): 70 for strong calls, 50 for any call.
+# Low risk ranks by the prediction interval's lower bound (the score a game
+# is likely to reach), so games the ensemble disagrees on drop down.
+RISK_PROFILES = {
+    'low': ('ai_score_lower', 70),
+    'medium': ('ai_score', 50),
+    'high': ('expected_value', 0),
+}
+
+# Ranking key -> column used where it's missing (predictions without an interval)
+KEY_FALLBACKS = {'ai_score_lower': 'ai_score'}
+
+RANKING_COLUMNS = ['game_id', 'game_name', 'state', 'ticket_price', 'ai_score', 'ai_score_lower',
+                   'expected_value', 'confidence_level', 'recommendation']
+
+
+class RankingIndex:
+    """Per-(state, price tier) sorted row positions for each risk profile."""
+
+    def __init__(self, predictions):
+        """predictions: one row per game with RANKING_COLUMNS."""
+        self.predictions = predictions.reset_index(drop=True)
+        self.state = self.predictions['state'].fillna('MN').astype(str).to_numpy()
+        self.price = pd.to_numeric(self.predictions['ticket_price'], errors='coerce').fillna(0).to_numpy(np.float64)
+        self.keys = {column: self.ranking_key(column) for column in {key for key, _ in RISK_PROFILES.values()}}
+        confidence = pd.to_numeric(self.predictions['confidence_level'], errors='coerce').fillna(0).to_numpy()
+
+        # Tier codes in (state, price) order
+        tiers = pd.MultiIndex.from_arrays([self.state, self.price]).sort_values().unique()
+        self.tiers = tiers
+        self.tier_code = tiers.get_indexer(pd.MultiIndex.from_arrays([self.state, self.price]))
+
+        # profile -> (rows sorted by tier then key desc, start offset per tier + end)
+        self.sorted = {}
+        for profile, (key, min_confidence) in RISK_PROFILES.items():
+            rows = np.flatnonzero(confidence >= min_confidence)
+            order = np.lexsort((rows, -self.keys[key][rows], self.tier_code[rows]))
+            rows = rows[order]
+            bounds = np.searchsorted(self.tier_code[rows], np.arange(len(tiers) + 1))
+            self.sorted[profile] = (rows, bounds)
+
+    def __len__(self):
+        return len(self.predictions)
+
+    def ranking_key(self, column):
+        """A key column as float64, missing values from its fallback and then last."""
+        values = pd.to_numeric(self.predictions[column], errors='coerce')
+        if column in KEY_FALLBACKS:
+            values = values.fillna(pd.to_numeric(self.predictions[KEY_FALLBACKS[column]], errors='coerce'))
+        return values.fillna(-np.inf).to_numpy(np.float64)
+
+    @classmethod
+    def from_records(cls, games, records):
+        """Index generate-predictions output (games frame and PREDICTION_DTYPE records, same order)."""
+        return cls(pd.DataFrame({
+            'game_id': records['game_id'],
+            'game_name': games.get('game_name', pd.Series('Unknown', index=games.index)).to_numpy(),
+            'state': games.get('state', pd.Series('MN', index=games.index)).to_numpy(),
+            'ticket_price': games['ticket_price'].to_numpy(),
+            'ai_score': records['ai_score'],
+            'ai_score_lower': records['ai_score_lower'],
+            'expected_value': records['expected_value'],
+            'confidence_level': records['confidence_level'],
+            'recommendation': np.array(RECOMMENDATIONS, dtype=object)[records['recommendation']],
+        }))
+
+    def tier_codes(self, budget=None, state=None):
+        """Codes of the (state, price) tiers matching the filters."""
+        states = self.tiers.get_level_values(0)
+        prices = self.tiers.get_level_values(1)
+        keep = np.ones(len(self.tiers), dtype=bool)
+        if budget is not None:
+            keep &= prices <= budget
+        if state is not None:
+            keep &= states == state
+        return np.flatnonzero(keep)
+
+    def top_k(self, k, budget=None, risk='medium', state=None):
+        """Row positions of the top k games priced at most `budget` for a risk profile, best first."""
+        if risk not in RISK_PROFILES:
+            raise ValueError(f"Unknown risk profile: {risk} (expected one of {', '.join(RISK_PROFILES)})")
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        rows, bounds = self.sorted[risk]
+        codes = self.tier_codes(budget, state)
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Each tier is already sorted: its first k rows are its only candidates
+        candidates = np.concatenate([rows[bounds[code]:min(bounds[code + 1], bounds[code] + k)] for code in codes])
+        scores = self.keys[RISK_PROFILES[risk][0]][candidates]
+        if len(candidates) > k:
+            # Keep everything tied with the k-th score, so ties resolve by row below
+            kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            keep = scores >= kth
+            candidates, scores = candidates[keep], scores[keep]
+        # Ties go to the earlier row (id order), as in the sorted tiers
+        return candidates[np.lexsort((candidates, -scores))][:k]
+
+    def frame(self, rows):
+        """Prediction rows for the given positions."""
+        return self.predictions.iloc[rows].reset_index(drop=True)
+
+
+def load_ranking(client, prediction_date, model_version):
+    """RankingIndex over one day's predictions for active games, from Supabase."""
+    predictions = fetch_all(
+        client, 'predictions',
+        columns='game_id,ai_score,ai_score_lower,expected_value,confidence_level,recommendation',
+        filters=[('eq', 'prediction_date', prediction_date), ('eq', 'model_version', model_version)],
+        order='game_id',
+    )
+    games = apply_schema(fetch_all(client, 'games', columns='id,game_name,state,ticket_price',
+                                   filters=[('eq', 'is_active', True)]), 'games')
+    if len(predictions) == 0 or len(games) == 0:
+        return RankingIndex(pd.DataFrame(columns=RANKING_COLUMNS))
+    merged = predictions.merge(games.rename(columns={'id': 'game_id'}), on='game_id', how='inner')
+    return RankingIndex(merged[RANKING_COLUMNS])
@@ -0,0 +1,248 @@
+"""
+Prediction reasoning text.
+contribution_strings() explains a game by the features that moved its
+score most (TreeSHAP contributions, see oracle/explain.py), e.g.
+"Expected value 1.23x (+8.4 pts) | Data 9 days old (-2.1 pts)".
+Models that can't be explained fall back to threshold heuristics:
+generate_reasoning() is the per-game definition, and reasoning_strings()
+produces the same strings for a whole batch: each threshold check becomes
+an np.digitize bucket code, each clause template is pre-rendered once per
+distinct (code, displayed number), and rows are assembled by concatenating
+clause arrays.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oracle.features import MISSING_DAYS
+
+
+def _above(x):
+    """Smallest float > x, so a digitize edge at x counts x in the lower bin."""
+    return np.nextafter(x, np.inf)
+
+# Bin edges reproduce the strict/non-strict comparisons in generate_reasoning()
+
+# ev < 0.3 | 0.3 <= ev <= 0.7 | 0.7 < ev <= 1.0 | ev > 1.0
+EV_BINS = np.array([0.3, _above(0.7), _above(1.0)])
+EV_PARTS = ('Low expected value ({ev}x)', None, 'Decent expected value ({ev}x)',
+            'Strong expected value ({ev}x)')
+
+# < 0.2 | 0.2 - 0.5 | 0.5 < c <= 0.8 | > 0.8
+CONCENTRATION_BINS = np.array([0.2, _above(0.5), _above(0.8)])
+CONCENTRATION_PARTS = ('Low prize availability ({conc}%)', None,
+                       'Moderate prize availability ({conc}%)', 'High prize availability ({conc}%)')
+
+# < 0.1 | 0.1 - 0.2 | 0.2 < d < 0.6 | 0.6 - 0.8 | > 0.8
+DEPLETION_BINS = np.array([0.1, _above(0.2), 0.6, _above(0.8)])
+DEPLETION_PARTS = ('New or slow-moving game', None, 'Active game with good turnover', None,
+                   'Game nearing end of life')
+
+# <= 1 | 2 - 7 | > 7
+RECENCY_BINS = np.array([_above(1), _above(7)])
+RECENCY_PARTS = ('Fresh data (updated today)', None, 'Data is {recency} days old')
+
+CONFIDENCE_PARTS = ('Low confidence ({conf}%) - limited data', None)
+
+DEFAULT_REASONING = "Based on mathematical analysis"
+
+# feature -> (clause template, display scale, decimals); the number is value * scale
+FEATURE_TEXT = {
+    'ticket_price': ('${} ticket', 1, 2),
+    'ev': ('Expected value {}x', 1, 2),
+    'prize_concentration': ('{}% of top prizes left', 100, 0),
+    'depletion_rate': ('{}% of top prizes claimed', 100, 0),
+    'days_since_launch': ('Launched {} days ago', 1, 0),
+    'recency': ('Data {} days old', 1, 0),
+    'odds': ('{}% overall win chance', 100, 1),
+    'velocity': ('{}% sell-through', 100, 0),
+    'prize_to_price': ('Top prize {}x the ticket price', 1, 0),
+    'remaining_prizes': ('{} top prizes left', 1, 0),
+    'total_prizes': ('{} top prizes printed', 1, 0),
+}
+
+# Fixed clauses instead of the template for values in [low, high]
+FIXED_TEXT = {
+    'days_since_launch': ((MISSING_DAYS, MISSING_DAYS, 'Launch date unknown'),),
+    'recency': ((-np.inf, 1, 'Updated today'),
+                (MISSING_DAYS, MISSING_DAYS, 'Last update unknown')),
+}
+
+
+def generate_reasoning(features, confidence):
+    """Generate human-readable reasoning for one prediction."""
+    reasons = []
+
+    # EV analysis
+    if features['ev'] > 1.0:
+        reasons.append(f"Strong expected value ({features['ev']:.2f}x)")
+    elif features['ev'] > 0.7:
+        reasons.append(f"Decent expected value ({features['ev']:.2f}x)")
+    elif features['ev'] < 0.3:
+        reasons.append(f"Low expected value ({features['ev']:.2f}x)")
+
+    # Prize concentration
+    if features['prize_concentration'] > 0.8:
+        reasons.append(f"High prize availability ({features['prize_concentration']*100:.0f}%)")
+    elif features['prize_concentration'] > 0.5:
+        reasons.append(f"Moderate prize availability ({features['prize_concentration']*100:.0f}%)")
+    elif features['prize_concentration'] < 0.2:
+        reasons.append(f"Low prize availability ({features['prize_concentration']*100:.0f}%)")
+
+    # Activity
+    if 0.2 < features['depletion_rate'] < 0.6:
+        reasons.append("Active game with good turnover")
+    elif features['depletion_rate'] < 0.1:
+        reasons.append("New or slow-moving game")
+    elif features['depletion_rate'] > 0.8:
+        reasons.append("Game nearing end of life")
+
+    # Data quality
+    if features['recency'] <= 1:
+        reasons.append("Fresh data (updated today)")
+    elif features['recency'] > 7:
+        reasons.append(f"Data is {features['recency']} days old")
+
+    # Confidence note
+    if confidence < 60:
+        reasons.append(f"Low confidence ({confidence:.0f}%) - limited data")
+
+    if not reasons:
+        reasons.append(DEFAULT_REASONING)
+
+    return " | ".join(reasons)
+
+# =====================================================
+# Vectorized Templates
+# =====================================================
+
+SEPARATOR = " | "
+
+
+def _tokens(values, shown, decimals):
+    """
+    Format each distinct displayed number once.
+    Values are keyed by their rounded integer (value * 10**decimals); rows
+    within float noise of a .5 tie take format()'s own rounding instead.
+    Returns (token index per row, -1 where not shown; token strings).
+    """
+    index = np.full(len(values), -1, dtype=np.int64)
+    if not shown.any():
+        return index, []
+
+    spec = f'.{decimals}f'
+    scale = 10 ** decimals
+    scaled = values[shown] * scale
+    keys = np.rint(scaled)
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-9 * np.maximum(np.abs(scaled), 1)
+    if tie.any():
+        keys[tie] = np.rint(np.array([float(format(v, spec)) for v in values[shown][tie].tolist()]) * scale)
+
+    index[shown], uniques = pd.factorize(keys)
+    return index, [format(key / scale, spec) for key in uniques.tolist()]
+
+
+def _pieces(codes, parts, field=None, token_idx=None, tokens=()):
+    """
+    One clause per row: templates pre-rendered per (bucket code, token),
+    prefixed with the separator ('' for buckets with no clause).
+    """
+    width = len(tokens) + 1
+    keys = codes * width + (0 if token_idx is None else token_idx + 1)
+    ids, uniques = pd.factorize(keys)
+
+    rendered = []
+    for key in uniques.tolist():
+        code, token = divmod(key, width)
+        part = parts[code]
+        if part is None:
+            rendered.append('')
+        elif token == 0:
+            rendered.append(SEPARATOR + part)
+        else:
+            rendered.append(SEPARATOR + part.format(**{field: tokens[token - 1]}))
+    return np.array(rendered, dtype=object)[ids]
+
+
+def reasoning_strings(features, confidence):
+    """Reasoning for every row of a feature frame, identical to generate_reasoning()."""
+    ev = features['ev'].to_numpy(dtype=np.float64)
+    concentration = features['prize_concentration'].to_numpy(dtype=np.float64)
+    depletion = features['depletion_rate'].to_numpy(dtype=np.float64)
+    recency = features['recency'].to_numpy()
+    confidence = np.asarray(confidence, dtype=np.float64)
+    if len(ev) == 0:
+        return np.empty(0, dtype=object)
+
+    ev_code = np.digitize(ev, EV_BINS)
+    conc_code = np.digitize(concentration, CONCENTRATION_BINS)
+    depletion_code = np.digitize(depletion, DEPLETION_BINS)
+    recency_code = np.digitize(recency, RECENCY_BINS)
+    conf_code = (confidence >= 60).astype(np.int64)
+
+    ev_idx, ev_text = _tokens(ev, ev_code != 1, 2)
+    conc_idx, conc_text = _tokens(concentration * 100, conc_code != 1, 0)
+    recency_idx, recency_text = _tokens(recency, recency_code == 2, 0)
+    conf_idx, conf_text = _tokens(confidence, conf_code == 0, 0)
+
+    joined = (
+        _pieces(ev_code, EV_PARTS, 'ev', ev_idx, ev_text)
+        + _pieces(conc_code, CONCENTRATION_PARTS, 'conc', conc_idx, conc_text)
+        + _pieces(depletion_code, DEPLETION_PARTS)
+        + _pieces(recency_code, RECENCY_PARTS, 'recency', recency_idx, recency_text)
+        + _pieces(conf_code, CONFIDENCE_PARTS, 'conf', conf_idx, conf_text)
+    )
+    strip = len(SEPARATOR)
+    return np.array([text[strip:] if text else DEFAULT_REASONING for text in joined.tolist()], dtype=object)
+
+
+def _signed(tokens):
+    """'+' on non-negative tokens (and no '-0.0')."""
+    return [token if token.startswith('-') and float(token) != 0 else '+' + token.lstrip('-')
+            for token in tokens]
+
+
+def contribution_strings(features, feature_cols, positions, points, confidence):
+    """
+    Reasoning for every row from its top contributions (positions into
+    feature_cols, -1 for none; score points), largest first, plus the
+    low-confidence note. Each (feature, displayed number) clause and each
+    displayed point value is rendered once.
+    """
+    confidence = np.asarray(confidence, dtype=np.float64)
+    n = len(confidence)
+    if n == 0:
+        return np.empty(0, dtype=object)
+
+    joined = np.full(n, '', dtype=object)
+    for slot in range(positions.shape[1]):
+        position = positions[:, slot].astype(np.int64)
+        present = position >= 0
+        if not present.any():
+            continue
+        point_idx, point_text = _tokens(points[:, slot].astype(np.float64), present, 1)
+        point_text = np.array([f" ({token} pts)" for token in _signed(point_text)] + [''], dtype=object)
+
+        clause = np.full(n, '', dtype=object)
+        for f in np.unique(position[present]).tolist():
+            name = feature_cols[f]
+            template, scale, decimals = FEATURE_TEXT.get(name, (name + ' {}', 1, 2))
+            rows = position == f
+            values = features[name].to_numpy(dtype=np.float64)
+            fixed = np.full(n, -1, dtype=np.int64)
+            for i, (low, high, _) in enumerate(FIXED_TEXT.get(name, ())):
+                fixed[rows & (fixed < 0) & (values >= low) & (values <= high)] = i
+            value_idx, value_text = _tokens(values * scale, rows & (fixed < 0), decimals)
+            rendered = np.array([template.format(token) for token in value_text], dtype=object)
+            texts = np.array([text for _, _, text in FIXED_TEXT.get(name, ())], dtype=object)
+            templated = rows & (fixed < 0)
+            clause[templated] = rendered[value_idx[templated]]
+            clause[~templated & rows] = texts[fixed[~templated & rows]]
+        joined += np.where(present, SEPARATOR + clause + point_text[point_idx], '')
+
+    conf_code = (confidence >= 60).astype(np.int64)
+    conf_idx, conf_text = _tokens(confidence, conf_code == 0, 0)
+    joined = joined + _pieces(conf_code, CONFIDENCE_PARTS, 'conf', conf_idx, conf_text)
+
+    strip = len(SEPARATOR)
+    return np.array([text[strip:] if text else DEFAULT_REASONING for text in joined.tolist()], dtype=object)
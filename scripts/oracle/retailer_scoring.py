@@ -0,0 +1,211 @@
+"""
+Retailer hot-spot scoring.
+Scores every geocoded retailer from the winning_tickets history using a
+haversine ball-tree over retailer coordinates:
+- kernel-density win intensity around each retailer
+- neighbor-smoothed recent win mass (k nearest retailers)
+All passes are vectorized over the full retailer set.
+"""
+
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from oracle.db import fetch_all, upsert_batched
+
+# Same earth radius as the distance_miles() SQL helper
+EARTH_RADIUS_MILES = 3959.0
+
+# Kernel is truncated at this many bandwidths (drops ~1% of the mass)
+KDE_CUTOFF = 3.0
+KDE_CHUNK_SIZE = 10000
+
+MODEL_VERSION = 'hotspot-v1'
+MODEL_TYPE = 'kernel_density'
+
+DEFAULT_CONFIG = {
+    'lookback_days': 365,       # Only wins claimed in this window count
+    'half_life_days': 90,       # Recency decay applied to each win
+    'bandwidth_miles': 5.0,     # KDE / smoothing kernel width
+    'neighbors': 8,             # Nearest retailers used for smoothing
+    'expires_hours': 48,        # Predictions expire after 24-48 hours
+}
+
+# =====================================================
+# Data Loading
+# =====================================================
+
+def load_retailers(client):
+    """Fetch active retailers with their coordinates."""
+    retailers = fetch_all(
+        client, 'retailers',
+        columns='id,latitude,longitude,state',
+        filters=[('eq', 'is_active', True)],
+    )
+    if len(retailers) == 0:
+        return retailers
+
+    retailers['latitude'] = pd.to_numeric(retailers['latitude'], errors='coerce')
+    retailers['longitude'] = pd.to_numeric(retailers['longitude'], errors='coerce')
+    return retailers
+
+
+def load_winning_tickets(client, since):
+    """Fetch the columns needed for scoring for wins claimed since a date."""
+    tickets = fetch_all(
+        client, 'winning_tickets',
+        columns='retailer_id,prize_amount,claimed_at',
+        filters=[('gte', 'claimed_at', since.isoformat())],
+    )
+    if len(tickets) == 0:
+        return pd.DataFrame(columns=['retailer_id', 'prize_amount', 'claimed_at'])
+
+    tickets['prize_amount'] = pd.to_numeric(tickets['prize_amount'], errors='coerce').fillna(0)
+    tickets['claimed_at'] = pd.to_datetime(tickets['claimed_at'], errors='coerce', utc=True).dt.tz_localize(None)
+    return tickets
+
+# =====================================================
+# Scoring
+# =====================================================
+
+def aggregate_wins(retailer_ids, tickets, as_of, half_life_days):
+    """
+    Collapse individual wins into per-retailer arrays.
+    Returns (win_count, win_mass) aligned with retailer_ids, where mass is
+    the recency-decayed, prize-weighted sum of wins.
+    """
+    n = len(retailer_ids)
+    idx = pd.Index(retailer_ids).get_indexer(tickets['retailer_id'])
+    valid = (idx >= 0) & tickets['claimed_at'].notna().to_numpy()
+    idx = idx[valid]
+
+    age_days = (as_of - tickets['claimed_at'].to_numpy()[valid]) / np.timedelta64(1, 'D')
+    decay = np.exp2(-np.clip(age_days, 0, None) / half_life_days)
+    # log-scaled prize so one jackpot doesn't swamp a steady stream of wins
+    weight = np.log1p(tickets['prize_amount'].to_numpy()[valid]) * decay
+
+    win_count = np.bincount(idx, minlength=n).astype(np.float64)
+    win_mass = np.bincount(idx, weights=weight, minlength=n)
+    return win_count, win_mass
+
+
+def kde_intensity(tree, coords, win_mass, bandwidth, chunk_size=KDE_CHUNK_SIZE):
+    """
+    Kernel-density win intensity evaluated at every retailer location.
+    Gaussian kernel truncated at KDE_CUTOFF bandwidths, summed from ball-tree
+    radius queries in chunks so memory stays bounded on dense metros.
+    """
+    intensity = np.zeros(len(coords))
+    if not (win_mass > 0).any():
+        return intensity
+
+    radius = KDE_CUTOFF * bandwidth
+    for start in range(0, len(coords), chunk_size):
+        ind, dist = tree.query_radius(coords[start:start + chunk_size], r=radius, return_distance=True)
+        lengths = np.fromiter((len(i) for i in ind), dtype=np.int64, count=len(ind))
+        rows = np.repeat(np.arange(len(ind)), lengths)
+        neighbors = np.concatenate(ind)
+        kernel = np.exp(-0.5 * (np.concatenate(dist) / bandwidth) ** 2)
+        intensity[start:start + len(ind)] = np.bincount(
+            rows, weights=kernel * win_mass[neighbors], minlength=len(ind)
+        )
+    return intensity
+
+
+def neighbor_weights(tree, coords, k, bandwidth):
+    """Gaussian weights and indices of each retailer's k nearest neighbors (self included)."""
+    k = min(k + 1, len(coords))
+    dist, idx = tree.query(coords, k=k)
+    weights = np.exp(-0.5 * (dist / bandwidth) ** 2)
+    return weights, idx
+
+
+def score_retailers(retailers, tickets, as_of=None, config=None):
+    """
+    Score all geocoded retailers.
+    Returns a DataFrame with one row per scored retailer.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    as_of = np.datetime64(as_of or datetime.utcnow())
+
+    geocoded = retailers.dropna(subset=['latitude', 'longitude']).reset_index(drop=True)
+    if len(geocoded) == 0:
+        return pd.DataFrame()
+
+    coords = np.radians(geocoded[['latitude', 'longitude']].to_numpy(dtype=np.float64))
+    bandwidth = config['bandwidth_miles'] / EARTH_RADIUS_MILES
+
+    win_count, win_mass = aggregate_wins(
+        geocoded['id'].to_numpy(), tickets, as_of, config['half_life_days']
+    )
+
+    tree = BallTree(coords, metric='haversine')
+    intensity = kde_intensity(tree, coords, win_mass, bandwidth)
+
+    weights, idx = neighbor_weights(tree, coords, config['neighbors'], bandwidth)
+    weight_sum = weights.sum(axis=1)
+    smoothed_mass = (weights * win_mass[idx]).sum(axis=1) / weight_sum
+    local_wins = (weights * win_count[idx]).sum(axis=1)
+
+    # Blend both signals on a 0-1 scale
+    intensity_norm = intensity / intensity.max() if intensity.max() > 0 else intensity
+    smoothed_norm = smoothed_mass / smoothed_mass.max() if smoothed_mass.max() > 0 else smoothed_mass
+    hotness = 0.5 * intensity_norm + 0.5 * smoothed_norm
+
+    # Expected days until the neighborhood produces its next win
+    daily_rate = local_wins / weight_sum / config['lookback_days']
+    with np.errstate(divide='ignore'):
+        next_win_days = np.where(daily_rate > 0, np.ceil(1.0 / daily_rate), np.nan)
+    next_win_days = np.clip(next_win_days, 1, config['lookback_days'])
+
+    # More wins observed nearby = more confidence in the score
+    confidence = 1.0 - np.exp(-local_wins / 5.0)
+
+    return pd.DataFrame({
+        'retailer_id': geocoded['id'],
+        'hotness_score': hotness,
+        'predicted_next_win_days': next_win_days,
+        'confidence_level': confidence,
+        'win_count': win_count,
+        'win_mass': win_mass,
+        'kde_intensity': intensity,
+        'neighbor_mass': smoothed_mass,
+        'local_wins': local_wins,
+    })
+
+# =====================================================
+# Database Write
+# =====================================================
+
+def to_prediction_rows(scores, predicted_at, expires_hours):
+    """Convert the score frame into retailer_predictions rows."""
+    expires_at = (predicted_at + timedelta(hours=expires_hours)).isoformat()
+    predicted_at = predicted_at.isoformat()
+
+    next_days = scores['predicted_next_win_days'].to_numpy()
+    features = scores[['win_count', 'win_mass', 'kde_intensity', 'neighbor_mass', 'local_wins']].round(6)
+
+    rows = []
+    for i, (retailer_id, hotness, confidence, feats) in enumerate(zip(
+        scores['retailer_id'], scores['hotness_score'].round(4),
+        scores['confidence_level'].round(4), features.to_dict('records'),
+    )):
+        rows.append({
+            'retailer_id': retailer_id,
+            'hotness_score': float(hotness),
+            'predicted_next_win_days': None if np.isnan(next_days[i]) else int(next_days[i]),
+            'confidence_level': float(confidence),
+            'features': feats,
+            'model_version': MODEL_VERSION,
+            'model_type': MODEL_TYPE,
+            'predicted_at': predicted_at,
+            'expires_at': expires_at,
+        })
+    return rows
+
+
+def save_retailer_predictions(client, scores, predicted_at, expires_hours=DEFAULT_CONFIG['expires_hours']):
+    """Write scores to retailer_predictions in batched upserts."""
+    rows = to_prediction_rows(scores, predicted_at, expires_hours)
+    return upsert_batched(client, 'retailer_predictions', rows, on_conflict='retailer_id,model_version')
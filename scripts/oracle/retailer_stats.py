@@ -0,0 +1,400 @@
+"""
+Incremental retailer_stats materializer.
+Keeps per-retailer running state on disk so each run only folds in
+winning_tickets created after the last watermark:
+- day histogram (retailer, day) -> wins, for the sliding-window counters
+- prize value counts (retailer, prize_amount) -> wins, for exact streaming
+  mean/median/max and the prize-tier buckets
+- first/last dated win per retailer
+Only retailers touched by new tickets, or whose window counts changed as
+days rolled forward, are recomputed and written. days_since_last_win
+moves every day for everyone, so it is refreshed for all retailers with
+a dated win in a narrow upsert of just that column.
+
+Scraped tickets arrive with a null retailer_id that
+normalize-winning-tickets.py fills in later without touching created_at,
+so the watermark is held below the oldest ticket still waiting for a
+retailer (see advance_watermark).
+"""
+
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+from oracle.db import fetch_all, upsert_batched
+
+STATE_PATH = os.path.join('models', 'retailer_stats_state.pkl')
+
+# Sliding windows stored in retailer_stats (days)
+WINDOWS = (7, 30, 90, 365)
+# Extra boundaries used by momentum_7d (days 7-13) and win_trend (30 vs 90)
+BOUNDARIES = (7, 14, 30, 90, 365)
+HISTORY_DAYS = 365
+
+# Unresolved tickets this recent hold the watermark back (the window
+# normalize-winning-tickets.py resolves by default); older ones are let go
+RESOLVE_DAYS = 30
+
+# Prize buckets (match the retailer_stats column comments)
+TOP_PRIZE = 1_000_000
+HIGH_PRIZE = 10_000
+MEDIUM_PRIZE = 1_000
+
+TICKET_COLUMNS = 'id,retailer_id,prize_amount,claimed_at,created_at'
+
+# =====================================================
+# State
+# =====================================================
+
+def empty_state():
+    """Fresh running state with no tickets applied."""
+    return {
+        'watermark': None,     # winning_tickets.created_at up to which every ticket is settled
+        'applied': set(),      # Ids of tickets above the watermark already folded in
+        'as_of_day': None,     # Day the stats were last materialized for
+        'days': pd.DataFrame({'retailer_id': pd.Series(dtype=object),
+                              'day': pd.Series(dtype=np.int32),
+                              'wins': pd.Series(dtype=np.int32)}),
+        'prizes': pd.DataFrame({'retailer_id': pd.Series(dtype=object),
+                                'prize_amount': pd.Series(dtype=np.float64),
+                                'wins': pd.Series(dtype=np.int32)}),
+        'dated': pd.DataFrame({'first_win': pd.Series(dtype='datetime64[ns]'),
+                               'last_win': pd.Series(dtype='datetime64[ns]'),
+                               'dated_wins': pd.Series(dtype=np.int32)},
+                              index=pd.Index([], name='retailer_id', dtype=object)),
+    }
+
+
+def load_state(path=STATE_PATH):
+    """Load running state from disk, or start empty."""
+    if not os.path.exists(path):
+        return empty_state()
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    """Persist running state to disk."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(state, f)
+
+
+def to_day(timestamps):
+    """Convert a datetime Series to integer days since the epoch."""
+    return timestamps.to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def fetch_new_tickets(client, watermark=None):
+    """Fetch winning tickets created after the watermark (all tickets if None)."""
+    filters = [('gt', 'created_at', watermark)] if watermark else []
+    tickets = fetch_all(client, 'winning_tickets', columns=TICKET_COLUMNS,
+                        filters=filters, order='created_at')
+    if len(tickets) == 0:
+        return pd.DataFrame(columns=TICKET_COLUMNS.split(','))
+
+    tickets['prize_amount'] = pd.to_numeric(tickets['prize_amount'], errors='coerce').fillna(0)
+    tickets['claimed_at'] = pd.to_datetime(tickets['claimed_at'], errors='coerce', utc=True).dt.tz_localize(None)
+    return tickets
+
+
+def unapplied(state, tickets):
+    """Tickets of a fetched batch that aren't folded into the state yet."""
+    return tickets[~tickets['id'].isin(state.get('applied', set()))]
+
+
+def advance_watermark(state, tickets, as_of):
+    """
+    Move the watermark past a fetched batch (all tickets created after the
+    old one), but keep it below the oldest ticket created in the last
+    RESOLVE_DAYS that still has no retailer_id, so that ticket is fetched
+    again once it's resolved. Resolved tickets above the watermark are
+    remembered in state['applied'] so refetching doesn't count them twice.
+    """
+    if len(tickets) == 0:
+        return
+    # ISO strings compare in time order; a missing stamp sorts first
+    created = tickets['created_at'].fillna('')
+    resolved = tickets['retailer_id'].notna()
+    stamps = pd.to_datetime(created, errors='coerce', utc=True).dt.tz_localize(None)
+    waiting = ~resolved & (stamps >= pd.Timestamp(as_of) - pd.Timedelta(days=RESOLVE_DAYS))
+
+    settled = created[created < created[waiting].min()] if waiting.any() else created
+    watermark = settled.max() if len(settled) else None
+    if watermark and (state['watermark'] is None or watermark > state['watermark']):
+        state['watermark'] = watermark
+
+    # Every applied ticket above the watermark is in this batch (fetched after the old one)
+    above = ~(created <= state['watermark']) if state['watermark'] is not None else resolved
+    state['applied'] = set(tickets['id'][resolved & above])
+
+
+def waiting_tickets(client, state):
+    """Tickets above the watermark that still have no retailer_id."""
+    if state['watermark'] is None:
+        return 0
+    tickets = fetch_new_tickets(client, state['watermark'])
+    return int(tickets['retailer_id'].isna().sum())
+
+
+def apply_tickets(state, tickets):
+    """
+    Fold a batch of tickets into the running state (unresolved ones are skipped).
+    Returns the set of retailer ids the batch touched.
+    """
+    tickets = tickets[tickets['retailer_id'].notna()]
+    if len(tickets) == 0:
+        return set()
+
+    dated = tickets[tickets['claimed_at'].notna()]
+
+    # Day histogram
+    new_days = (
+        pd.DataFrame({'retailer_id': dated['retailer_id'], 'day': to_day(dated['claimed_at'])})
+        .groupby(['retailer_id', 'day']).size().rename('wins').reset_index()
+    )
+    state['days'] = merge_counts(state['days'], new_days, ['retailer_id', 'day'])
+
+    # Prize value counts (lottery prizes take few distinct values)
+    new_prizes = tickets.groupby(['retailer_id', 'prize_amount']).size().rename('wins').reset_index()
+    state['prizes'] = merge_counts(state['prizes'], new_prizes, ['retailer_id', 'prize_amount'])
+
+    # First / last dated win
+    new_dated = dated.groupby('retailer_id')['claimed_at'].agg(
+        first_win='min', last_win='max', dated_wins='size'
+    )
+    combined = pd.concat([state['dated'], new_dated])
+    state['dated'] = combined.groupby(level=0).agg(
+        first_win=('first_win', 'min'), last_win=('last_win', 'max'), dated_wins=('dated_wins', 'sum')
+    )
+    state['dated'].index.name = 'retailer_id'
+
+    return set(tickets['retailer_id'].unique())
+
+
+def merge_counts(existing, new, keys):
+    """Add new (keys -> wins) counts into an existing count table."""
+    merged = pd.concat([existing, new], ignore_index=True)
+    merged = merged.groupby(keys, sort=False)['wins'].sum().reset_index()
+    merged['wins'] = merged['wins'].astype(np.int32)
+    return merged
+
+
+def rolled_retailers(state, as_of_day):
+    """Retailers whose window counts changed because days rolled forward."""
+    prev_day = state['as_of_day']
+    if prev_day is None or prev_day >= as_of_day:
+        return set()
+
+    days = state['days']
+    age_prev = prev_day - days['day'].to_numpy()
+    age_now = as_of_day - days['day'].to_numpy()
+    crossed = np.zeros(len(days), dtype=bool)
+    for boundary in BOUNDARIES:
+        crossed |= (age_prev < boundary) & (age_now >= boundary)
+    return set(days['retailer_id'].to_numpy()[crossed])
+
+
+def prune_history(state, as_of_day):
+    """Drop day-histogram entries older than the largest window."""
+    days = state['days']
+    state['days'] = days[days['day'] > as_of_day - HISTORY_DAYS].reset_index(drop=True)
+
+# =====================================================
+# Stats
+# =====================================================
+
+def prize_stats(prizes):
+    """Lifetime count, sum, mean, max, exact median and tier counts per retailer."""
+    prizes = prizes.sort_values(['retailer_id', 'prize_amount'], kind='mergesort')
+    wins = prizes['wins'].to_numpy()
+    amount = prizes['prize_amount'].to_numpy()
+    by_retailer = prizes.groupby('retailer_id', sort=False)
+
+    stats = pd.DataFrame({
+        'total_wins_lifetime': by_retailer['wins'].sum(),
+        'total_prize_amount': (prizes.assign(value=wins * amount)
+                               .groupby('retailer_id', sort=False)['value'].sum()),
+        'max_prize_amount': by_retailer['prize_amount'].max(),
+    })
+    stats['avg_prize_amount'] = stats['total_prize_amount'] / stats['total_wins_lifetime']
+
+    for column, mask in (
+        ('top_prize_wins', amount >= TOP_PRIZE),
+        ('high_prize_wins', amount >= HIGH_PRIZE),
+        ('medium_prize_wins', (amount >= MEDIUM_PRIZE) & (amount < HIGH_PRIZE)),
+        ('low_prize_wins', amount < MEDIUM_PRIZE),
+    ):
+        stats[column] = prizes.assign(hit=np.where(mask, wins, 0)).groupby('retailer_id', sort=False)['hit'].sum()
+
+    # Median from the sorted value counts: the values at 1-based positions
+    # (n+1)//2 and n//2+1 of each retailer's expanded prize list
+    cum = by_retailer['wins'].cumsum().to_numpy()
+    n = by_retailer['wins'].transform('sum').to_numpy()
+    lower = prizes[cum >= (n + 1) // 2].groupby('retailer_id', sort=False)['prize_amount'].first()
+    upper = prizes[cum >= n // 2 + 1].groupby('retailer_id', sort=False)['prize_amount'].first()
+    stats['median_prize_amount'] = (lower + upper) / 2
+
+    return stats
+
+
+def window_stats(days, as_of_day):
+    """Sliding-window win counts, momentum and trend per retailer."""
+    age = as_of_day - days['day'].to_numpy()
+    wins = days['wins'].to_numpy()
+    frame = pd.DataFrame({'retailer_id': days['retailer_id'].to_numpy()})
+
+    for window in WINDOWS:
+        frame[f'total_wins_{window}d'] = np.where((age >= 0) & (age < window), wins, 0)
+    frame['prev_7d'] = np.where((age >= 7) & (age < 14), wins, 0)
+
+    stats = frame.groupby('retailer_id', sort=False).sum()
+    stats['momentum_7d'] = stats['total_wins_7d'] - stats.pop('prev_7d')
+
+    # Last 30 days vs. the 60 days before them, as a daily rate
+    recent_rate = stats['total_wins_30d'] / 30
+    baseline_rate = (stats['total_wins_90d'] - stats['total_wins_30d']) / 60
+    stats['win_trend'] = np.select(
+        [stats['total_wins_90d'] < 3, recent_rate > baseline_rate * 1.25, recent_rate < baseline_rate * 0.75],
+        ['insufficient_data', 'heating_up', 'cooling_down'],
+        default='stable',
+    )
+    return stats
+
+
+def days_since_last_win(dated, as_of):
+    """Whole days from each retailer's last dated win to as_of."""
+    return (pd.Timestamp(as_of) - dated['last_win']).dt.days
+
+
+def compute_stats(state, retailer_ids, as_of):
+    """
+    Materialize retailer_stats rows for the given retailers.
+    days_since_last_win is relative to as_of (the last_updated time).
+    """
+    as_of_day = int(np.datetime64(as_of, 'D').astype(np.int64))
+    ids = pd.Index(sorted(retailer_ids), name='retailer_id')
+
+    prizes = state['prizes'][state['prizes']['retailer_id'].isin(ids)]
+    days = state['days'][state['days']['retailer_id'].isin(ids)]
+
+    stats = prize_stats(prizes).reindex(ids)
+    windows = window_stats(days, as_of_day).reindex(ids)
+    for column in windows.columns:
+        stats[column] = windows[column]
+    stats[[f'total_wins_{w}d' for w in WINDOWS] + ['momentum_7d']] = (
+        stats[[f'total_wins_{w}d' for w in WINDOWS] + ['momentum_7d']].fillna(0)
+    )
+    stats['win_trend'] = stats['win_trend'].fillna('insufficient_data')
+
+    dated = state['dated'].reindex(ids)
+    stats['first_win_date'] = dated['first_win']
+    stats['last_win_date'] = dated['last_win']
+    stats['days_since_last_win'] = days_since_last_win(dated, as_of)
+    span_days = (dated['last_win'] - dated['first_win']).dt.total_seconds() / 86400
+    stats['avg_days_between_wins'] = span_days / (dated['dated_wins'] - 1).where(dated['dated_wins'] > 1)
+
+    return stats
+
+# =====================================================
+# Runs
+# =====================================================
+
+def run_incremental(client, state, as_of):
+    """Fold new tickets into state and return stats for affected retailers."""
+    as_of_day = int(np.datetime64(as_of, 'D').astype(np.int64))
+    tickets = fetch_new_tickets(client, state['watermark'])
+
+    affected = apply_tickets(state, unapplied(state, tickets))
+    advance_watermark(state, tickets, as_of)
+    affected |= rolled_retailers(state, as_of_day)
+    prune_history(state, as_of_day)
+    state['as_of_day'] = as_of_day
+
+    return len(tickets), compute_stats(state, affected, as_of)
+
+
+def run_full_rebuild(client, as_of):
+    """Rebuild state from every ticket and return stats for all retailers."""
+    as_of_day = int(np.datetime64(as_of, 'D').astype(np.int64))
+    state = empty_state()
+    tickets = fetch_new_tickets(client)
+
+    affected = apply_tickets(state, tickets)
+    advance_watermark(state, tickets, as_of)
+    prune_history(state, as_of_day)
+    state['as_of_day'] = as_of_day
+
+    return state, len(tickets), compute_stats(state, affected, as_of)
+
+
+def recency_updates(state, stats, as_of):
+    """days_since_last_win for retailers with a dated win that aren't in the full stats rows."""
+    recency = days_since_last_win(state['dated'], as_of)
+    return recency.drop(stats.index, errors='ignore').dropna()
+
+
+def all_retailers(state):
+    """Every retailer id present in the running state."""
+    return set(state['prizes']['retailer_id'].unique())
+
+
+def total_tickets(state):
+    """Resolved tickets folded into the state."""
+    return int(state['prizes']['wins'].sum())
+
+
+def compare_stats(incremental, rebuilt, tolerance=0.01):
+    """Return the retailer ids whose incremental stats differ from a full rebuild."""
+    columns = rebuilt.columns
+    incremental = incremental.reindex(index=rebuilt.index.union(incremental.index), columns=columns)
+    rebuilt = rebuilt.reindex(incremental.index)
+
+    mismatched = pd.Series(False, index=rebuilt.index)
+    for column in columns:
+        a, b = incremental[column], rebuilt[column]
+        if pd.api.types.is_numeric_dtype(b) and pd.api.types.is_numeric_dtype(a):
+            differs = ~np.isclose(a.astype(float), b.astype(float), atol=tolerance, equal_nan=True)
+        else:
+            differs = ~((a == b) | (a.isna() & b.isna()))
+        mismatched |= differs
+    return list(mismatched.index[mismatched])
+
+
+def to_stats_rows(stats, as_of):
+    """Convert the stats frame into retailer_stats rows."""
+    out = stats.copy()
+    for column in ('total_prize_amount', 'avg_prize_amount', 'max_prize_amount',
+                   'median_prize_amount', 'avg_days_between_wins'):
+        out[column] = out[column].round(2)
+    for column in ('first_win_date', 'last_win_date'):
+        out[column] = out[column].map(lambda ts: ts.isoformat() if pd.notna(ts) else None)
+    out['last_updated'] = as_of.isoformat()
+
+    out = out.astype(object).where(out.notna(), None)
+    int_columns = [f'total_wins_{w}d' for w in WINDOWS] + [
+        'total_wins_lifetime', 'top_prize_wins', 'high_prize_wins', 'medium_prize_wins',
+        'low_prize_wins', 'momentum_7d', 'days_since_last_win',
+    ]
+    rows = out.reset_index().to_dict('records')
+    for row in rows:
+        for column in int_columns:
+            if row[column] is not None:
+                row[column] = int(row[column])
+    return rows
+
+
+def save_stats(client, stats, as_of):
+    """Write stats to retailer_stats in batched upserts."""
+    rows = to_stats_rows(stats, as_of)
+    return upsert_batched(client, 'retailer_stats', rows, on_conflict='retailer_id')
+
+
+def save_recency(client, recency, as_of):
+    """Upsert only days_since_last_win (and last_updated) for the given retailers."""
+    rows = [
+        {'retailer_id': retailer_id, 'days_since_last_win': int(days), 'last_updated': as_of.isoformat()}
+        for retailer_id, days in recency.items()
+    ]
+    return upsert_batched(client, 'retailer_stats', rows, on_conflict='retailer_id')
@@ -0,0 +1,129 @@
+"""
+Declared column dtypes for the frames the ML pipeline reads from Supabase.
+fetch_all() builds frames from JSON rows, so every string (ids, names,
+odds, dates) is a Python object and every number float64/int64.
+apply_schema() converts them once, at ingestion:
+- ids and names: Arrow strings; repeated strings (state, odds, foreign
+  keys in tier and snapshot tables): categoricals
+- dates and timestamps: datetime64 (parsed as parse_stamps() does)
+- counts: int32; snapshot scores: float32
+- money (DECIMAL prices and prizes) stays float64, so EV and model
+  features are computed from exactly the same values as before
+
+A column is only converted when that loses nothing: a value that doesn't
+parse, a null in an integer column or a non-string in a string column
+leaves it as fetched (or float64 for integers), and the feature code
+handles it as it always has.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING = 'string[pyarrow]'
+except ImportError:
+    STRING = None
+
+INT32 = np.iinfo(np.int32)
+
+# table -> column -> kind (see convert_column)
+SCHEMAS = {
+    'games': {
+        'id': 'string',
+        'game_number': 'string',
+        'game_name': 'string',
+        'ticket_price': 'float64',
+        'top_prize_amount': 'float64',
+        'total_top_prizes': 'int32',
+        'remaining_top_prizes': 'int32',
+        'overall_odds': 'category',
+        'game_start_date': 'datetime',
+        'game_end_date': 'datetime',
+        'is_active': 'bool',
+        'total_tickets_printed': 'float64',
+        'tickets_remaining_estimate': 'float64',
+        'state': 'category',
+        'created_at': 'datetime',
+        'updated_at': 'datetime',
+        'last_scraped_at': 'datetime',
+    },
+    'prize_tiers': {
+        'id': 'string',
+        'game_id': 'category',
+        'prize_amount': 'float64',
+        'total_prizes': 'int32',
+        'remaining_prizes': 'int32',
+        'odds': 'category',
+        'created_at': 'datetime',
+        'updated_at': 'datetime',
+    },
+    'historical_snapshots': {
+        'id': 'string',
+        'game_id': 'category',
+        'snapshot_date': 'datetime',
+        'remaining_top_prizes': 'int32',
+        'tickets_remaining_estimate': 'float64',
+        'days_since_launch': 'int32',
+        'top_prize_depletion_rate': 'float32',
+        'expected_value': 'float32',
+        'created_at': 'datetime',
+    },
+}
+
+
+def convert_column(values, kind):
+    """values as the declared kind, or unchanged if the conversion would lose information."""
+    present = values.notna().to_numpy()
+
+    if kind in ('string', 'category'):
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == STRING:
+            return values
+        if pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+            return values
+        if kind == 'category':
+            return values.astype('category')
+        return values.astype(STRING) if STRING else values
+
+    if kind == 'datetime':
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        try:
+            converted = pd.to_datetime(values, errors='coerce', format='mixed')
+        except (TypeError, ValueError):
+            # e.g. timezone-aware and naive stamps mixed in one column
+            return values
+        return values if (converted.isna().to_numpy() & present).any() else converted
+
+    if kind == 'bool':
+        if values.dtype == bool:
+            return values
+        if not values[present].isin([True, False]).all():
+            return values
+        if present.all():
+            return values.astype(bool)
+        return values.astype('boolean')
+
+    converted = pd.to_numeric(values, errors='coerce')
+    if (converted.isna().to_numpy() & present).any():
+        return values
+    if kind == 'int32':
+        whole = converted.to_numpy(dtype=np.float64)
+        if (present.all() and (np.mod(whole, 1) == 0).all()
+                and (whole.min(initial=0) >= INT32.min) and (whole.max(initial=0) <= INT32.max)):
+            return converted.astype(np.int32)
+        return converted.astype(np.float64)
+    return converted.astype(kind)
+
+
+def apply_schema(frame, table):
+    """Convert the columns of a fetched frame to the table's declared dtypes (in place; returns it)."""
+    for column, kind in SCHEMAS[table].items():
+        if column in frame:
+            frame[column] = convert_column(frame[column], kind)
+    return frame
+
+
+def memory_bytes(frame):
+    """Deep memory usage of a frame, in bytes."""
+    return int(frame.memory_usage(deep=True).sum())
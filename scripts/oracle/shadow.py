@@ -0,0 +1,142 @@
+"""
+Shadow scoring: several models over the same games in one run.
+Candidate models are registered in models/registry.json as
+{"<model_version>": "<path to .pkl or compiled .npz>"}. The feature
+frame and matrix are built once, every model scores it, and all
+versions' predictions go out in one bulk upsert (model_version is part
+of the predictions key, so versions sit side by side).
+agreement_report() compares each shadow model with the primary one on
+the same rows.
+"""
+
+import os
+import json
+import pickle
+import numpy as np
+import pandas as pd
+
+from oracle.compiled_model import load_compiled
+from oracle.db import upsert_batched
+from oracle.feature_cache import cached_features
+from oracle.features import FEATURE_COLS
+from oracle.predictions import RECOMMENDATIONS, score_features, to_prediction_rows
+
+REGISTRY_PATH = os.path.join('models', 'registry.json')
+
+# Games compared in the top-K overlap
+TOP_K = 20
+
+# =====================================================
+# Registry
+# =====================================================
+
+def load_registry(path=REGISTRY_PATH):
+    """Registered model versions -> package paths ({} without a registry)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_package(path):
+    """A model package from a compiled .npz export or a pickle."""
+    if path.endswith('.npz'):
+        return load_compiled(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_shadow_packages(primary_version, registry):
+    """Registered packages other than the primary version, keyed by their registered version."""
+    packages = {}
+    for version, path in registry.items():
+        if version == primary_version:
+            continue
+        package = load_package(path)
+        # Rows are written under the registered name, whatever the package says
+        packages[version] = {**package, 'version': version}
+    return packages
+
+# =====================================================
+# Scoring and Write
+# =====================================================
+
+def predict_models(games, packages, now=None, cache=None, monitor=None):
+    """
+    Score every game with every package ({version: package}) from one
+    feature frame; returns {version: PREDICTION_DTYPE records}.
+    """
+    features, _ = cached_features(games, now, cache)
+    if monitor is not None:
+        monitor.update(games, features)
+    matrix = features[FEATURE_COLS].to_numpy()
+
+    predictions = {}
+    for version, package in packages.items():
+        columns = package['feature_cols']
+        X = matrix if list(columns) == FEATURE_COLS else matrix[:, [FEATURE_COLS.index(c) for c in columns]]
+        predictions[version] = score_features(games, features, package, X)
+    return predictions
+
+
+def save_model_predictions(client, predictions, packages, prediction_date):
+    """Upsert every version's predictions together; returns rows written."""
+    rows = []
+    for version, records in predictions.items():
+        rows.extend(to_prediction_rows(records, prediction_date, version, packages[version]['feature_cols']))
+    return upsert_batched(client, 'predictions', rows, on_conflict='game_id,prediction_date,model_version')
+
+# =====================================================
+# Agreement Report
+# =====================================================
+
+def agreement_report(predictions, primary, k=TOP_K):
+    """
+    One row per shadow version, against the primary version's records:
+    score differences, Spearman rank correlation, share of identical
+    recommendations, moves up/down the recommendation scale and top-k overlap.
+    """
+    base = predictions[primary]
+    base_score = base['ai_score'].astype(np.float64)
+    base_top = set(np.argsort(-base_score, kind='stable')[:k])
+
+    report = []
+    for version, records in predictions.items():
+        if version == primary:
+            continue
+        score = records['ai_score'].astype(np.float64)
+        diff = score - base_score
+        # Codes run strong_buy (0) to strong_avoid (4): a lower code is an upgrade
+        moves = records['recommendation'].astype(np.int64) - base['recommendation'].astype(np.int64)
+        top = set(np.argsort(-score, kind='stable')[:k])
+        report.append({
+            'model_version': version,
+            'games': len(records),
+            'mean_score_diff': float(diff.mean()) if len(diff) else 0.0,
+            'mean_abs_diff': float(np.abs(diff).mean()) if len(diff) else 0.0,
+            'max_abs_diff': float(np.abs(diff).max()) if len(diff) else 0.0,
+            'rank_correlation': float(pd.Series(score).corr(pd.Series(base_score), method='spearman')),
+            'recommendation_agreement': float((moves == 0).mean()) if len(moves) else 1.0,
+            'upgraded': int((moves < 0).sum()),
+            'downgraded': int((moves > 0).sum()),
+            f'top_{k}_overlap': len(top & base_top) / max(min(k, len(records)), 1),
+        })
+    return pd.DataFrame(report)
+
+
+def largest_diffs(games, predictions, primary, version, n=5):
+    """The n games whose score moved most between the primary and a shadow version."""
+    base, records = predictions[primary], predictions[version]
+    diff = records['ai_score'].astype(np.float64) - base['ai_score'].astype(np.float64)
+    rows = np.argsort(-np.abs(diff), kind='stable')[:n]
+    rows = rows[diff[rows] != 0]
+    labels = np.array(RECOMMENDATIONS, dtype=object)
+    names = games.get('game_name', pd.Series('Unknown', index=games.index)).to_numpy()
+    return pd.DataFrame({
+        'game_name': names[rows],
+        'primary_score': base['ai_score'][rows],
+        'shadow_score': records['ai_score'][rows],
+        'diff': diff[rows],
+        'primary_recommendation': labels[base['recommendation'][rows]],
+        'shadow_recommendation': labels[records['recommendation'][rows]],
+    })
@@ -0,0 +1,131 @@
+"""
+Daily historical_snapshots writer.
+Builds one snapshot per game for a date in a single vectorized pass, with
+top_prize_depletion_rate derived from each game's previous snapshot
+(fetched in bulk). Rows identical to the game's latest stored snapshot
+are skipped, so unchanged games don't add a row every day; readers should
+carry the last snapshot forward.
+"""
+
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+from oracle.db import fetch_all, upsert_batched
+from oracle.schema import apply_schema
+
+# How far back to look for a game's previous snapshot
+LOOKBACK_DAYS = 90
+
+# Observed values compared to decide whether a game changed
+CHANGE_COLUMNS = ['remaining_top_prizes', 'tickets_remaining_estimate', 'expected_value']
+
+# DECIMAL(5,4) upper bound
+MAX_DEPLETION_RATE = 9.9999
+
+SNAPSHOT_COLUMNS = ('game_id,snapshot_date,remaining_top_prizes,tickets_remaining_estimate,'
+                    'days_since_launch,top_prize_depletion_rate,expected_value')
+
+
+def fetch_recent_snapshots(client, snapshot_date, lookback_days=LOOKBACK_DAYS):
+    """Fetch every snapshot in the lookback window up to and including snapshot_date."""
+    since = snapshot_date - timedelta(days=lookback_days)
+    snapshots = fetch_all(
+        client, 'historical_snapshots', columns=SNAPSHOT_COLUMNS,
+        filters=[('gte', 'snapshot_date', since.isoformat()),
+                 ('lte', 'snapshot_date', snapshot_date.isoformat())],
+    )
+    if len(snapshots) == 0:
+        snapshots = pd.DataFrame(columns=SNAPSHOT_COLUMNS.split(','))
+    apply_schema(snapshots, 'historical_snapshots')
+
+    snapshots['snapshot_date'] = pd.to_datetime(snapshots['snapshot_date'])
+    for column in ('remaining_top_prizes', 'tickets_remaining_estimate', 'expected_value'):
+        snapshots[column] = pd.to_numeric(snapshots[column], errors='coerce')
+    return snapshots
+
+
+def latest_before(snapshots, snapshot_date):
+    """Latest snapshot per game strictly before snapshot_date."""
+    earlier = snapshots[snapshots['snapshot_date'] < pd.Timestamp(snapshot_date)]
+    return earlier.sort_values('snapshot_date').groupby('game_id', observed=True).tail(1).set_index('game_id')
+
+
+def latest_stored(snapshots):
+    """Latest stored snapshot per game (including snapshot_date itself)."""
+    return snapshots.sort_values('snapshot_date').groupby('game_id', observed=True).tail(1).set_index('game_id')
+
+
+def build_snapshots(games, previous, snapshot_date):
+    """
+    Compute snapshot rows for all games at once.
+    previous is indexed by game_id (see latest_before).
+    """
+    snap_ts = pd.Timestamp(snapshot_date)
+    price = pd.to_numeric(games['ticket_price'], errors='coerce').fillna(0).to_numpy()
+    top_prize = pd.to_numeric(games['top_prize_amount'], errors='coerce').fillna(0).to_numpy()
+    remaining = pd.to_numeric(games['remaining_top_prizes'], errors='coerce').fillna(0).to_numpy()
+    total = pd.to_numeric(games['total_top_prizes'], errors='coerce').fillna(0).to_numpy()
+
+    # Same EV definition as the model features
+    with np.errstate(divide='ignore', invalid='ignore'):
+        concentration = np.where(total > 0, remaining / total, 0.0)
+        ev = np.where(price > 0, top_prize / price * concentration, 0.0)
+
+    start = pd.to_datetime(games.get('game_start_date'), errors='coerce')
+    days_since_launch = (snap_ts - start).dt.days
+
+    # Prizes claimed per day since the previous snapshot
+    prev = previous.reindex(games['id'])
+    prev_remaining = prev['remaining_top_prizes'].to_numpy(dtype=float)
+    elapsed = (snap_ts - prev['snapshot_date']).dt.days.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        depletion = np.where(elapsed > 0, (prev_remaining - remaining) / elapsed, np.nan)
+    depletion = np.clip(depletion, 0, MAX_DEPLETION_RATE)
+
+    return pd.DataFrame({
+        'game_id': games['id'].to_numpy(),
+        'snapshot_date': snap_ts,
+        'remaining_top_prizes': remaining.astype(np.int64),
+        'tickets_remaining_estimate': pd.to_numeric(games.get('tickets_remaining_estimate'), errors='coerce').to_numpy(),
+        'days_since_launch': days_since_launch.to_numpy(),
+        'top_prize_depletion_rate': np.round(depletion, 4),
+        'expected_value': np.round(ev, 4),
+    })
+
+
+def changed_rows(snapshots, stored):
+    """Drop rows whose observed values match the game's latest stored snapshot."""
+    latest = stored.reindex(snapshots['game_id'])
+    same = np.ones(len(snapshots), dtype=bool)
+    for column in CHANGE_COLUMNS:
+        new = snapshots[column].to_numpy(dtype=float)
+        old = latest[column].to_numpy(dtype=float)
+        same &= np.isclose(new, old, equal_nan=True)
+    same &= latest['snapshot_date'].notna().to_numpy()
+    return snapshots[~same]
+
+
+def to_snapshot_rows(snapshots):
+    """Convert the snapshot frame into JSON rows."""
+    out = snapshots.assign(snapshot_date=snapshots['snapshot_date'].dt.date.astype(str)).astype(object)
+    rows = out.where(out.notna(), None).to_dict('records')
+    for row in rows:
+        for column in ('remaining_top_prizes', 'tickets_remaining_estimate', 'days_since_launch'):
+            if row[column] is not None:
+                row[column] = int(row[column])
+    return rows
+
+
+def save_snapshots(client, games, snapshot_date):
+    """
+    Write today's snapshots for all games.
+    Returns (written, skipped_unchanged).
+    """
+    stored = fetch_recent_snapshots(client, snapshot_date)
+    snapshots = build_snapshots(games, latest_before(stored, snapshot_date), snapshot_date)
+    changed = changed_rows(snapshots, latest_stored(stored))
+
+    written = upsert_batched(client, 'historical_snapshots', to_snapshot_rows(changed),
+                             on_conflict='game_id,snapshot_date')
+    return written, len(snapshots) - len(changed)
@@ -0,0 +1,261 @@
+"""
+Bulk normalization and dedup for scraped winning_tickets.
+Resolves denormalized retailer_name/city/state to retailers.id in batch:
+1. exact match on normalized (state, city, name)
+2. character-trigram TF-IDF cosine similarity within each (state, city)
+   block, scored as one sparse matrix product per block
+Then drops duplicate tickets by (game_number, prize_amount, retailer,
+claimed day).
+"""
+
+import html
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Minimum cosine similarity for a fuzzy retailer match
+MATCH_THRESHOLD = 0.75
+
+# Tokens that don't identify a retailer
+STOP_TOKENS = r'\b(?:the|inc|llc|co|corp|company|store|stores)\b'
+
+DEDUP_KEY = ['game_number', 'prize_amount', 'retailer_key', 'claimed_day']
+
+# =====================================================
+# Text Normalization
+# =====================================================
+
+def normalize_text(values):
+    """Lowercase, unescape and strip punctuation/store numbers from a Series."""
+    text = values.fillna('').astype(str).map(html.unescape).str.lower()
+    text = text.str.replace('&', ' and ', regex=False)
+    text = text.str.replace(r'#\s*\d+|\bno\.?\s*\d+\b', ' ', regex=True)
+    text = text.str.replace(r"[^a-z0-9 ]+", ' ', regex=True)
+    text = text.str.replace(STOP_TOKENS, ' ', regex=True)
+    return text.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def normalize_city(values):
+    """Normalize city names ('St. Paul' and 'Saint Paul' compare equal)."""
+    city = normalize_text(values)
+    return city.str.replace(r'^(?:st|ste)\b', 'saint', regex=True)
+
+# =====================================================
+# Scraped Record Conversion
+# =====================================================
+
+def parse_prize_amount(values):
+    """Parse '$50,000', '50000' or '$50K' strings to floats."""
+    cleaned = values.fillna('').astype(str).str.replace(r'[$,\s]', '', regex=True).str.upper()
+    multiplier = np.select(
+        [cleaned.str.endswith('K'), cleaned.str.endswith('M')], [1_000, 1_000_000], default=1
+    )
+    number = pd.to_numeric(cleaned.str.rstrip('KM'), errors='coerce').fillna(0)
+    return number * multiplier
+
+
+def categorize_prize(amounts):
+    """Prize tier labels, matching categorizePrize() in scrape-mn-winners.ts."""
+    return np.select(
+        [amounts >= 1_000_000, amounts >= 100_000, amounts >= 10_000],
+        ['top_prize', 'high_prize', 'medium_prize'],
+        default='low_prize',
+    )
+
+
+def from_scraped_records(records, scrape_source='mn_lottery_winners'):
+    """
+    Convert raw scraper records (gameName, prizeAmount, retailerName,
+    location, claimedDate) into winning_tickets-shaped rows.
+    """
+    raw = pd.DataFrame(records)
+    if 'location' not in raw:
+        raw['location'] = None
+
+    # "Name in City, ST" when the location is embedded in the retailer text
+    embedded = raw['location'].isna() & raw['retailerName'].str.contains(' in ', regex=False)
+    split = raw.loc[embedded, 'retailerName'].str.rsplit(' in ', n=1, expand=True)
+    if len(split):
+        raw.loc[embedded, 'retailerName'] = split[0]
+        raw.loc[embedded, 'location'] = split[1]
+
+    location = raw['location'].fillna('').str.split(',', n=1, expand=True).reindex(columns=[0, 1])
+    prize_amount = parse_prize_amount(raw['prizeAmount'])
+
+    game_number = pd.to_numeric(raw.get('gameNumber'), errors='coerce') if 'gameNumber' in raw else None
+    from_name = pd.to_numeric(raw['gameName'].str.extract(r'#?(\d{4})')[0], errors='coerce')
+    game_number = from_name if game_number is None else game_number.fillna(from_name)
+
+    return pd.DataFrame({
+        'game_number': game_number.astype('Int64'),
+        'game_name': raw['gameName'].str.strip(),
+        'prize_tier': categorize_prize(prize_amount),
+        'prize_amount': prize_amount,
+        'retailer_id': None,
+        'retailer_name': raw['retailerName'].str.strip(),
+        'city': location[0].str.strip().replace('', 'Unknown'),
+        'state': location[1].fillna('MN').str.strip().replace('', 'MN'),
+        'claimed_at': pd.to_datetime(raw['claimedDate'], errors='coerce', format='mixed'),
+        'scrape_source': scrape_source,
+        'raw_data': records,
+    })
+
+# =====================================================
+# Retailer Matching
+# =====================================================
+
+class RetailerIndex:
+    """In-memory retailer lookup: exact keys plus per-(state, city) trigram blocks."""
+
+    def __init__(self, retailers):
+        self.ids = retailers['id'].to_numpy()
+        keys = pd.DataFrame({
+            'state': retailers['state'].fillna('').str.upper().str.strip(),
+            'city': normalize_city(retailers['city']),
+            'name': normalize_text(retailers['name']),
+        })
+
+        # Exact lookup table (first retailer wins on duplicate keys)
+        self.exact = keys.assign(retailer_id=self.ids).drop_duplicates(['state', 'city', 'name'])
+
+        self.vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 3), dtype=np.float32)
+        self.vectors = self.vectorizer.fit_transform(keys['name'])
+        self.blocks = keys.groupby(['state', 'city']).indices
+
+
+def resolve_retailers(tickets, index, threshold=MATCH_THRESHOLD):
+    """
+    Fill retailer_id for tickets that don't have one.
+    Adds match_method ('existing', 'exact', 'fuzzy' or None) and match_score.
+    """
+    tickets = tickets.reset_index(drop=True)
+    keys = pd.DataFrame({
+        'state': tickets['state'].fillna('').str.upper().str.strip(),
+        'city': normalize_city(tickets['city']),
+        'name': normalize_text(tickets['retailer_name']),
+    })
+
+    retailer_id = tickets['retailer_id'].astype(object).to_numpy().copy()
+    method = np.where(pd.notna(retailer_id), 'existing', None).astype(object)
+    score = np.where(pd.notna(retailer_id), 1.0, 0.0)
+
+    # Pass 1: exact normalized key
+    exact = keys.merge(index.exact, on=['state', 'city', 'name'], how='left')['retailer_id'].to_numpy()
+    hit = pd.isna(retailer_id) & pd.notna(exact)
+    retailer_id[hit] = exact[hit]
+    method[hit] = 'exact'
+    score[hit] = 1.0
+
+    # Pass 2: trigram cosine similarity within the same (state, city)
+    pending = keys[pd.isna(retailer_id)]
+    if len(pending):
+        query_vectors = index.vectorizer.transform(pending['name'])
+        for block, rows in pending.groupby(['state', 'city']).indices.items():
+            candidates = index.blocks.get(block)
+            if candidates is None:
+                continue
+            sims = (query_vectors[rows] @ index.vectors[candidates].T).toarray()
+            best = sims.argmax(axis=1)
+            best_score = sims[np.arange(len(rows)), best]
+            target = pending.index.to_numpy()[rows]
+            ok = best_score >= threshold
+            retailer_id[target[ok]] = index.ids[candidates[best[ok]]]
+            method[target[ok]] = 'fuzzy'
+            score[target[ok]] = best_score[ok]
+
+    resolved = tickets.copy()
+    resolved['retailer_id'] = retailer_id
+    resolved['match_method'] = method
+    resolved['match_score'] = score
+    resolved['retailer_key'] = np.where(
+        pd.notna(retailer_id), retailer_id.astype(str),
+        keys['state'] + '|' + keys['city'] + '|' + keys['name'],
+    )
+    return resolved
+
+# =====================================================
+# Dedup
+# =====================================================
+
+def dedup_tickets(tickets, order_by=None):
+    """
+    Split tickets into (unique, duplicates) on DEDUP_KEY.
+    The first row of each group is kept (sort with order_by first, e.g.
+    'created_at' to keep the oldest stored copy).
+    """
+    frame = tickets
+    if order_by and order_by in frame:
+        frame = frame.sort_values(order_by, kind='mergesort')
+
+    claimed = pd.to_datetime(frame['claimed_at'], errors='coerce', utc=True)
+    frame = frame.assign(
+        claimed_day=claimed.dt.floor('D'),
+        game_number=frame['game_number'].fillna(-1),
+    )
+    duplicated = frame.duplicated(DEDUP_KEY, keep='first').to_numpy()
+    unique = tickets.loc[frame.index[~duplicated]]
+    duplicates = tickets.loc[frame.index[duplicated]]
+    return unique, duplicates
+
+
+def match_report(resolved):
+    """Counts of tickets by match method."""
+    counts = resolved['match_method'].fillna('unmatched').value_counts()
+    matched = counts.drop('unmatched', errors='ignore').sum()
+    return {
+        'total': len(resolved),
+        'matched': int(matched),
+        'match_rate': matched / len(resolved) if len(resolved) else 0.0,
+        'by_method': counts.to_dict(),
+    }
+
+# =====================================================
+# Benchmark Inputs
+# =====================================================
+
+DISTRACTOR_WORDS = ['north', 'south', 'lake', 'corner', 'market', 'gas', 'food', 'express',
+                    'quick', 'stop', 'pantry', 'depot', 'main', 'street', 'star', 'lucky']
+
+
+def make_benchmark(tickets, scale=100, n_retailers=100_000, seed=42):
+    """
+    Blow a small fixture up into a load test.
+    Each ticket is replicated `scale` times with noisy retailer names
+    (case, store numbers, suffixes, dropped characters), and the retailer
+    table is padded with random distractors in the same and other cities.
+    Returns (tickets, retailers, expected_retailer_ids).
+    """
+    rng = np.random.default_rng(seed)
+
+    truth = tickets[['retailer_name', 'city', 'state']].drop_duplicates().reset_index(drop=True)
+    truth['id'] = [f'fixture-{i}' for i in range(len(truth))]
+
+    n_distractors = max(n_retailers - len(truth), 0)
+    cities = np.concatenate([truth['city'].unique(), [f'Town {i}' for i in range(1000)]])
+    distractors = pd.DataFrame({
+        'id': [f'synthetic-{i}' for i in range(n_distractors)],
+        'name': [' '.join(rng.choice(DISTRACTOR_WORDS, rng.integers(1, 4))).title() for _ in range(n_distractors)],
+        'city': rng.choice(cities, n_distractors),
+        'state': 'MN',
+    })
+    retailers = pd.concat([truth.rename(columns={'retailer_name': 'name'}), distractors], ignore_index=True)
+
+    big = tickets.loc[tickets.index.repeat(scale)].reset_index(drop=True)
+    names = big['retailer_name'].to_numpy().astype(object)
+    noise = rng.integers(0, 5, len(big))
+    for i in range(len(big)):
+        name = names[i]
+        if noise[i] == 1:
+            name = name.upper()
+        elif noise[i] == 2:
+            name = f"{name} #{rng.integers(1, 999)}"
+        elif noise[i] == 3:
+            name = f"{name} Inc"
+        elif noise[i] == 4 and len(name) > 6:
+            drop = rng.integers(1, len(name) - 1)
+            name = name[:drop] + name[drop + 1:]
+        names[i] = name
+
+    expected = big.merge(truth, on=['retailer_name', 'city', 'state'], how='left')['id'].to_numpy()
+    big['retailer_name'] = names
+    return big, retailers, expected
@@ -0,0 +1,202 @@
+"""
+Shared model training pieces.
+- MODEL_PARAMS: the XGBoost configuration train-model.py uses
+- train_ensemble(): bootstrap ensemble for prediction intervals, members
+  trained in parallel worker processes
+- interval helpers used at training and prediction time: the members'
+  spread is a band for the model's mean, so it is widened to a
+  prediction interval by a split-conformal scale fitted on held-out rows
+- warm_start(): continue the main model and members on new rows only
+  (XGBoost continued training), with the limits that force a full retrain;
+  content_keys()/changed_games() decide which rows are new
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from oracle.feature_cache import row_keys
+from oracle.features import FEATURE_INPUTS
+
+# Conservative parameters for a small dataset (see train_model())
+MODEL_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 4,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'reg_alpha': 1.0,
+    'reg_lambda': 1.0,
+    'random_state': 42,
+    'objective': 'reg:squarederror',
+}
+
+ENSEMBLE_SIZE = 20
+
+# Percentiles of the member predictions that give the band's shape
+INTERVAL_PERCENTILES = (10, 90)
+
+# Share of actual scores the calibrated interval is meant to contain
+INTERVAL_COVERAGE = 0.8
+
+# Band half-widths are floored at this (score points) before scaling, so
+# games every member agrees on still get an interval
+MIN_HALF_WIDTH = 0.1
+
+# Interval width (score points) at which the model-uncertainty factor hits 0
+MAX_INTERVAL_WIDTH = 40
+
+# Trees added to each model per warm-start update
+WARM_START_TREES = 10
+
+# Full retrain once warm starts have added this many trees since the last one
+MAX_WARM_START_TREES = 100
+
+# Full retrain when the current model's MAE on the held-out new rows exceeds
+# the last full retrain's test MAE by this factor
+WARM_START_MAE_RATIO = 1.5
+
+# Fewer new rows than this and there's nothing to warm-start on
+MIN_WARM_START_ROWS = 10
+
+# Share of the new rows kept out of a warm start; the retrain trigger and
+# the before/after MAE are measured on them
+WARM_START_HOLDOUT = 0.2
+
+# Feature inputs that only change with the game's data (the scrapers
+# refresh last_scraped_at on every run, changed or not)
+CONTENT_INPUTS = [column for column in FEATURE_INPUTS if column != 'last_scraped_at']
+
+
+def fit_member(args):
+    """Fit one bootstrap member on a resample of the training rows."""
+    # Imported here so the prediction job can use the interval helpers without xgboost
+    import xgboost as xgb
+
+    X, y, seed = args
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(X), len(X))
+    model = xgb.XGBRegressor(**{**MODEL_PARAMS, 'random_state': seed, 'n_jobs': 1})
+    model.fit(X[rows], y[rows])
+    return model
+
+
+def train_ensemble(X, y, size=ENSEMBLE_SIZE, workers=None, seed=42):
+    """Train `size` bootstrap members in parallel; returns the fitted models."""
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float64)
+    tasks = [(X, y, seed + i) for i in range(size)]
+    return _run(fit_member, tasks, workers)
+
+
+def _run(function, tasks, workers):
+    if workers == 1:
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(function, tasks))
+
+
+def booster_bytes(model):
+    """Raw booster (UBJSON) for the model package, so members can be warm-started later."""
+    return bytes(model.get_booster().save_raw('ubj'))
+
+
+def continue_member(args):
+    """Add n_trees to a saved booster, fit on the new rows (bootstrapped for members)."""
+    import xgboost as xgb
+
+    raw, X, y, seed, n_trees, bootstrap = args
+    if bootstrap:
+        rows = np.random.default_rng(seed).integers(0, len(X), len(X))
+        X, y = X[rows], y[rows]
+    booster = xgb.Booster()
+    booster.load_model(bytearray(raw))
+    # The main model was fit on a DataFrame; continued training needs the same feature names
+    if booster.feature_names:
+        import pandas as pd
+        X = pd.DataFrame(X, columns=booster.feature_names)
+    params = xgb.XGBRegressor(**{**MODEL_PARAMS, 'random_state': seed, 'n_jobs': 1}).get_xgb_params()
+    params = {key: value for key, value in params.items() if value is not None}
+    # Not XGBRegressor.fit(xgb_model=...): that trains on a QuantileDMatrix binned
+    # from the new rows alone, which routes them through the existing trees by
+    # those bins instead of their values and corrupts the residuals
+    booster = xgb.train(params, xgb.DMatrix(X, label=y), n_trees, xgb_model=booster)
+    model = xgb.XGBRegressor()
+    model.load_model(bytearray(booster.save_raw('ubj')))
+    return model
+
+
+def warm_start(model, members, X, y, n_trees=WARM_START_TREES, workers=None, seed=42):
+    """
+    Continue the main model (on all new rows) and each member (on a
+    bootstrap of them) with n_trees more trees; returns (model, members).
+    members are raw boosters from booster_bytes().
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float64)
+    tasks = [(booster_bytes(model), X, y, seed, n_trees, False)]
+    tasks += [(raw, X, y, seed + 1 + i, n_trees, True) for i, raw in enumerate(members)]
+    updated = _run(continue_member, tasks, workers)
+    return updated[0], updated[1:]
+
+
+def content_keys(games):
+    """{game id: hash of its CONTENT_INPUTS}, stored with the model it was trained on."""
+    return dict(zip(games['id'].tolist(), row_keys(games, CONTENT_INPUTS).tolist()))
+
+
+def changed_games(games, training_keys):
+    """Mask of games that are new or whose feature inputs changed since training_keys."""
+    keys = row_keys(games, CONTENT_INPUTS).tolist()
+    return np.array([training_keys.get(game_id) != key for game_id, key in zip(games['id'].tolist(), keys)],
+                    dtype=bool)
+
+
+def warm_start_blocker(warm_state, mae_on_holdout):
+    """Reason a full retrain is needed instead of a warm start, or None."""
+    if warm_state['trees_added'] + WARM_START_TREES > MAX_WARM_START_TREES:
+        return f"{warm_state['trees_added']} trees added since the last full retrain"
+    if mae_on_holdout > warm_state['baseline_mae'] * WARM_START_MAE_RATIO:
+        return (f"MAE on held-out new rows {mae_on_holdout:.2f} > {WARM_START_MAE_RATIO}x "
+                f"full-retrain test MAE {warm_state['baseline_mae']:.2f}")
+    return None
+
+
+def member_band(member_scores):
+    """Midpoint and half-width of the members' percentile band, per row."""
+    lower, upper = np.percentile(member_scores, INTERVAL_PERCENTILES, axis=1)
+    return (lower + upper) / 2, np.maximum((upper - lower) / 2, MIN_HALF_WIDTH)
+
+
+def calibrate_intervals(member_scores, actual, coverage=INTERVAL_COVERAGE):
+    """
+    Split-conformal scale for the member band: the ceil((n + 1) * coverage)-th
+    smallest |actual - midpoint| / half-width over held-out rows (rows the
+    members weren't fit on). None without rows.
+    """
+    actual = np.asarray(actual, dtype=np.float64)
+    if len(actual) == 0:
+        return None
+    center, half = member_band(member_scores)
+    ratios = np.sort(np.abs(actual - center) / half)
+    rank = min(int(np.ceil((len(ratios) + 1) * coverage)), len(ratios))
+    return float(ratios[rank - 1])
+
+
+def prediction_intervals(member_scores, scale=None):
+    """
+    (lower, upper) per row, clipped to 0-100: the member band widened by
+    the conformal scale around its midpoint, or the raw percentile band
+    (model uncertainty only, not a calibrated interval) when scale is None.
+    """
+    if scale is None:
+        lower, upper = np.percentile(member_scores, INTERVAL_PERCENTILES, axis=1)
+    else:
+        center, half = member_band(member_scores)
+        lower, upper = center - scale * half, center + scale * half
+    return np.clip(lower, 0, 100), np.clip(upper, 0, 100)
+
+
+def interval_coverage(lower, upper, actual):
+    """Share of actual values inside their interval."""
+    actual = np.asarray(actual)
+    return float(np.mean((actual >= lower) & (actual <= upper))) if len(actual) else 0.0
@@ -0,0 +1,147 @@
+"""
+Offline parser for archived MN Lottery winners pages.
+Streams saved HTML captures with lxml iterparse (elements are cleared as
+soon as they're read) and extracts winner rows in the same raw record
+shape the scrapers produce. Directories of captures are parsed across a
+process pool.
+"""
+
+import os
+import re
+import glob
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+
+from oracle.ticket_normalizer import from_scraped_records
+
+# Game number from thumbnail file names like ".../2069-Winter-Fun-Mini.webp"
+GAME_NUMBER_IN_SRC = re.compile(r'/(\d{4})-[^/]*$')
+
+WINNER_FIELDS = ('gameName', 'gameNumber', 'prizeAmount', 'retailerName', 'location', 'claimedDate')
+
+
+def class_names(element):
+    return (element.get('class') or '').split()
+
+
+def text_of(element):
+    return ' '.join(''.join(element.itertext()).split())
+
+
+def parse_winner_card(figure):
+    """Extract one winner record from a <figure class="card card--winner">."""
+    spans = {}
+    for span in figure.iter('span'):
+        for name in class_names(span):
+            if name.startswith('winner-'):
+                spans[name] = text_of(span)
+
+    info = spans.get('winner-info', '')
+    if not info:
+        return None
+
+    # "Retailer Name in City, ST"
+    retailer, _, location = info.rpartition(' in ')
+    if not retailer:
+        retailer, location = info, None
+
+    game_number = None
+    for img in figure.iter('img'):
+        match = GAME_NUMBER_IN_SRC.search(img.get('src') or '')
+        if match:
+            game_number = int(match.group(1))
+            break
+
+    return {
+        'gameName': spans.get('winner-category', ''),
+        'gameNumber': game_number,
+        'prizeAmount': spans.get('winner-payout', ''),
+        'retailerName': retailer,
+        'location': location,
+        'claimedDate': spans.get('winner-date'),
+    }
+
+
+def parse_winner_row(tr):
+    """Extract one winner record from a table row (older table layout)."""
+    cells = [text_of(td) for td in tr.iter('td')]
+    if len(cells) < 4 or not cells[0] or not cells[2]:
+        return None
+    return {
+        'gameName': cells[0],
+        'gameNumber': None,
+        'prizeAmount': cells[1],
+        'retailerName': cells[2],
+        'location': cells[3],
+        'claimedDate': cells[4] if len(cells) > 4 else None,
+    }
+
+
+def parse_winners_page(path):
+    """
+    Stream one saved page and return its winner records.
+    Each record carries the capture file name in 'sourceFile'.
+    """
+    records = []
+    source = os.path.basename(path)
+
+    for _, element in etree.iterparse(path, events=('end',), tag=('figure', 'tr'),
+                                      html=True, recover=True, encoding='utf-8'):
+        if element.tag == 'figure' and 'card--winner' in class_names(element):
+            record = parse_winner_card(element)
+        elif element.tag == 'tr':
+            record = parse_winner_row(element)
+        else:
+            record = None
+
+        if record:
+            record['sourceFile'] = source
+            records.append(record)
+
+        # Free parsed elements as we go
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    return records
+
+
+def find_pages(paths):
+    """Expand files, directories and globs into a sorted list of .html files."""
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            pages.extend(glob.glob(os.path.join(path, '**', '*.html'), recursive=True))
+        else:
+            pages.extend(glob.glob(path))
+    return sorted(set(pages))
+
+
+def parse_pages(pages, workers=None):
+    """
+    Parse many pages in parallel.
+    Returns (records, per_page_counts) with records in page order.
+    """
+    if workers == 1 or len(pages) <= 1:
+        results = [parse_winners_page(page) for page in pages]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_winners_page, pages, chunksize=max(1, len(pages) // 64)))
+
+    records = [record for page_records in results for record in page_records]
+    counts = {page: len(page_records) for page, page_records in zip(pages, results)}
+    return records, counts
+
+
+def to_tables(records, scrape_source='mn_lottery_winners'):
+    """
+    Convert parsed records to winning_tickets rows and the games they
+    reference (game_number, game_name, state).
+    """
+    tickets = from_scraped_records(records, scrape_source=scrape_source)
+    games = (
+        tickets.dropna(subset=['game_number'])[['game_number', 'game_name', 'state']]
+        .drop_duplicates(['state', 'game_number'])
+        .reset_index(drop=True)
+    )
+    return tickets, games
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Prediction Ranking
+Answers "top K games under $X for risk profile Y" from a day's
+predictions, using the per-(state, price tier) sorted indexes in
+oracle/ranking.py instead of sorting the whole predictions table.
+"""
+
+import sys
+import time
+import argparse
+from datetime import date
+import numpy as np
+
+from oracle.db import connect
+from oracle.ranking import RISK_PROFILES, load_ranking
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rank predicted games by budget and risk profile.')
+    parser.add_argument('--budget', type=float, default=None, help='Highest ticket price to include')
+    parser.add_argument('--risk', choices=list(RISK_PROFILES), default='medium', help='Risk profile')
+    parser.add_argument('--state', default=None, help='Only games from this state (e.g. MN)')
+    parser.add_argument('-k', '--top', type=int, default=10, help='Games to return')
+    parser.add_argument('--date', default=date.today().isoformat(), help='Prediction date (default: today)')
+    parser.add_argument('--model-version', default='v1.0', help='Model version of the predictions')
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N', help='Time N random queries')
+    return parser.parse_args()
+
+
+def benchmark(index, queries):
+    """Time random (budget, risk, state) queries against the index."""
+    rng = np.random.default_rng(0)
+    budgets = rng.choice([1, 2, 5, 10, 20, 30, 50, None], queries)
+    risks = rng.choice(list(RISK_PROFILES), queries)
+    start = time.perf_counter()
+    for budget, risk in zip(budgets, risks):
+        index.top_k(10, budget, risk)
+    elapsed = time.perf_counter() - start
+    print(f"\n[BENCH] {queries} top-10 queries over {len(index)} games: "
+          f"{elapsed / max(queries, 1) * 1000:.3f} ms/query")
+
+
+def main():
+    """Main ranking query."""
+    args = parse_args()
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE PREDICTION RANKING")
+    print("=" * 70)
+    print(f"Date: {args.date}, model: {args.model_version}")
+    print()
+
+    try:
+        supabase = connect()
+
+        print("[FETCH] Loading predictions and building ranking index...")
+        start = time.perf_counter()
+        index = load_ranking(supabase, args.date, args.model_version)
+        print(f"[OK] Indexed {len(index)} games ({time.perf_counter() - start:.2f}s)")
+        if len(index) == 0:
+            print(f"[ERROR] ERROR: No predictions for {args.date} ({args.model_version})")
+            print("   Please run: npm run generate-predictions")
+            sys.exit(1)
+
+        start = time.perf_counter()
+        picks = index.frame(index.top_k(args.top, args.budget, args.risk, args.state))
+        elapsed = (time.perf_counter() - start) * 1000
+
+        budget = f"up to ${args.budget:g}" if args.budget is not None else "any price"
+        print(f"\nTop {args.top} games, {budget}, {args.risk} risk ({elapsed:.2f} ms):")
+        for rank, row in enumerate(picks.itertuples(), 1):
+            print(f"  {rank:2d}. {str(row.game_name)[:36]:36s} {row.state} ${row.ticket_price:>4g}  "
+                  f"score {row.ai_score:5.1f}  EV {row.expected_value:.3f}  {row.recommendation}")
+
+        if args.benchmark:
+            benchmark(index, args.benchmark)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Nightly Pipeline
+Runs the daily jobs (scrapers, snapshots, training, predictions and the
+published tables) as one DAG with oracle/dag.py: stages whose inputs and
+code haven't changed since their last successful run are skipped, and
+independent stages run in parallel. Per-stage logs go to
+models/pipeline_logs/<run>/ and every run is appended to
+models/pipeline_runs.jsonl.
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import date
+
+from oracle.dag import (
+    DEFAULT_WORKERS, RUN_LOG_PATH, STAGE_LOG_DIR, STATE_PATH, CACHED, OK,
+    PipelineRunner, Stage, content, file_input, latest, only, today_input,
+)
+from oracle.db import connect
+
+# npm scripts and model paths are relative to the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PYTHON = sys.executable
+
+INGEST_STAGES = ('ingest:mn', 'ingest:fl')
+
+# Game columns the scrapers change when the data changes (not the
+# updated_at/last_scraped_at stamps they refresh on every run)
+GAME_COLUMNS = [
+    'game_number', 'game_name', 'ticket_price', 'top_prize_amount', 'total_top_prizes',
+    'remaining_top_prizes', 'overall_odds', 'game_start_date', 'game_end_date', 'is_active',
+    'total_tickets_printed', 'tickets_remaining_estimate', 'state',
+]
+ACTIVE = [('eq', 'is_active', True)]
+
+MODEL_FILES = [os.path.join('models', 'lottery_predictor.pkl'), os.path.join('models', 'lottery_predictor.npz')]
+FEATURE_CACHE_PATH = os.path.join('models', 'feature_cache.sqlite')
+
+
+def script(name):
+    """Command running one of the Python scripts in scripts/."""
+    return [PYTHON, os.path.join('scripts', name)]
+
+
+def predictions_today(client):
+    """Whether today's predictions are in the database."""
+    rows = (client.table('predictions').select('id')
+            .eq('prediction_date', date.today().isoformat()).limit(1).execute().data)
+    return bool(rows)
+
+
+def build_stages():
+    """The nightly DAG."""
+    games = content('games', GAME_COLUMNS)
+    active_games = content('games', GAME_COLUMNS, ACTIVE)
+    new_tickets = latest('winning_tickets', 'created_at')
+    retailers = latest('retailers', 'updated_at')
+
+    return [
+        # Ingest: scraper results can't be known without scraping
+        Stage('ingest:mn', ['npm', 'run', 'scrape:prizes:mn'], cache=False),
+        Stage('ingest:fl', ['npm', 'run', 'scrape:prizes:fl'], cache=False, optional=True),
+        Stage('normalize', script('normalize-winning-tickets.py'),
+              inputs=[new_tickets, retailers],
+              code=['scripts/normalize-winning-tickets.py']),
+
+        # Games
+        Stage('snapshot', script('save-snapshots.py'), deps=INGEST_STAGES,
+              inputs=[active_games, today_input()],
+              code=['scripts/save-snapshots.py']),
+        # Training and predictions share the row-level feature cache, so unchanged games aren't recomputed
+        Stage('train', script('train-model.py'), deps=INGEST_STAGES,
+              inputs=[games],
+              code=['scripts/train-model.py'],
+              outputs=MODEL_FILES,
+              env={'FEATURE_CACHE_PATH': FEATURE_CACHE_PATH}),
+        Stage('predict', script('generate-predictions.py') + ['--skip-snapshots'], deps=['train'],
+              inputs=[active_games, today_input()] + [file_input(path) for path in MODEL_FILES],
+              code=['scripts/generate-predictions.py'],
+              check=predictions_today,
+              env={'FEATURE_CACHE_PATH': FEATURE_CACHE_PATH}),
+
+        # Published tables
+        Stage('publish:cube', script('materialize-game-cube.py'), deps=INGEST_STAGES,
+              inputs=[games],
+              code=['scripts/materialize-game-cube.py'],
+              outputs=[os.path.join('models', 'game_cube.parquet'),
+                       os.path.join('models', 'game_cube_rows.parquet')]),
+        # Tickets resolved late keep their created_at, and days_since_last_win moves daily
+        Stage('publish:retailer-stats', script('materialize-retailer-stats.py'), deps=['normalize'],
+              inputs=[new_tickets, today_input()],
+              code=['scripts/materialize-retailer-stats.py'],
+              outputs=[os.path.join('models', 'retailer_stats_state.pkl')]),
+        Stage('publish:heatmap', script('materialize-heatmap-tiles.py'), deps=['normalize'],
+              inputs=[new_tickets, retailers, today_input()],
+              code=['scripts/materialize-heatmap-tiles.py'],
+              outputs=[os.path.join('models', 'heatmap_tiles_state.pkl')]),
+        # Scores decay with age, so they're redone daily
+        Stage('publish:retailer-scores', script('score-retailers.py'), deps=['normalize'],
+              inputs=[new_tickets, retailers, today_input()],
+              code=['scripts/score-retailers.py']),
+    ]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the nightly data/ML pipeline, skipping cached stages.')
+    parser.add_argument('--only', nargs='+', metavar='STAGE', help='Run just these stages')
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE',
+                        help="Rerun these stages even if cached ('all' for every stage)")
+    parser.add_argument('--skip-ingest', action='store_true', help="Don't run the scrapers")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Stages run in parallel')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would run, without running it')
+    parser.add_argument('--state-path', default=STATE_PATH)
+    return parser.parse_args()
+
+
+def print_summary(record):
+    """Per-stage status and durations of a run."""
+    print("\n" + "=" * 70)
+    print("[STATS] PIPELINE SUMMARY")
+    print("=" * 70)
+    for result in record['stages']:
+        print(f"  {result['stage']:26s} {result['status']:8s} {result['seconds']:8.1f}s")
+    cached = sum(result['status'] == CACHED for result in record['stages'])
+    print(f"\n{cached}/{len(record['stages'])} stages cached, total {record['seconds']:.1f}s")
+
+
+def main():
+    """Main pipeline run."""
+    args = parse_args()
+    os.chdir(ROOT)
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE NIGHTLY PIPELINE")
+    print("=" * 70)
+    print(f"State: {args.state_path}")
+    print(f"Workers: {args.workers}")
+    print()
+
+    try:
+        stages = build_stages()
+        names = args.only or [stage.name for stage in stages]
+        if args.skip_ingest:
+            names = [name for name in names if name not in INGEST_STAGES]
+        stages = only(stages, names)
+
+        supabase = connect()
+        runner = PipelineRunner(stages, supabase, workers=args.workers, force=args.force,
+                                state_path=args.state_path, run_log_path=RUN_LOG_PATH, log_dir=STAGE_LOG_DIR)
+
+        if args.dry_run:
+            start = time.perf_counter()
+            print("[LOAD] Fingerprinting stage inputs...")
+            for name, action in runner.plan():
+                print(f"  {name:26s} {action}")
+            print(f"\n[OK] Planned in {time.perf_counter() - start:.1f}s (stages after a rerun may still hit)")
+            return
+
+        record = runner.run()
+        print_summary(record)
+        if not record['ok']:
+            failed = [result['stage'] for result in record['stages'] if result['status'] not in OK]
+            print(f"\n[ERROR] ERROR: Pipeline did not complete: {', '.join(failed)}")
+            sys.exit(1)
+        print("\n[OK] Pipeline complete")
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Daily Snapshots
+Records today's historical_snapshots row for every active game (the
+same step generate-predictions.py runs last), so the pipeline can take
+snapshots as soon as the scrapers finish, alongside training.
+"""
+
+import sys
+import time
+from datetime import date
+
+from oracle.db import connect, fetch_all
+from oracle.schema import apply_schema
+from oracle.snapshots import save_snapshots
+
+
+def main():
+    """Main snapshot pipeline."""
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE DAILY SNAPSHOTS")
+    print("=" * 70)
+    print(f"Date: {date.today().isoformat()}")
+    print()
+
+    try:
+        supabase = connect()
+
+        start = time.perf_counter()
+        print("[FETCH] Fetching active games...")
+        games = apply_schema(fetch_all(supabase, 'games', filters=[('eq', 'is_active', True)]), 'games')
+        print(f"[OK] Fetched {len(games)} active games ({time.perf_counter() - start:.1f}s)")
+        if len(games) == 0:
+            print("[ERROR] ERROR: No active games found!")
+            sys.exit(1)
+
+        start = time.perf_counter()
+        print(f"\n[SAVE] Saving daily snapshots for {len(games)} games...")
+        written, unchanged = save_snapshots(supabase, games, date.today())
+        print(f"[OK] Saved {written} snapshots ({unchanged} unchanged, skipped) "
+              f"({time.perf_counter() - start:.1f}s)")
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Scratch Oracle Retailer Hot-Spot Scoring Script
+Scores every active retailer from winning_tickets history and writes
+results to the Supabase retailer_predictions table.
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+from oracle.db import connect
+from oracle.retailer_scoring import (
+    DEFAULT_CONFIG, MODEL_VERSION, load_retailers, load_winning_tickets,
+    score_retailers, save_retailer_predictions,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Score retailer hot spots from winning tickets.')
+    parser.add_argument('--lookback-days', type=int, default=DEFAULT_CONFIG['lookback_days'])
+    parser.add_argument('--half-life-days', type=float, default=DEFAULT_CONFIG['half_life_days'])
+    parser.add_argument('--bandwidth-miles', type=float, default=DEFAULT_CONFIG['bandwidth_miles'])
+    parser.add_argument('--neighbors', type=int, default=DEFAULT_CONFIG['neighbors'])
+    parser.add_argument('--dry-run', action='store_true', help='Score without writing to Supabase')
+    return parser.parse_args()
+
+
+def main():
+    """Main retailer scoring pipeline."""
+    args = parse_args()
+    config = {
+        'lookback_days': args.lookback_days,
+        'half_life_days': args.half_life_days,
+        'bandwidth_miles': args.bandwidth_miles,
+        'neighbors': args.neighbors,
+    }
+
+    print("=" * 70)
+    print("[SLOT] SCRATCH ORACLE RETAILER HOT-SPOT SCORING")
+    print("=" * 70)
+    print(f"Model: {MODEL_VERSION}")
+    print(f"Lookback: {args.lookback_days} days, bandwidth: {args.bandwidth_miles} mi")
+    print()
+
+    try:
+        supabase = connect()
+        now = datetime.utcnow()
+
+        # Step 1: Bulk-load data
+        start = time.perf_counter()
+        print("\n[FETCH] Fetching retailers and winning tickets...")
+        retailers = load_retailers(supabase)
+        tickets = load_winning_tickets(supabase, now - timedelta(days=args.lookback_days))
+        print(f"[OK] Fetched {len(retailers)} retailers, {len(tickets)} winning tickets "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        if len(retailers) == 0:
+            print("[ERROR] ERROR: No active retailers found!")
+            sys.exit(1)
+
+        # Step 2: Score
+        start = time.perf_counter()
+        print("\n[PREDICT] Scoring retailers...")
+        scores = score_retailers(retailers, tickets, as_of=now, config=config)
+        skipped = len(retailers) - len(scores)
+        print(f"[OK] Scored {len(scores)} retailers ({time.perf_counter() - start:.1f}s)")
+        if skipped:
+            print(f"[WARNING]  Skipped {skipped} retailers without coordinates")
+
+        if len(scores) == 0:
+            print("[ERROR] ERROR: No geocoded retailers to score!")
+            sys.exit(1)
+
+        print(f"\nScore Summary:")
+        print(f"  Average hotness: {scores['hotness_score'].mean():.4f}")
+        print(f"  Retailers with wins: {(scores['win_count'] > 0).sum()}")
+
+        # Step 3: Save
+        if args.dry_run:
+            print("\n[SKIP] Dry run - not writing retailer_predictions")
+        else:
+            start = time.perf_counter()
+            print(f"\n[SAVE] Saving {len(scores)} retailer predictions to Supabase...")
+            written = save_retailer_predictions(supabase, scores, now)
+            print(f"[OK] Saved {written} retailer predictions ({time.perf_counter() - start:.1f}s)")
+
+        print("\n" + "=" * 70)
+        print("[OK] RETAILER SCORING COMPLETE!")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n[ERROR] FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -7,16 +7,31 @@ Phase 1 & 2 Implementation from ML_ARCHITECTURE.md
 
 import os
 import sys
+import time
 import pickle
+import argparse
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import xgboost as xgb
-from supabase import create_client
 from dotenv import load_dotenv
 
+from oracle.db import LOCAL_DB_PATH, SUPABASE_URL, connect, fetch_all
+from oracle.compiled_model import (
+    CompiledTrees, PARITY_TOLERANCE, contribution_parity_error, load_compiled, parity_error,
+)
+from oracle.feature_cache import FeatureCache, cached_features
+from oracle.features import target_scores
+from oracle.quality import BLOCK, OFF, QUALITY_GATE, WARN, QualityMonitor, blocking, build_profile
+from oracle.schema import apply_schema
+from oracle.training import (
+    ENSEMBLE_SIZE, INTERVAL_COVERAGE, MIN_WARM_START_ROWS, WARM_START_HOLDOUT, WARM_START_TREES, train_ensemble,
+    calibrate_intervals, prediction_intervals, interval_coverage, booster_bytes, changed_games, content_keys,
+    warm_start, warm_start_blocker,
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -24,164 +39,76 @@ load_dotenv()
 # Configuration
 # =====================================================
 
-SUPABASE_URL = os.getenv('EXPO_PUBLIC_SUPABASE_URL')
-SUPABASE_KEY = os.getenv('EXPO_PUBLIC_SUPABASE_ANON_KEY')
 MODEL_OUTPUT_DIR = 'models'
 MODEL_OUTPUT_PATH = os.path.join(MODEL_OUTPUT_DIR, 'lottery_predictor.pkl')
+COMPILED_OUTPUT_PATH = os.path.join(MODEL_OUTPUT_DIR, 'lottery_predictor.npz')
+
+# Training rows the compiled feature contributions are checked on
+CONTRIBUTION_SAMPLE = 2_000
+
+# Optional SQLite feature cache shared with generate-predictions.py; unset = compute every run
+FEATURE_CACHE_PATH = os.getenv('FEATURE_CACHE_PATH')
 
 print("=" * 70)
 print("[SLOT] SCRATCH ORACLE ML TRAINING PIPELINE")
 print("=" * 70)
-print(f"Supabase URL: {SUPABASE_URL}")
+print(f"Database: {LOCAL_DB_PATH or SUPABASE_URL}")
 print(f"Model output: {MODEL_OUTPUT_PATH}")
 print()
 
-# Validate configuration
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("[ERROR] ERROR: Missing Supabase credentials in .env file")
-    sys.exit(1)
-
-# Create Supabase client
-try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("[OK] Connected to Supabase")
-except Exception as e:
-    print(f"[ERROR] Failed to connect to Supabase: {e}")
-    sys.exit(1)
-
 # =====================================================
 # Data Fetching
 # =====================================================
 
-def fetch_games():
+def fetch_games(supabase):
     """Fetch all games from Supabase."""
     print("\n[FETCH] Fetching games from Supabase...")
     try:
-        response = supabase.table('games').select('*').execute()
-        games = pd.DataFrame(response.data)
+        games = apply_schema(fetch_all(supabase, 'games'), 'games')
         print(f"[OK] Fetched {len(games)} games")
         return games
     except Exception as e:
         print(f"[ERROR] Error fetching games: {e}")
         raise
 
-def parse_odds(odds_string):
-    """Parse '1 in 3.5' to float 0.286."""
-    if not odds_string or pd.isna(odds_string):
-        return 0
-    try:
-        if 'in' in str(odds_string).lower():
-            parts = str(odds_string).split('in')
-            denominator = float(parts[1].strip())
-            return 1.0 / denominator if denominator > 0 else 0
-        return float(odds_string)
-    except:
-        return 0
-
-def calculate_days_since(date_str):
-    """Calculate days since a date string."""
-    if not date_str or pd.isna(date_str):
-        return 999
-    try:
-        if isinstance(date_str, str):
-            date_obj = pd.to_datetime(date_str)
-        else:
-            date_obj = date_str
-        return (datetime.now(date_obj.tzinfo if date_obj.tzinfo else None) - date_obj).days
-    except:
-        return 999
-
 # =====================================================
 # Feature Engineering
 # =====================================================
 
-def engineer_features(games):
+def engineer_features(games, monitor=None):
     """
-    Create ML features from raw game data.
+    Create ML features from raw game data (see oracle/features.py).
     Using SIMPLE features as recommended for limited data (41 games).
+    Games without a ticket price or top-prize total are skipped; the
+    QualityMonitor, when given, sees every game before that.
     """
     print("\n[BUILD] Engineering features...")
 
-    features_list = []
-
-    for idx, game in games.iterrows():
-        try:
-            # Basic game info
-            game_id = game['id']
-            ticket_price = game.get('ticket_price', 0)
-            top_prize = game.get('top_prize_amount', 0)
-            remaining_prizes = game.get('remaining_top_prizes', 0)
-            total_prizes = game.get('total_top_prizes', 1)  # Avoid division by zero
-
-            # Skip if essential data is missing
-            if ticket_price == 0 or total_prizes == 0:
-                continue
-
-            # Feature 1: Expected Value (EV)
-            # EV = (remaining_prizes * top_prize) / (total_tickets_value)
-            # Simplified: (remaining/total) * (prize/price)
-            prize_concentration = remaining_prizes / total_prizes if total_prizes > 0 else 0
-            ev = (top_prize / ticket_price) * prize_concentration if ticket_price > 0 else 0
-
-            # Feature 2: Prize Concentration (% of prizes remaining)
-            # Higher = more prizes left = potentially better
-
-            # Feature 3: Depletion Rate
-            # How fast are prizes being claimed
-            depletion_rate = 1.0 - prize_concentration
-
-            # Feature 4: Game Age (days since launch)
-            game_start = game.get('game_start_date')
-            days_since_launch = calculate_days_since(game_start)
-
-            # Feature 5: Recency (days since last update)
-            last_scraped = game.get('last_scraped_at')
-            recency = calculate_days_since(last_scraped)
-
-            # Feature 6: Overall Odds
-            odds = parse_odds(game.get('overall_odds'))
-
-            # Feature 7: Velocity (approximate from available data)
-            # If we had historical snapshots, we'd calculate rate of change
-            # For now, use depletion rate as proxy
-            velocity = depletion_rate
-
-            # Feature 8: Prize to Price Ratio
-            prize_to_price = top_prize / ticket_price if ticket_price > 0 else 0
-
-            # Calculate TARGET (AI Score 0-100)
-            # This is what we're training to predict
-            target_score = calculate_target_score(
-                ev, prize_concentration, depletion_rate,
-                days_since_launch, recency
-            )
-
-            features_list.append({
-                'game_id': game_id,
-                'game_number': game.get('game_number'),
-                'game_name': game.get('game_name'),
-                # Features
-                'ticket_price': ticket_price,
-                'ev': ev,
-                'prize_concentration': prize_concentration,
-                'depletion_rate': depletion_rate,
-                'days_since_launch': days_since_launch,
-                'recency': recency,
-                'odds': odds,
-                'velocity': velocity,
-                'prize_to_price': prize_to_price,
-                'remaining_prizes': remaining_prizes,
-                'total_prizes': total_prizes,
-                # Target
-                'target_score': target_score
-            })
-
-        except Exception as e:
-            print(f"[WARNING]  Warning: Error processing game {game.get('game_name', 'unknown')}: {e}")
-            continue
-
-    df = pd.DataFrame(features_list)
-    print(f"[OK] Engineered {len(df)} feature rows from {len(games)} games")
+    if FEATURE_CACHE_PATH:
+        with FeatureCache(FEATURE_CACHE_PATH) as cache:
+            features, hits = cached_features(games, None, cache)
+        print(f"[OK] Feature cache: {hits}/{len(games)} rows reused from {FEATURE_CACHE_PATH}")
+    else:
+        features, _ = cached_features(games)
+    if monitor is not None:
+        monitor.update(games, features)
+
+    # Skip if essential data is missing
+    keep = ((features['ticket_price'] != 0) & (features['total_prizes'] != 0)).to_numpy()
+    df = features[keep].reset_index(drop=True)
+    kept = games[keep].reset_index(drop=True)
+
+    df.insert(0, 'game_id', kept['id'])
+    df.insert(1, 'game_number', kept.get('game_number'))
+    df.insert(2, 'game_name', kept.get('game_name'))
+    df['is_active'] = kept['is_active'].fillna(True).astype(bool) if 'is_active' in kept else True
+
+    # Calculate TARGET (AI Score 0-100)
+    # This is what we're training to predict
+    df['target_score'] = target_scores(df)
+
+    print(f"[OK] Engineered {len(df)} feature rows from {len(games)} games "
+          f"({len(games) - len(df)} skipped: no ticket price or prize total)")
 
     if len(df) == 0:
         print("[ERROR] ERROR: No valid feature rows created!")
@@ -189,50 +116,33 @@ def engineer_features(games):
 
     return df
 
-def calculate_target_score(ev, prize_concentration, depletion_rate, days_since_launch, recency):
+def check_data_quality(monitor):
     """
-    Calculate target AI score for supervised learning.
-
-    Components:
-    - EV score (40%): Higher EV = better value
-    - Concentration score (30%): More prizes remaining = better
-    - Activity score (15%): Active depletion = hot game
-    - Freshness score (10%): Recent data = more reliable
-    - Age penalty (5%): Newer games often have more prizes
+    Report sentinel rates and drift against the previous model's training
+    distribution. Drift only warns here (retraining is how it's absorbed);
+    sentinel rates past their block limit stop training.
     """
+    print("\n[CHECK] Checking data quality...")
+    issues = monitor.check(block_on_drift=False)
+    for level, message in issues:
+        print(f"[WARNING]  Warning: {message}" if level == WARN or QUALITY_GATE != BLOCK
+              else f"[ERROR] ERROR: {message}")
+
+    if blocking(issues):
+        print("[ERROR] ERROR: Data quality checks failed, not training (set ORACLE_QUALITY_GATE=warn to override)")
+        sys.exit(1)
+    if not issues:
+        print(f"[OK] {monitor.rows} games passed data quality checks")
 
-    # Normalize EV to 0-100 scale (EV > 1.0 is great, > 2.0 is excellent)
-    ev_score = min(ev * 50, 100)
-
-    # Concentration: high % remaining = good
-    concentration_score = prize_concentration * 100
-
-    # Activity: some depletion is good (shows people are playing)
-    # Sweet spot is 20-60% depleted
-    if depletion_rate < 0.2:
-        activity_score = depletion_rate * 200  # 0-40
-    elif depletion_rate < 0.6:
-        activity_score = 80 + (depletion_rate - 0.2) * 50  # 80-100
-    else:
-        activity_score = max(100 - (depletion_rate - 0.6) * 200, 0)  # 100-0
-
-    # Freshness: recent data is more reliable
-    freshness_score = max(100 - recency * 10, 0)  # Decays 10 points per day
-
-    # Age penalty: games older than 6 months might be getting stale
-    age_penalty = 0
-    if days_since_launch > 180:
-        age_penalty = min((days_since_launch - 180) / 10, 50)
-
-    # Weighted average
-    score = (
-        ev_score * 0.40 +
-        concentration_score * 0.30 +
-        activity_score * 0.15 +
-        freshness_score * 0.10
-    ) - age_penalty * 0.05
-
-    return max(0, min(score, 100))
+def previous_profile():
+    """Training distribution of the currently exported model, if any."""
+    if not os.path.exists(COMPILED_OUTPUT_PATH):
+        return None
+    try:
+        return load_compiled(COMPILED_OUTPUT_PATH).get('feature_profile')
+    except Exception as e:
+        print(f"[WARNING]  Warning: Could not read previous model profile: {e}")
+        return None
 
 # =====================================================
 # Model Training
@@ -335,13 +245,39 @@ def train_model(df):
     for _, row in feature_importance.iterrows():
         print(f"  {row['feature']:25s}: {row['importance']:.4f}")
 
-    return model, feature_cols, {
+    # Bootstrap ensemble for per-game prediction intervals
+    print(f"\n[AI] Training {ENSEMBLE_SIZE}-member bootstrap ensemble...")
+    members = train_ensemble(X_train.to_numpy(), y_train.to_numpy())
+
+    # Group 0 is the main model, so one pass scores the model and all members.
+    # The members' spread is a band for the mean: half the test rows calibrate
+    # its scale to a prediction interval, the other half check its coverage.
+    ensemble = CompiledTrees.from_boosters([model] + members)
+    member_scores = ensemble.predict_groups(X_test.to_numpy())[:, 1:]
+    calibration, evaluation = train_test_split(np.arange(len(X_test)), test_size=0.5, random_state=42)
+    actual = y_test.to_numpy()
+    interval_scale = calibrate_intervals(member_scores[calibration], actual[calibration])
+    raw_coverage = interval_coverage(*prediction_intervals(member_scores[evaluation]), actual[evaluation])
+    lower, upper = prediction_intervals(member_scores[evaluation], interval_scale)
+    coverage = interval_coverage(lower, upper, actual[evaluation])
+    mean_width = float(np.mean(upper - lower)) if len(lower) else 0.0
+    print(f"  Interval scale: {interval_scale:.2f} (from {len(calibration)} calibration rows)")
+    print(f"  Test interval coverage: {coverage * 100:.1f}% (nominal {INTERVAL_COVERAGE * 100:.0f}%, "
+          f"uncalibrated member band {raw_coverage * 100:.1f}%)")
+    print(f"  Mean interval width: {mean_width:.2f}")
+    if coverage < INTERVAL_COVERAGE - 0.1:
+        print("[WARNING]  Warning: Calibrated interval coverage is well below nominal (few test rows?)")
+
+    return model, feature_cols, ensemble, [booster_bytes(member) for member in members], interval_scale, {
         'train_mae': train_mae,
         'train_rmse': train_rmse,
         'train_r2': train_r2,
         'test_mae': test_mae,
         'test_rmse': test_rmse,
         'test_r2': test_r2,
+        'interval_coverage': coverage,
+        'interval_coverage_uncalibrated': raw_coverage,
+        'interval_width': mean_width,
         'n_samples': len(df),
         'n_features': len(feature_cols)
     }
@@ -350,8 +286,14 @@ def train_model(df):
 # Model Persistence
 # =====================================================
 
-def save_model(model, feature_cols, metrics):
-    """Save trained model and metadata to disk."""
+def save_model(model, feature_cols, metrics, ensemble, feature_profile=None, members=(), warm_state=None,
+               training_keys=None, interval_scale=None):
+    """
+    Save trained model, interval ensemble (with its conformal interval
+    scale) and metadata (incl. the feature profile) to disk. Raw member
+    boosters, the warm-start state and the content keys of the games
+    trained on are kept for --warm-start updates.
+    """
     print(f"\n[SAVE] Saving model to {MODEL_OUTPUT_PATH}...")
 
     # Create models directory if it doesn't exist
@@ -360,15 +302,22 @@ def save_model(model, feature_cols, metrics):
     # Package model with metadata
     model_package = {
         'model': model,
+        'ensemble': ensemble,
+        'interval_scale': interval_scale,
         'feature_cols': feature_cols,
         'metrics': metrics,
+        'feature_profile': feature_profile,
+        'members': list(members),
+        'warm_start': warm_state,
+        'training_keys': training_keys,
         'version': 'v1.0',
         'framework': 'xgboost',
         'trained_at': datetime.now().isoformat(),
         'training_config': {
             'n_estimators': 100,
             'max_depth': 4,
-            'learning_rate': 0.1
+            'learning_rate': 0.1,
+            'ensemble_size': ensemble.n_groups - 1
         }
     }
 
@@ -379,22 +328,181 @@ def save_model(model, feature_cols, metrics):
     file_size = os.path.getsize(MODEL_OUTPUT_PATH) / 1024  # KB
     print(f"[OK] Model saved successfully ({file_size:.1f} KB)")
 
+    return model_package
+
+def export_compiled_model(model_package, X):
+    """
+    Export the booster as flat NumPy arrays for xgboost-free inference.
+    Only written if it reproduces model.predict on the training features.
+    """
+    print(f"\n[SAVE] Exporting compiled model to {COMPILED_OUTPUT_PATH}...")
+    model = model_package['model']
+    compiled = model_package['ensemble']
+
+    error = parity_error(compiled, model, X.to_numpy(dtype=np.float32))
+    if error > PARITY_TOLERANCE:
+        print(f"[WARNING]  Warning: Compiled model differs from model.predict by {error:.6f}, not exporting")
+        if os.path.exists(COMPILED_OUTPUT_PATH):
+            os.remove(COMPILED_OUTPUT_PATH)
+        return
+
+    # Explanations are checked on a sample; a mismatch is reported but doesn't block the export
+    contribution_error = contribution_parity_error(compiled, model, X.to_numpy(dtype=np.float32)[:CONTRIBUTION_SAMPLE])
+    if contribution_error > PARITY_TOLERANCE:
+        print(f"[WARNING]  Warning: Compiled feature contributions differ from xgboost by {contribution_error:.6f}")
+
+    metadata = {key: value for key, value in model_package.items()
+                if key not in ('model', 'ensemble', 'members', 'training_keys')}
+    metadata['framework'] = 'xgboost-compiled'
+    compiled.save(COMPILED_OUTPUT_PATH, metadata)
+
+    file_size = os.path.getsize(COMPILED_OUTPUT_PATH) / 1024  # KB
+    print(f"[OK] Compiled {compiled.n_trees} trees ({compiled.n_groups} models), depth {compiled.depth} "
+          f"(max parity error {error:.2e}, contributions {contribution_error:.2e}, {file_size:.1f} KB)")
+
+# =====================================================
+# Warm Start
+# =====================================================
+
+def new_warm_state(metrics):
+    """Warm-start bookkeeping after a full retrain."""
+    return {
+        'full_trained_at': datetime.now().isoformat(),
+        'baseline_mae': float(metrics['test_mae']),
+        'updates': 0,
+        'trees_added': 0,
+        'history': [],
+    }
+
+def load_current_model():
+    """Current pickled model package, or None."""
+    if not os.path.exists(MODEL_OUTPUT_PATH):
+        return None
+    with open(MODEL_OUTPUT_PATH, 'rb') as f:
+        return pickle.load(f)
+
+def warm_start_model(supabase, package):
+    """
+    Continue the current model on games whose feature inputs changed (or
+    that are new) since it was trained. Part of those rows is held out
+    of the fit and decides between a warm start and a full retrain.
+    Returns the updated package (or the unchanged one when there's too
+    little new data), or None when a full retrain is needed instead.
+    """
+    warm_state = package.get('warm_start')
+    training_keys = package.get('training_keys')
+    if not warm_state or training_keys is None or not package.get('members'):
+        print("\n[TRAIN] Current model has no warm-start state, running a full retrain")
+        return None
+
+    games = fetch_games(supabase)
+    changed = changed_games(games, training_keys)
+    games = games[changed].reset_index(drop=True)
+    print(f"[OK] {len(games)} games new or changed since the model was trained "
+          f"({int((~changed).sum())} unchanged)")
+    if len(games) < MIN_WARM_START_ROWS:
+        print(f"[OK] Only {len(games)} changed games, model unchanged")
+        return package
+
+    # Changed games are a skewed sample (recently updated), so drift only
+    # warns here; the model's error on them decides on a full retrain
+    monitor = QualityMonitor(package.get('feature_profile')) if QUALITY_GATE != OFF else None
+    df = engineer_features(games, monitor)
+    if monitor is not None:
+        check_data_quality(monitor)
+    if len(df) < MIN_WARM_START_ROWS:
+        print(f"[OK] Only {len(df)} usable new rows, model unchanged")
+        return package
+
+    feature_cols = package['feature_cols']
+    fit_idx, holdout_idx = train_test_split(np.arange(len(df)), test_size=WARM_START_HOLDOUT, random_state=42)
+    X_fit, y_fit = df[feature_cols].iloc[fit_idx], df['target_score'].iloc[fit_idx]
+    X_holdout, y_holdout = df[feature_cols].iloc[holdout_idx], df['target_score'].iloc[holdout_idx]
+
+    mae_before = mean_absolute_error(y_holdout, package['model'].predict(X_holdout))
+    reason = warm_start_blocker(warm_state, mae_before)
+    if reason:
+        print(f"\n[TRAIN] {reason}, running a full retrain")
+        return None
+
+    print(f"\n[AI] Warm-starting: adding {WARM_START_TREES} trees to the model and "
+          f"{len(package['members'])} members on {len(fit_idx)} new rows ({len(holdout_idx)} held out)...")
+    start = time.perf_counter()
+    model, members = warm_start(package['model'], package['members'], X_fit.to_numpy(), y_fit.to_numpy())
+    ensemble = CompiledTrees.from_boosters([model] + members)
+    mae_after = mean_absolute_error(y_holdout, model.predict(X_holdout))
+    print(f"[OK] Updated in {time.perf_counter() - start:.1f}s "
+          f"(MAE on held-out new rows {mae_before:.2f} -> {mae_after:.2f})")
+    reason = warm_start_blocker(warm_state, mae_after)
+    if reason:
+        print(f"\n[TRAIN] After the update, {reason}; discarding it and running a full retrain")
+        return None
+
+    # Held-out games stay unseen, so a later warm start can still fit on them
+    held_out = set(df['game_id'].iloc[holdout_idx].tolist())
+    seen = games[~games['id'].isin(held_out)]
+    warm_state = {
+        **warm_state,
+        'updates': warm_state['updates'] + 1,
+        'trees_added': warm_state['trees_added'] + WARM_START_TREES,
+        'history': warm_state['history'][-49:] + [{
+            'at': datetime.now().isoformat(), 'rows': len(fit_idx), 'holdout_rows': len(holdout_idx),
+            'mae_before': float(mae_before), 'mae_after': float(mae_after),
+        }],
+    }
+    model_package = save_model(
+        model, feature_cols, package['metrics'], ensemble, package.get('feature_profile'),
+        [booster_bytes(member) for member in members], warm_state, {**training_keys, **content_keys(seen)},
+        package.get('interval_scale'),
+    )
+    export_compiled_model(model_package, X_fit)
+    return model_package
+
 # =====================================================
 # Main Execution
 # =====================================================
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Train the game scoring model.')
+    parser.add_argument('--warm-start', action='store_true',
+                        help='Add trees for games whose data changed since the last training run instead of '
+                             'retraining (falls back to a full retrain when error on held-out changed games grows)')
+    return parser.parse_args()
+
 def main():
     """Main training pipeline."""
+    args = parse_args()
     try:
+        supabase = connect()
+
+        if args.warm_start:
+            package = load_current_model()
+            updated = warm_start_model(supabase, package) if package else None
+            if updated is not None:
+                state = updated['warm_start']
+                print("\n" + "=" * 70)
+                print("[OK] WARM-START UPDATE COMPLETE!")
+                print("=" * 70)
+                print(f"Model location: {MODEL_OUTPUT_PATH}")
+                print(f"Warm updates since last full retrain: {state['updates']} "
+                      f"({state['trees_added']} trees added)")
+                print("=" * 70)
+                return
+            if package is None:
+                print("\n[TRAIN] No current model, running a full retrain")
+
         # Step 1: Fetch data
-        games = fetch_games()
+        games = fetch_games(supabase)
 
         if len(games) == 0:
             print("[ERROR] ERROR: No games found in database!")
             sys.exit(1)
 
-        # Step 2: Engineer features
-        df = engineer_features(games)
+        # Step 2: Engineer features (and check the raw data on the way)
+        monitor = QualityMonitor(previous_profile()) if QUALITY_GATE != OFF else None
+        df = engineer_features(games, monitor)
+        if monitor is not None:
+            check_data_quality(monitor)
 
         if len(df) < 10:
             print(f"[ERROR] ERROR: Insufficient data for training (only {len(df)} valid samples)")
@@ -402,10 +510,16 @@ def main():
             sys.exit(1)
 
         # Step 3: Train model
-        model, feature_cols, metrics = train_model(df)
+        model, feature_cols, ensemble, members, interval_scale, metrics = train_model(df)
 
         # Step 4: Save model
-        save_model(model, feature_cols, metrics)
+        # Drift is measured against the games predictions run on (active ones)
+        active = df[df['is_active']] if df['is_active'].any() else df
+        model_package = save_model(model, feature_cols, metrics, ensemble, build_profile(active), members,
+                                   new_warm_state(metrics), content_keys(games), interval_scale)
+
+        # Step 5: Export compiled model for prediction
+        export_compiled_model(model_package, df[feature_cols])
 
         # Success!
         print("\n" + "=" * 70)
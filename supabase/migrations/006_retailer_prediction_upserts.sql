@@ -0,0 +1,8 @@
+-- Migration 006: Retailer prediction upserts
+-- The retailer scoring job (scripts/score-retailers.py) writes one row per
+-- retailer per model version and replaces it on every run.
+
+ALTER TABLE retailer_predictions ADD CONSTRAINT retailer_predictions_retailer_model_key
+  UNIQUE (retailer_id, model_version);
+
+COMMENT ON CONSTRAINT retailer_predictions_retailer_model_key ON retailer_predictions IS 'One current prediction per retailer per model version (upsert target)';
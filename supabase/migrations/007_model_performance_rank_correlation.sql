@@ -0,0 +1,7 @@
+-- Migration 007: Rank correlation in model_performance
+-- The backtester (scripts/backtest-models.py) scores how well each model
+-- orders games, not just how close its scores are.
+
+ALTER TABLE model_performance ADD COLUMN rank_correlation DECIMAL(5,4);
+
+COMMENT ON COLUMN model_performance.rank_correlation IS 'Spearman correlation between predicted ai_score and realized score k days later';
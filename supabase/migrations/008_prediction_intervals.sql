@@ -0,0 +1,10 @@
+-- Migration 008: Prediction intervals
+-- generate-predictions.py scores a bootstrap ensemble alongside the main
+-- model and stores the 10th-90th percentile range of member scores.
+
+ALTER TABLE predictions
+  ADD COLUMN ai_score_lower DECIMAL(5,2),
+  ADD COLUMN ai_score_upper DECIMAL(5,2);
+
+COMMENT ON COLUMN predictions.ai_score_lower IS '10th percentile of bootstrap ensemble scores (NULL without an ensemble)';
+COMMENT ON COLUMN predictions.ai_score_upper IS '90th percentile of bootstrap ensemble scores (NULL without an ensemble)';
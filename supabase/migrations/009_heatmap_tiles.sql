@@ -0,0 +1,32 @@
+-- Migration 009: Store heat map tiles
+-- scripts/materialize-heatmap-tiles.py bins winning_tickets at their
+-- retailers' coordinates into Web Mercator tiles at several zoom levels.
+-- The app fetches the tiles covering its viewport by quadkey instead of
+-- every store and win row.
+
+CREATE TABLE IF NOT EXISTS heatmap_tiles (
+  quadkey TEXT PRIMARY KEY,
+  zoom SMALLINT NOT NULL,
+  tile_x INTEGER NOT NULL,
+  tile_y INTEGER NOT NULL,
+
+  -- Tile totals
+  wins INTEGER NOT NULL DEFAULT 0,
+  total_prize_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+  max_cell_wins INTEGER NOT NULL DEFAULT 0,
+
+  -- Non-empty grid cells, base64 (see comment below)
+  cell_count INTEGER NOT NULL DEFAULT 0,
+  payload TEXT NOT NULL,
+
+  updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX idx_heatmap_tiles_zoom ON heatmap_tiles (zoom, tile_x, tile_y);
+
+ALTER TABLE heatmap_tiles ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Public read access for heatmap_tiles" ON heatmap_tiles FOR SELECT USING (true);
+
+COMMENT ON TABLE heatmap_tiles IS 'Pre-aggregated win heat per map tile, rewritten only for tiles touched by new wins';
+COMMENT ON COLUMN heatmap_tiles.quadkey IS 'Bing-style quadkey of the tile (one digit per zoom level)';
+COMMENT ON COLUMN heatmap_tiles.payload IS 'Base64: 1 format byte, 1 byte grid bits g, then per non-empty cell of the 2^g x 2^g grid (little-endian): uint16 cell (row * 2^g + col), uint32 wins, float32 prize total';
@@ -0,0 +1,9 @@
+-- Migration 010: Prediction feature contributions
+-- generate-predictions.py explains each score with TreeSHAP feature
+-- contributions and stores the largest few; the reasoning text is
+-- rendered from them.
+
+ALTER TABLE predictions
+  ADD COLUMN top_contributions JSONB;
+
+COMMENT ON COLUMN predictions.top_contributions IS 'Largest feature contributions to ai_score in points, largest first: [[feature, points], ...] (NULL if the model could not be explained)';